@@ -6,6 +6,7 @@ from .validator_agent import ValidatorAgent
 from .executor_agent import ExecutorAgent
 from .observer_agent import ObserverAgent
 from .self_healing_agent import SelfHealingAgent
+from .pipeline import AgentPipeline, PipelineBranchError, PipelineResult
 
 __all__ = [
     "BaseAgent",
@@ -14,5 +15,8 @@ __all__ = [
     "ValidatorAgent",
     "ExecutorAgent",
     "ObserverAgent",
-    "SelfHealingAgent"
+    "SelfHealingAgent",
+    "AgentPipeline",
+    "PipelineBranchError",
+    "PipelineResult"
 ]
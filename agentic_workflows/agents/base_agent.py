@@ -3,7 +3,11 @@ from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any
 import structlog
 
+from ..config import get_settings
 from ..llm import LLMProvider, get_llm_provider
+from ..llm.admission import Priority, request_priority
+from ..llm.router import hedging
+from ..llm.tokens import TokenBudget, estimate_tokens
 from ..core.audit import AuditLog
 
 logger = structlog.get_logger()
@@ -12,6 +16,19 @@ logger = structlog.get_logger()
 class BaseAgent(ABC):
     """Base class for all AI agents."""
     
+    # Sampling temperature for think(); None uses the provider default
+    temperature: Optional[float] = None
+    
+    # Hedge routed requests after ``llm_hedge_after_seconds`` (router only)
+    latency_critical: bool = False
+    
+    # Place in the provider queue when calls have to wait for quota
+    priority: Priority = Priority.NORMAL
+    
+    # Token limits; None uses ``llm_prompt_token_budget`` / the provider default
+    prompt_token_budget: Optional[int] = None
+    completion_token_budget: Optional[int] = None
+    
     def __init__(
         self,
         llm_provider: Optional[LLMProvider] = None,
@@ -20,10 +37,22 @@ class BaseAgent(ABC):
         self.llm = llm_provider or get_llm_provider()
         self.audit = audit or AuditLog()
         self.agent_name = self.__class__.__name__
+        self.budget = TokenBudget(
+            prompt_tokens=self.prompt_token_budget or get_settings().llm_prompt_token_budget,
+            completion_tokens=self.completion_token_budget
+        )
+        # Whether the last think() returned fallback_response() instead of the LLM's answer
+        self.used_fallback = False
     
-    def log_action(self, action: str, **kwargs):
-        """Log agent action."""
-        logger.info(
+    def log_action(self, action: str, level: str = "task", **kwargs):
+        """
+        Log agent action.
+        
+        ``level`` is the audit verbosity (summary, task or item); item-level
+        actions are logged at debug and roll up in the audit trail.
+        """
+        log = logger.debug if level == "item" else logger.info
+        log(
             "agent_action",
             agent=self.agent_name,
             action=action,
@@ -34,18 +63,24 @@ class BaseAgent(ABC):
                 "agent": self.agent_name,
                 "action": action,
                 **kwargs
-            })
+            }, level=level)
     
     async def think(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Use LLM to think about a problem."""
-        self.log_action("thinking", prompt_length=len(prompt))
+        prompt = self.budget.fit_prompt(prompt)
+        self.log_action("thinking", prompt_length=len(prompt), prompt_tokens_estimate=estimate_tokens(prompt))
         
+        hedge_after = get_settings().llm_hedge_after_seconds if self.latency_critical else None
         try:
-            response = await self.llm.complete(
-                prompt=prompt,
-                system_prompt=system_prompt or self.get_system_prompt()
-            )
+            with hedging(hedge_after or None), request_priority(self.priority):
+                response = await self.llm.complete(
+                    prompt=prompt,
+                    system_prompt=system_prompt or self.get_system_prompt(),
+                    temperature=self.temperature,
+                    max_tokens=self.budget.completion_tokens
+                )
             
+            self.used_fallback = False
             self.log_action(
                 "thought_complete",
                 tokens_used=response.tokens_used,
@@ -55,6 +90,7 @@ class BaseAgent(ABC):
             return response.content
         except Exception as e:
             logger.error("thinking_failed", agent=self.agent_name, error=str(e))
+            self.used_fallback = True
             return self.fallback_response(prompt)
     
     @abstractmethod
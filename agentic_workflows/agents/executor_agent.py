@@ -2,11 +2,16 @@
 Async Executor Agent - Executes workflow tasks with DAG support.
 """
 import asyncio
+import contextvars
+import uuid
 from typing import Dict, Any, List, Optional
 from .base_agent import BaseAgent
 from ..dag.dag_engine import DAGEngine, DAGNode
-from ..core.agents import resolve_plugin
-from ..core.audit import AuditLog
+from ..config import get_settings
+from ..core.agents import plugin_timeout, resolve_plugin
+from ..core.audit import AuditLog, audit_workflow, current_workflow_id
+from ..core.retry import run_with_timeout
+from ..llm import LLMProvider
 
 
 class ExecutorAgent(BaseAgent):
@@ -25,17 +30,25 @@ class ExecutorAgent(BaseAgent):
         self,
         audit: Optional[AuditLog] = None,
         max_concurrent: int = 10,
-        dry_run: bool = False
+        dry_run: bool = False,
+        llm_provider: Optional[LLMProvider] = None
     ):
-        super().__init__(name="ExecutorAgent", audit=audit)
+        super().__init__(llm_provider=llm_provider, audit=audit)
         self.max_concurrent = max_concurrent
         self.dry_run = dry_run
         self.dag_engine: Optional[DAGEngine] = None
         
+    def get_system_prompt(self) -> str:
+        return "You are a workflow execution assistant. Explain task results and failures concisely."
+        
+    def fallback_response(self, prompt: str) -> str:
+        return "Unable to analyze the execution right now."
+        
     async def execute_workflow(
         self,
         tasks: List[Dict[str, Any]],
-        fail_fast: bool = False
+        fail_fast: bool = False,
+        workflow_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Execute a workflow using DAG engine.
@@ -43,30 +56,32 @@ class ExecutorAgent(BaseAgent):
         Args:
             tasks: List of task specifications
             fail_fast: Stop on first failure
+            workflow_id: Id stamped on every audit record of the run
+                (generated when not given)
             
         Returns:
             Execution result with status and details
         """
-        self.log_action("execute_workflow", {
-            "task_count": len(tasks),
-            "dry_run": self.dry_run,
-            "fail_fast": fail_fast
-        })
-        
-        # Build DAG from tasks
-        self.dag_engine = DAGEngine(
-            audit=self.audit,
-            max_concurrent=self.max_concurrent
-        )
-        self.dag_engine.build_from_spec(tasks)
-        
-        # Execute DAG
-        result = await self.dag_engine.execute(
-            executor_func=self._execute_node,
-            fail_fast=fail_fast
-        )
+        workflow_id = workflow_id or current_workflow_id() or f"wf_{uuid.uuid4().hex}"
+        with audit_workflow(workflow_id):
+            self.log_action("execute_workflow", task_count=len(tasks), dry_run=self.dry_run, fail_fast=fail_fast)
+            
+            # Build DAG from tasks
+            self.dag_engine = DAGEngine(
+                audit=self.audit,
+                max_concurrent=self.max_concurrent,
+                workflow_id=workflow_id
+            )
+            self.dag_engine.build_from_spec(tasks)
+            
+            # Execute DAG
+            result = await self.dag_engine.execute(
+                executor_func=self._execute_node,
+                fail_fast=fail_fast
+            )
         
         return {
+            "workflow_id": workflow_id,
             "success": result.success,
             "total_duration": result.total_duration,
             "successful_nodes": result.successful_nodes,
@@ -94,10 +109,7 @@ class ExecutorAgent(BaseAgent):
         Returns:
             Execution result
         """
-        self.log_action("execute_node", {
-            "node_id": node.id,
-            "task_type": node.task_type
-        })
+        self.log_action("execute_node", node_id=node.id, task_type=node.task_type)
         
         try:
             # Resolve plugin
@@ -110,37 +122,47 @@ class ExecutorAgent(BaseAgent):
             # Create plugin instance
             plugin = plugin_class(params=params, audit=self.audit)
             
-            # Get execution plan
-            plan = plugin.plan()
-            self.log_action("node_plan", {
-                "node_id": node.id,
-                "planned_actions": len(plan)
-            })
-            
-            if self.dry_run:
-                return {
-                    "status": "planned",
-                    "plan": plan,
-                    "dry_run": True
-                }
+            # Item-level audit records of this node roll up into one record
+            with self.audit.rollup(node_id=node.id, task_type=node.task_type):
+                # Get execution plan
+                plan = plugin.plan()
+                self.log_action("node_plan", node_id=node.id, planned_actions=len(plan))
                 
-            # Execute plugin
-            result = plugin.execute()
-            
-            self.log_action("node_complete", {
-                "node_id": node.id,
-                "status": result.get("status", "success")
-            })
+                if self.dry_run:
+                    return {
+                        "status": "planned",
+                        "plan": plan,
+                        "dry_run": True
+                    }
+                    
+                # Execute plugin
+                result = await self._run_plugin(plugin, params)
+            
+            self.log_action("node_complete", node_id=node.id, status=result.get("status", "success"))
             
             return result
             
         except Exception as e:
-            self.log_action("node_error", {
-                "node_id": node.id,
-                "error": str(e)
-            })
+            self.log_action("node_error", node_id=node.id, error=str(e))
             raise
             
+    async def _run_plugin(self, plugin, params: Dict[str, Any]) -> Any:
+        """
+        Run ``plugin.execute()`` in a worker thread, bounded by its timeout.
+        
+        Keeps the event loop free, so independent DAG nodes really run in
+        parallel and the DAG engine's own timeout can fire. The thread gets
+        a copy of the caller's context, so an active audit rollup applies.
+        """
+        context = contextvars.copy_context()
+        return await asyncio.to_thread(
+            context.run,
+            run_with_timeout,
+            plugin.execute,
+            plugin_timeout(plugin, params),
+            isolation=get_settings().plugin_timeout_isolation
+        )
+        
     def get_status(self) -> Dict[str, Any]:
         """Get current execution status."""
         if not self.dag_engine:
@@ -163,9 +185,7 @@ class ExecutorAgent(BaseAgent):
         Returns:
             Execution result
         """
-        self.log_action("execute_single_task", {
-            "task_type": task_type
-        })
+        self.log_action("execute_single_task", task_type=task_type)
         
         try:
             # Resolve plugin
@@ -177,7 +197,7 @@ class ExecutorAgent(BaseAgent):
             
             # Create and execute plugin
             plugin = plugin_class(params=task_params, audit=self.audit)
-            result = plugin.execute()
+            result = await self._run_plugin(plugin, task_params)
             
             return {
                 "success": True,
@@ -185,10 +205,7 @@ class ExecutorAgent(BaseAgent):
             }
             
         except Exception as e:
-            self.log_action("task_error", {
-                "task_type": task_type,
-                "error": str(e)
-            })
+            self.log_action("task_error", task_type=task_type, error=str(e))
             return {
                 "success": False,
                 "error": str(e)
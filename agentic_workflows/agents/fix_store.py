@@ -0,0 +1,316 @@
+"""Learned fix store - Persistent, fuzzy-matched memory of fixes that worked."""
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import struct
+import threading
+import time
+import structlog
+
+from ..config import get_settings
+
+logger = structlog.get_logger()
+
+# Volatile parts of error messages, masked most specific first
+_MASKS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"\b[a-z][a-z0-9+.-]*://\S+", re.I), "<url>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I), "<uuid>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}(?:[t ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:z|[+-]\d{2}:?\d{2})?)?\b", re.I), "<ts>"),
+    (re.compile(r"\b\d{1,2}:\d{2}:\d{2}(?:\.\d+)?\b"), "<ts>"),
+    (re.compile(r"(?:\b[a-z]:)?(?:[\\/][\w.@~-]+){2,}[\\/]?", re.I), "<path>"),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<ip>"),
+    (re.compile(r"\b0x[0-9a-f]+\b|\b(?=[0-9a-f]*\d)(?=[0-9a-f]*[a-f])[0-9a-f]{8,}\b", re.I), "<hex>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<n>"),
+]
+_TOKEN = re.compile(r"<\w+>|\w+")
+
+# 16 bands of 2 rows: errors at the default 0.6 similarity share a band
+# with probability 0.999; candidates are then checked exactly
+_MINHASH_PERMUTATIONS = 32
+_LSH_BANDS = 16
+# Most recent entries kept per LSH bucket, bounding the candidates checked
+_MAX_BUCKET = 32
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20240917)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(_MINHASH_PERMUTATIONS)
+]
+
+
+def normalize_error(error: str) -> str:
+    """Error message with paths, IDs, numbers and timestamps masked."""
+    text = error.strip().lower()
+    for pattern, mask in _MASKS:
+        text = pattern.sub(mask, text)
+    return " ".join(text.split())
+
+
+def _shingles(normalized: str) -> FrozenSet[str]:
+    """Words and word pairs of a normalized error."""
+    tokens = _TOKEN.findall(normalized)
+    return frozenset(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+
+
+def _minhash(shingles: FrozenSet[str]) -> Tuple[int, ...]:
+    hashes = [
+        struct.unpack("<Q", hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest())[0]
+        for s in shingles
+    ] or [0]
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _bands(signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+    rows = _MINHASH_PERMUTATIONS // _LSH_BANDS
+    return [(band, signature[band * rows:(band + 1) * rows]) for band in range(_LSH_BANDS)]
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+@dataclass
+class LearnedFix:
+    """A fix strategy tried on one kind of error, and how it went."""
+    signature: str
+    task_type: str
+    normalized: str
+    strategy: Dict[str, Any]
+    attempts: int = 0
+    successes: int = 0
+    updated_at: float = 0.0
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.attempts if self.attempts else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "signature": self.signature,
+            "task_type": self.task_type,
+            "error": self.normalized,
+            "strategy": self.strategy,
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "success_rate": self.success_rate
+        }
+
+
+@dataclass
+class FixMatch:
+    """A learned fix found for an error; ``similarity`` is 1.0 for an exact match."""
+    fix: LearnedFix
+    similarity: float
+
+
+class LearnedFixStore:
+    """
+    Fixes learned from past failures, matched to new errors without the LLM.
+
+    Errors are normalized (``normalize_error``) so messages that differ only
+    in paths, IDs, numbers or timestamps share one entry. Lookups try the
+    exact normalized signature first, then MinHash/LSH candidates whose
+    word-shingle Jaccard similarity reaches ``similarity``; both cost the
+    same however many fixes are stored. Fixes only match errors of
+    the same task type.
+
+    Entries live in memory and, with a ``path``, in a SQLite file that is
+    loaded on startup. Past ``max_entries`` the least recently updated
+    entries are dropped.
+    """
+
+    def __init__(self, path: Optional[str] = None, similarity: float = 0.6, max_entries: int = 10000):
+        self.similarity = similarity
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._fixes: "OrderedDict[str, LearnedFix]" = OrderedDict()
+        self._shingles: Dict[str, FrozenSet[str]] = {}
+        # Buckets are insertion-ordered dicts used as sets
+        self._index: Dict[Tuple[str, int, Tuple[int, ...]], Dict[str, None]] = {}
+        self._bands: Dict[str, List[Tuple[int, Tuple[int, ...]]]] = {}
+        self.lookups = 0
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS learned_fixes ("
+                "signature TEXT PRIMARY KEY, task_type TEXT NOT NULL, normalized TEXT NOT NULL, "
+                "strategy TEXT NOT NULL, attempts INTEGER NOT NULL, successes INTEGER NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+            self._load()
+
+    @staticmethod
+    def signature(normalized: str, task_type: str = "") -> str:
+        return hashlib.sha256(f"{task_type}\n{normalized}".encode("utf-8")).hexdigest()[:32]
+
+    def _load(self) -> None:
+        rows = self._conn.execute(
+            "SELECT signature, task_type, normalized, strategy, attempts, successes, updated_at "
+            "FROM learned_fixes ORDER BY updated_at"
+        ).fetchall()
+        for row in rows[-self.max_entries:]:
+            self._add(LearnedFix(row[0], row[1], row[2], json.loads(row[3]), row[4], row[5], row[6]))
+        logger.info("learned_fixes_loaded", entries=len(self._fixes))
+
+    def _add(self, fix: LearnedFix) -> None:
+        shingles = _shingles(fix.normalized)
+        bands = _bands(_minhash(shingles))
+        self._fixes[fix.signature] = fix
+        self._shingles[fix.signature] = shingles
+        self._bands[fix.signature] = bands
+        for band, rows in bands:
+            bucket = self._index.setdefault((fix.task_type, band, rows), {})
+            bucket[fix.signature] = None
+            if len(bucket) > _MAX_BUCKET:
+                del bucket[next(iter(bucket))]
+
+    def _remove(self, signature: str) -> None:
+        fix = self._fixes.pop(signature)
+        del self._shingles[signature]
+        for band, rows in self._bands.pop(signature):
+            key = (fix.task_type, band, rows)
+            bucket = self._index.get(key)
+            if bucket is not None:
+                bucket.pop(signature, None)
+                if not bucket:
+                    del self._index[key]
+
+    def match(self, error: str, task_type: Optional[str] = None) -> Optional[FixMatch]:
+        """Best learned fix for an error, or None."""
+        task_type = task_type or ""
+        normalized = normalize_error(error)
+        signature = self.signature(normalized, task_type)
+        with self._lock:
+            self.lookups += 1
+            fix = self._fixes.get(signature)
+            if fix is not None:
+                self.exact_hits += 1
+                return FixMatch(fix, 1.0)
+
+        shingles = _shingles(normalized)
+        bands = _bands(_minhash(shingles))
+        with self._lock:
+            candidates: Set[str] = set()
+            for band, rows in bands:
+                candidates.update(self._index.get((task_type, band, rows), ()))
+            best: Optional[FixMatch] = None
+            for signature in candidates:
+                similarity = _jaccard(shingles, self._shingles[signature])
+                if similarity < self.similarity:
+                    continue
+                fix = self._fixes[signature]
+                if best is None or (similarity, fix.success_rate) > (best.similarity, best.fix.success_rate):
+                    best = FixMatch(fix, similarity)
+            if best is not None:
+                self.fuzzy_hits += 1
+            return best
+
+    def record(
+        self,
+        error: str,
+        strategy: Dict[str, Any],
+        success: bool,
+        task_type: Optional[str] = None
+    ) -> LearnedFix:
+        """
+        Count an attempt of ``strategy`` on an error; a new strategy restarts the count.
+
+        With a SQLite file this blocks on disk, so call it off the event loop.
+        """
+        task_type = task_type or ""
+        normalized = normalize_error(error)
+        signature = self.signature(normalized, task_type)
+        with self._lock:
+            fix = self._fixes.get(signature)
+            if fix is None:
+                fix = LearnedFix(signature, task_type, normalized, strategy)
+                self._add(fix)
+            elif fix.strategy != strategy:
+                fix.strategy, fix.attempts, fix.successes = strategy, 0, 0
+            fix.attempts += 1
+            fix.successes += int(success)
+            fix.updated_at = time.time()
+            self._fixes.move_to_end(signature)
+            evicted = []
+            while len(self._fixes) > self.max_entries:
+                evicted.append(next(iter(self._fixes)))
+                self._remove(evicted[-1])
+            if self._conn is not None:
+                # Add to the stored counts rather than overwrite them, so
+                # workers sharing the file do not lose each other's attempts
+                fix.attempts, fix.successes = self._conn.execute(
+                    "INSERT INTO learned_fixes "
+                    "(signature, task_type, normalized, strategy, attempts, successes, updated_at) "
+                    "VALUES (?, ?, ?, ?, 1, ?, ?) "
+                    "ON CONFLICT(signature) DO UPDATE SET "
+                    "attempts = CASE WHEN strategy = excluded.strategy THEN attempts + 1 ELSE 1 END, "
+                    "successes = CASE WHEN strategy = excluded.strategy "
+                    "THEN successes + excluded.successes ELSE excluded.successes END, "
+                    "strategy = excluded.strategy, updated_at = excluded.updated_at "
+                    "RETURNING attempts, successes",
+                    (signature, task_type, normalized, json.dumps(strategy), int(success), fix.updated_at)
+                ).fetchone()
+                self._conn.executemany("DELETE FROM learned_fixes WHERE signature = ?", [(s,) for s in evicted])
+                self._conn.commit()
+        return fix
+
+    def patterns(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {signature: fix.to_dict() for signature, fix in self._fixes.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fixes.clear()
+            self._shingles.clear()
+            self._bands.clear()
+            self._index.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM learned_fixes")
+                self._conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._fixes)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._fixes),
+            "lookups": self.lookups,
+            "exact_hits": self.exact_hits,
+            "fuzzy_hits": self.fuzzy_hits
+        }
+
+
+_fix_store: Optional[LearnedFixStore] = None
+_fix_store_lock = threading.Lock()
+
+
+def get_fix_store() -> LearnedFixStore:
+    """Return the process-wide learned fix store configured in settings."""
+    global _fix_store
+    with _fix_store_lock:
+        if _fix_store is None:
+            settings = get_settings()
+            _fix_store = LearnedFixStore(
+                settings.learned_fix_store_path or None,
+                similarity=settings.learned_fix_similarity,
+                max_entries=settings.learned_fix_max_entries
+            )
+        return _fix_store
+
+
+def reset_fix_store() -> None:
+    global _fix_store
+    with _fix_store_lock:
+        _fix_store = None
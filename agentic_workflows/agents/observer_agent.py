@@ -3,9 +3,19 @@ Observer Agent - Monitors workflow execution and collects telemetry.
 """
 import time
 from typing import Dict, Any, List, Optional
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
 from .base_agent import BaseAgent
+from ..config import get_settings
 from ..core.audit import AuditLog
+from ..llm import LLMProvider
+from ..monitoring.anomaly import Anomaly, AnomalyDetector, Subscriber
+from ..monitoring.streaming import StreamingStats
+
+# Task statuses that end a task
+_TASK_DONE = ("success", "failed", "skipped")
+
+# Error patterns past observer_max_error_patterns are counted here
+OTHER_ERRORS = "other"
 
 
 class ObserverAgent(BaseAgent):
@@ -18,66 +28,130 @@ class ObserverAgent(BaseAgent):
     - Error pattern detection
     - Resource usage monitoring
     - Execution history
+    
+    Memory stays flat on a long-running server: metrics are streaming
+    aggregates with a window of recent values, only running workflows are
+    kept in full, and completed ones are evicted into compact summaries
+    (the most recent ``observer_completed_history``).
     """
     
-    def __init__(self, audit: Optional[AuditLog] = None):
-        super().__init__(name="ObserverAgent", audit=audit)
+    def __init__(self, audit: Optional[AuditLog] = None, llm_provider: Optional[LLMProvider] = None):
+        super().__init__(llm_provider=llm_provider, audit=audit)
+        settings = get_settings()
+        self.recent_samples = settings.observer_recent_samples
+        self.completed_history = settings.observer_completed_history
+        self.max_error_patterns = settings.observer_max_error_patterns
+        self.task_update_history = settings.observer_task_update_history
+        # Running workflows only
         self.workflows: Dict[str, Dict[str, Any]] = {}
-        self.metrics: Dict[str, List[float]] = defaultdict(list)
+        self.completed: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.metrics: Dict[str, StreamingStats] = {}
+        self.status_counts: Dict[str, int] = defaultdict(int)
         self.error_patterns: Dict[str, int] = defaultdict(int)
+        self.total_workflows = 0
+        self.total_errors = 0
+        self.anomalies = AnomalyDetector(
+            alpha=settings.anomaly_ewma_alpha,
+            z_threshold=settings.anomaly_z_threshold,
+            min_samples=settings.anomaly_min_samples,
+            error_rate_threshold=settings.anomaly_error_rate_threshold,
+            error_window_seconds=settings.anomaly_error_window_seconds,
+            error_burst_threshold=settings.anomaly_error_burst_threshold,
+            max_series=settings.anomaly_max_series
+        )
+        
+    def get_system_prompt(self) -> str:
+        return "You are a workflow observability assistant. Explain execution metrics and anomalies concisely."
+        
+    def fallback_response(self, prompt: str) -> str:
+        return "Unable to analyze metrics right now."
+        
+    def _observe(self, metric: str, value: float) -> None:
+        stats = self.metrics.get(metric)
+        if stats is None:
+            stats = self.metrics[metric] = StreamingStats(window=self.recent_samples)
+        stats.observe(value)
+        
+    def subscribe(self, callback: Subscriber):
+        """Push each new anomaly to ``callback``; returns an unsubscribe function."""
+        return self.anomalies.subscribe(callback)
         
     def start_workflow(self, workflow_id: str, metadata: Dict[str, Any]) -> None:
-        """Start monitoring a workflow."""
+        """
+        Start monitoring a workflow.
+        
+        Runs are compared with earlier runs of the same ``metadata["name"]``
+        (or ``workflow_name``), falling back to the workflow ID.
+        """
         self.workflows[workflow_id] = {
             "id": workflow_id,
+            "name": metadata.get("name") or metadata.get("workflow_name") or workflow_id,
             "start_time": time.time(),
             "end_time": None,
             "status": "running",
             "metadata": metadata,
             "tasks": {},
-            "errors": []
+            "error_count": 0,
+            "errors": deque(maxlen=self.task_update_history)
         }
+        self.total_workflows += 1
         
-        self.log_action("workflow_started", {
-            "workflow_id": workflow_id,
-            "metadata": metadata
-        })
+        self.log_action(
+            "workflow_started",
+            workflow_id=workflow_id,
+            metadata=metadata
+        )
         
     def update_task(
         self,
         workflow_id: str,
         task_id: str,
         status: str,
-        details: Optional[Dict[str, Any]] = None
+        details: Optional[Dict[str, Any]] = None,
+        task_type: Optional[str] = None
     ) -> None:
-        """Update task status."""
+        """Update task status; ``task_type`` groups durations for anomaly detection."""
         if workflow_id not in self.workflows:
             return
             
         workflow = self.workflows[workflow_id]
         
-        if task_id not in workflow["tasks"]:
-            workflow["tasks"][task_id] = {
+        task = workflow["tasks"].get(task_id)
+        if task is None:
+            task = workflow["tasks"][task_id] = {
                 "id": task_id,
                 "start_time": time.time(),
+                "type": task_type or (details or {}).get("type"),
                 "status": status,
-                "updates": []
+                "updates": deque(maxlen=self.task_update_history)
             }
-        else:
-            workflow["tasks"][task_id]["status"] = status
+        elif task["status"] in _TASK_DONE and status not in _TASK_DONE:
+            # A retry restarts the clock
+            task["start_time"] = time.time()
+            task.pop("end_time", None)
+        task["status"] = status
+            
+        if status in _TASK_DONE and "end_time" not in task:
+            task["end_time"] = time.time()
+            task_duration = task["end_time"] - task["start_time"]
+            self._observe("task_duration", task_duration)
+            if task["type"] and status == "success":
+                self.anomalies.observe_duration("task", task["type"], task_duration)
             
         if details:
-            workflow["tasks"][task_id]["updates"].append({
+            task["updates"].append({
                 "timestamp": time.time(),
                 "status": status,
                 "details": details
             })
             
-        self.log_action("task_updated", {
-            "workflow_id": workflow_id,
-            "task_id": task_id,
-            "status": status
-        })
+        self.log_action(
+            "task_updated",
+            level="item",
+            workflow_id=workflow_id,
+            task_id=task_id,
+            status=status
+        )
         
     def record_error(
         self,
@@ -97,17 +171,24 @@ class ObserverAgent(BaseAgent):
             "error_type": error_type or "unknown"
         }
         
-        self.workflows[workflow_id]["errors"].append(error_entry)
+        workflow = self.workflows[workflow_id]
+        workflow["errors"].append(error_entry)
+        workflow["error_count"] += 1
+        self.total_errors += 1
         
         # Track error patterns
         pattern_key = f"{error_type}:{error[:50]}"
+        if pattern_key not in self.error_patterns and len(self.error_patterns) >= self.max_error_patterns:
+            pattern_key = OTHER_ERRORS
         self.error_patterns[pattern_key] += 1
+        self.anomalies.observe_error(pattern_key)
         
-        self.log_action("error_recorded", {
-            "workflow_id": workflow_id,
-            "task_id": task_id,
-            "error_type": error_type
-        })
+        self.log_action(
+            "error_recorded",
+            workflow_id=workflow_id,
+            task_id=task_id,
+            error_type=error_type
+        )
         
     def complete_workflow(
         self,
@@ -115,32 +196,65 @@ class ObserverAgent(BaseAgent):
         status: str,
         result: Optional[Dict[str, Any]] = None
     ) -> None:
-        """Mark workflow as complete."""
-        if workflow_id not in self.workflows:
+        """Mark workflow as complete and evict it into a summary."""
+        workflow = self.workflows.pop(workflow_id, None)
+        if workflow is None:
             return
             
-        workflow = self.workflows[workflow_id]
-        workflow["end_time"] = time.time()
-        workflow["status"] = status
-        workflow["result"] = result
+        end_time = time.time()
+        duration = end_time - workflow["start_time"]
         
         # Calculate metrics
-        duration = workflow["end_time"] - workflow["start_time"]
-        self.metrics["workflow_duration"].append(duration)
-        self.metrics[f"workflow_{status}"].append(1)
+        self._observe("workflow_duration", duration)
+        self.status_counts[status] += 1
+        if status != "failed":
+            self.anomalies.observe_duration("workflow", workflow["name"], duration)
+        self.anomalies.observe_outcome(workflow["name"], failed=status == "failed")
         
-        self.log_action("workflow_completed", {
+        task_statuses: Dict[str, int] = defaultdict(int)
+        for task in workflow["tasks"].values():
+            task_statuses[task["status"]] += 1
+        self.completed[workflow_id] = {
             "workflow_id": workflow_id,
+            "name": workflow["name"],
             "status": status,
+            "start_time": workflow["start_time"],
+            "end_time": end_time,
             "duration": duration,
-            "task_count": len(workflow["tasks"]),
-            "error_count": len(workflow["errors"])
-        })
+            "total_tasks": len(workflow["tasks"]),
+            "completed_tasks": sum(task_statuses.get(s, 0) for s in _TASK_DONE),
+            "task_statuses": dict(task_statuses),
+            "error_count": workflow["error_count"]
+        }
+        self.completed.move_to_end(workflow_id)
+        while len(self.completed) > self.completed_history:
+            self.completed.popitem(last=False)
+        
+        self.log_action(
+            "workflow_completed",
+            workflow_id=workflow_id,
+            status=status,
+            duration=duration,
+            task_count=len(workflow["tasks"]),
+            error_count=workflow["error_count"]
+        )
         
     def get_workflow_status(self, workflow_id: str) -> Optional[Dict[str, Any]]:
-        """Get current workflow status."""
+        """
+        Get current workflow status.
+        
+        Completed workflows are answered from their summary, which has
+        ``task_statuses`` counts instead of per-task ``tasks``.
+        """
         if workflow_id not in self.workflows:
-            return None
+            summary = self.completed.get(workflow_id)
+            if summary is None:
+                return None
+            total_tasks = summary["total_tasks"]
+            return {
+                **summary,
+                "progress": (summary["completed_tasks"] / total_tasks * 100) if total_tasks > 0 else 0
+            }
             
         workflow = self.workflows[workflow_id]
         
@@ -148,94 +262,52 @@ class ObserverAgent(BaseAgent):
         total_tasks = len(workflow["tasks"])
         completed_tasks = sum(
             1 for task in workflow["tasks"].values()
-            if task["status"] in ["success", "failed", "skipped"]
+            if task["status"] in _TASK_DONE
         )
         
         progress = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
         
-        # Calculate duration
-        if workflow["end_time"]:
-            duration = workflow["end_time"] - workflow["start_time"]
-        else:
-            duration = time.time() - workflow["start_time"]
-            
         return {
             "workflow_id": workflow_id,
             "status": workflow["status"],
             "progress": progress,
-            "duration": duration,
+            "duration": time.time() - workflow["start_time"],
             "total_tasks": total_tasks,
             "completed_tasks": completed_tasks,
-            "error_count": len(workflow["errors"]),
-            "tasks": workflow["tasks"]
+            "error_count": workflow["error_count"],
+            "tasks": {
+                task_id: {**task, "updates": list(task["updates"])}
+                for task_id, task in workflow["tasks"].items()
+            }
         }
         
     def get_metrics(self) -> Dict[str, Any]:
-        """Get aggregated metrics."""
+        """
+        Get aggregated metrics.
+        
+        Every figure is maintained as events arrive, so this costs the same
+        after a million workflows as after one.
+        """
+        duration = self.metrics.get("workflow_duration")
         return {
-            "total_workflows": len(self.workflows),
-            "active_workflows": sum(
-                1 for w in self.workflows.values()
-                if w["status"] == "running"
-            ),
-            "completed_workflows": sum(
-                1 for w in self.workflows.values()
-                if w["status"] in ["success", "failed"]
-            ),
-            "average_duration": (
-                sum(self.metrics["workflow_duration"]) / len(self.metrics["workflow_duration"])
-                if self.metrics["workflow_duration"] else 0
-            ),
-            "total_errors": sum(self.error_patterns.values()),
+            "total_workflows": self.total_workflows,
+            "active_workflows": len(self.workflows),
+            "completed_workflows": sum(self.status_counts.values()),
+            "status_counts": dict(self.status_counts),
+            "average_duration": duration.mean if duration else 0,
+            "total_errors": self.total_errors,
             "error_patterns": dict(self.error_patterns),
-            "metrics": {k: list(v) for k, v in self.metrics.items()}
+            "metrics": {name: stats.summary() for name, stats in self.metrics.items()}
         }
         
-    def detect_anomalies(self) -> List[Dict[str, Any]]:
-        """Detect anomalies in execution patterns."""
-        anomalies = []
+    def detect_anomalies(self) -> List[Anomaly]:
+        """
+        Anomalies currently in effect.
         
-        # Check for high error rate
-        if self.metrics["workflow_duration"]:
-            error_rate = (
-                sum(self.metrics.get("workflow_failed", []))
-                / len(self.metrics["workflow_duration"])
-            )
-            
-            if error_rate > 0.3:  # More than 30% failure rate
-                anomalies.append({
-                    "type": "high_error_rate",
-                    "severity": "high",
-                    "value": error_rate,
-                    "message": f"High failure rate detected: {error_rate:.1%}"
-                })
-                
-        # Check for repeated errors
-        for pattern, count in self.error_patterns.items():
-            if count > 5:
-                anomalies.append({
-                    "type": "repeated_error",
-                    "severity": "medium",
-                    "pattern": pattern,
-                    "count": count,
-                    "message": f"Error pattern repeated {count} times: {pattern}"
-                })
-                
-        # Check for slow workflows
-        if self.metrics["workflow_duration"]:
-            avg_duration = sum(self.metrics["workflow_duration"]) / len(self.metrics["workflow_duration"])
-            recent_duration = self.metrics["workflow_duration"][-1] if self.metrics["workflow_duration"] else 0
-            
-            if recent_duration > avg_duration * 2:
-                anomalies.append({
-                    "type": "slow_execution",
-                    "severity": "low",
-                    "value": recent_duration,
-                    "average": avg_duration,
-                    "message": f"Workflow took {recent_duration:.1f}s (avg: {avg_duration:.1f}s)"
-                })
-                
-        return anomalies
+        Detection runs as events arrive (see ``AnomalyDetector``); this only
+        reads the result. Use ``subscribe()`` to be told as they happen.
+        """
+        return self.anomalies.active()
         
     def get_recommendations(self) -> List[str]:
         """Get recommendations based on observed patterns."""
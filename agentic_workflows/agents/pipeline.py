@@ -0,0 +1,180 @@
+"""Agent pipeline - Runs independent agent calls concurrently under one deadline."""
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import time
+import structlog
+
+from ..config import get_settings
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class BranchResult:
+    """Outcome of one branch of a pipeline."""
+    name: str
+    status: str  # "ok", "failed" or "timeout"
+    value: Any = None
+    error: Optional[str] = None
+    duration_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+class PipelineResult:
+    """Branch results by name; failed and timed-out branches hold their default."""
+
+    def __init__(self, name: str, branches: Dict[str, BranchResult], duration_seconds: float):
+        self.name = name
+        self.branches = branches
+        self.duration_seconds = duration_seconds
+
+    def __getitem__(self, branch: str) -> Any:
+        return self.branches[branch].value
+
+    def __contains__(self, branch: str) -> bool:
+        return branch in self.branches
+
+    def get(self, branch: str, default: Any = None) -> Any:
+        result = self.branches.get(branch)
+        return result.value if result is not None else default
+
+    def ok(self, branch: str) -> bool:
+        result = self.branches.get(branch)
+        return result is not None and result.ok
+
+    @property
+    def failed(self) -> List[str]:
+        return [name for name, result in self.branches.items() if not result.ok]
+
+    @property
+    def partial(self) -> bool:
+        """Whether some branch failed or ran out of time."""
+        return bool(self.failed)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "pipeline": self.name,
+            "duration_seconds": round(self.duration_seconds, 4),
+            "branches": {
+                name: {
+                    "status": result.status,
+                    "duration_seconds": round(result.duration_seconds, 4),
+                    **({"error": result.error} if result.error else {})
+                }
+                for name, result in self.branches.items()
+            }
+        }
+
+
+class PipelineBranchError(Exception):
+    """A required branch failed or ran out of time; the other branches were cancelled."""
+
+    def __init__(self, pipeline: str, branch: BranchResult):
+        super().__init__(f"{pipeline}: branch '{branch.name}' {branch.status}: {branch.error}")
+        self.pipeline = pipeline
+        self.branch = branch
+
+
+class AgentPipeline:
+    """
+    Independent agent calls, run concurrently.
+
+    Each branch is an awaitable call added with ``add()``. ``run()`` starts
+    them all at once, so the pipeline takes as long as its slowest branch
+    rather than the sum of them, and waits at most ``timeout`` seconds in
+    total (``agent_pipeline_timeout_seconds`` by default; 0 disables).
+
+    A branch that raises or is still running at the deadline keeps its
+    ``default`` and the others are unaffected (a partial result). If a
+    ``required`` branch fails, the rest are cancelled and
+    ``PipelineBranchError`` is raised.
+
+    Example::
+
+        pipeline = AgentPipeline("recovery")
+        pipeline.add("analysis", recovery.analyze_failure, task_id, error, context, required=True)
+        pipeline.add("alternative", recovery.suggest_alternative_approach, task_id, context)
+        result = await pipeline.run()
+        alternative = result["alternative"]  # None if it failed
+    """
+
+    def __init__(self, name: str, timeout: Optional[float] = None):
+        self.name = name
+        self.timeout = get_settings().agent_pipeline_timeout_seconds if timeout is None else timeout
+        self._branches: Dict[str, Dict[str, Any]] = {}
+
+    def add(
+        self,
+        name: str,
+        call: Callable[..., Awaitable[Any]],
+        *args,
+        required: bool = False,
+        default: Any = None,
+        **kwargs
+    ) -> "AgentPipeline":
+        """Add a branch calling ``call(*args, **kwargs)``."""
+        if name in self._branches:
+            raise ValueError(f"Duplicate pipeline branch: {name}")
+        self._branches[name] = {
+            "call": call,
+            "args": args,
+            "kwargs": kwargs,
+            "required": required,
+            "default": default
+        }
+        return self
+
+    def __len__(self) -> int:
+        return len(self._branches)
+
+    async def _run_branch(self, name: str, branch: Dict[str, Any]) -> BranchResult:
+        started = time.perf_counter()
+        try:
+            value = await branch["call"](*branch["args"], **branch["kwargs"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("agent_pipeline_branch_failed", pipeline=self.name, branch=name, error=str(e))
+            return BranchResult(name, "failed", branch["default"], str(e) or type(e).__name__, time.perf_counter() - started)
+        return BranchResult(name, "ok", value, None, time.perf_counter() - started)
+
+    async def run(self) -> PipelineResult:
+        started = time.perf_counter()
+        deadline = started + self.timeout if self.timeout and self.timeout > 0 else None
+        tasks: Dict[asyncio.Task, str] = {
+            asyncio.ensure_future(self._run_branch(name, branch)): name
+            for name, branch in self._branches.items()
+        }
+        results: Dict[str, BranchResult] = {}
+        pending = set(tasks)
+        try:
+            while pending:
+                timeout = max(0.0, deadline - time.perf_counter()) if deadline is not None else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    result = task.result()
+                    results[result.name] = result
+                    if not result.ok and self._branches[result.name]["required"]:
+                        raise PipelineBranchError(self.name, result)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        elapsed = time.perf_counter() - started
+        for task in pending:
+            name = tasks[task]
+            results[name] = BranchResult(name, "timeout", self._branches[name]["default"], f"no result after {self.timeout}s", elapsed)
+            logger.warning("agent_pipeline_branch_timeout", pipeline=self.name, branch=name, timeout=self.timeout)
+            if self._branches[name]["required"]:
+                raise PipelineBranchError(self.name, results[name])
+
+        # Keep the order branches were added in
+        pipeline_result = PipelineResult(self.name, {name: results[name] for name in self._branches}, elapsed)
+        logger.debug("agent_pipeline_complete", **pipeline_result.summary())
+        return pipeline_result
@@ -1,68 +1,196 @@
 """Planner Agent - Converts workflow specs to execution plans using LLM."""
 from typing import Dict, Any, List, Optional
+import asyncio
+import hashlib
 import json
+import threading
+import time
 import structlog
 
 from .base_agent import BaseAgent
-from ..core.spec import WorkflowSpec
+from ..config import get_settings
+from ..core.audit import AuditLog
+from ..core.planning import CostModel, critical_path, get_cost_model, parallel_groups
+from ..core.spec import WorkflowSpec, spec_hash
+from ..llm import LLMProvider
+from ..llm.cache import ResultCache, create_cache_backend
+from ..llm.tokens import fit_json, truncate_text
 
 logger = structlog.get_logger()
 
+# Bump when prompts or plan parsing change, so cached plans are rebuilt
+PLANNER_VERSION = "2"
+
+
+def _format_duration(seconds: float) -> str:
+    """Human-readable duration, e.g. ``45s``, ``3m 20s`` or ``1h 5m``."""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds}s" if seconds else f"{minutes}m"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m" if minutes else f"{hours}h"
+
+
+class PlanCache(ResultCache):
+    """
+    Plans and their explanations keyed by normalized spec content.
+    
+    The key covers the spec hash, ``PLANNER_VERSION`` and the LLM
+    provider and model, so editing the spec, changing the planner or
+    switching models never serves a stale plan. Stored in the backend
+    configured for the completion cache, in its own table or prefix.
+    """
+    
+    name = "plan"
+    
+    @staticmethod
+    def make_key(spec: WorkflowSpec, llm: LLMProvider) -> str:
+        model = getattr(llm.model, "value", llm.model)
+        payload = f"{PLANNER_VERSION}:{llm.provider_name}:{model}:{spec_hash(spec)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "planner_version": PLANNER_VERSION}
+
+
+_plan_cache: Optional[PlanCache] = None
+_plan_cache_lock = threading.Lock()
+
+
+def get_plan_cache() -> PlanCache:
+    """Return the process-wide plan cache configured in settings."""
+    global _plan_cache
+    with _plan_cache_lock:
+        if _plan_cache is None:
+            _plan_cache = PlanCache(
+                create_cache_backend(table="plan_cache", prefix="plan_cache:"),
+                ttl=get_settings().plan_cache_ttl_seconds
+            )
+        return _plan_cache
+
 
 class PlannerAgent(BaseAgent):
     """AI-powered workflow planner."""
     
+    # Deterministic output: same spec, same answer, served from the LLM cache
+    temperature = 0.0
+    completion_token_budget = 1500
+    
+    def __init__(
+        self,
+        llm_provider: Optional[LLMProvider] = None,
+        audit: Optional[AuditLog] = None,
+        plan_cache: Optional[PlanCache] = None,
+        cost_model: Optional[CostModel] = None
+    ):
+        super().__init__(llm_provider, audit)
+        # Loaded on first use unless given
+        self.cost_model = cost_model
+        if plan_cache is None and get_settings().plan_cache_enabled:
+            plan_cache = get_plan_cache()
+        self.plan_cache = plan_cache
+    
     def get_system_prompt(self) -> str:
         return """You are an expert workflow planning AI assistant. Your role is to:
 
-1. Analyze workflow specifications
-2. Identify optimal task execution order
-3. Detect parallelization opportunities
-4. Suggest improvements and optimizations
-5. Validate dependencies and prerequisites
+1. Review execution plans computed from workflow dependencies and run history
+2. Point out risks and bottlenecks
+3. Suggest improvements and optimizations
+4. Question dependencies that look missing or unnecessary
 
-Provide clear, actionable execution plans in a structured format."""
+Task order, parallel groups and duration estimates are already computed; do not recompute them.
+Provide clear, actionable advice in a structured format."""
     
     def fallback_response(self, prompt: str) -> str:
         return json.dumps({
-            "plan": "sequential",
-            "tasks": [],
-            "notes": "Using fallback sequential execution plan"
+            "risks": [],
+            "optimizations": [],
+            "notes": "AI advice unavailable; plan computed from task dependencies and run history"
         })
     
-    async def plan_workflow(self, spec: WorkflowSpec) -> Dict[str, Any]:
+    async def _cost_model(self) -> CostModel:
+        if self.cost_model is None:
+            # Refits read the database; keep them off the event loop
+            self.cost_model = await asyncio.to_thread(get_cost_model)
+        return self.cost_model
+    
+    def analyze(self, spec: WorkflowSpec, cost_model: CostModel) -> Dict[str, Any]:
+        """
+        Deterministic part of the plan, computed without the LLM.
+        
+        Parallel groups and the critical path come from ``depends_on``;
+        durations come from ``cost_model``. ``estimated_duration_seconds``
+        is for sequential execution (how the orchestrator runs workflows)
+        and ``critical_path_seconds`` is the lower bound when each group
+        runs in parallel.
+        """
+        groups = parallel_groups(spec)
+        estimates = {task.id: cost_model.estimate(task, spec.name) for task in spec.tasks}
+        path, path_seconds = critical_path(spec, {task_id: e.seconds for task_id, e in estimates.items()})
+        overhead = cost_model.overhead_seconds
+        sequential = sum(e.seconds for e in estimates.values()) + overhead
+        
+        if len(groups) == len(spec.tasks):
+            strategy = "sequential"
+        elif len(groups) == 1:
+            strategy = "parallel"
+        else:
+            strategy = "hybrid"
+        
+        return {
+            "workflow_id": spec.id,
+            "execution_strategy": strategy,
+            "task_order": [task_id for group in groups for task_id in group],
+            "parallel_groups": groups,
+            "critical_path": path,
+            "estimated_duration": _format_duration(sequential),
+            "estimated_duration_seconds": round(sequential, 3),
+            "critical_path_seconds": round(path_seconds + overhead, 3),
+            "task_estimates": {
+                task_id: {"seconds": round(e.seconds, 3), "source": e.source, "samples": e.samples}
+                for task_id, e in estimates.items()
+            },
+            "history_runs": cost_model.runs,
+        }
+    
+    async def plan_workflow(self, spec: WorkflowSpec, advice: bool = True) -> Dict[str, Any]:
         """
         Create an intelligent execution plan for a workflow.
         
         Args:
             spec: Workflow specification
+            advice: Ask the LLM for risks and optimizations; without it
+                the plan is returned instantly
         
         Returns:
             Execution plan with task ordering, parallelization, and optimizations
         """
         self.log_action("planning_workflow", workflow_id=spec.id, task_count=len(spec.tasks))
         
-        # Build prompt with workflow details
-        prompt = self._build_planning_prompt(spec)
-        
-        # Get LLM suggestions
-        llm_response = await self.think(prompt)
-        
-        # Parse and structure the plan
-        plan = self._parse_plan(llm_response, spec)
+        plan = self.analyze(spec, await self._cost_model())
+        if advice:
+            # Get LLM suggestions on the computed plan
+            llm_response = await self.think(self._build_planning_prompt(spec, plan))
+            plan.update(self._parse_advice(llm_response))
         
         self.log_action("plan_created", workflow_id=spec.id, plan_type=plan.get("execution_strategy"))
         
         return plan
     
-    def _build_planning_prompt(self, spec: WorkflowSpec) -> str:
-        """Build prompt for workflow planning."""
-        tasks_desc = "\n".join([
-            f"- Task {i+1}: {task.id} (type: {task.type})"
-            for i, task in enumerate(spec.tasks)
-        ])
+    def _build_planning_prompt(self, spec: WorkflowSpec, plan: Dict[str, Any]) -> str:
+        """Build prompt asking for advice on a computed plan."""
+        tasks_desc = truncate_text("\n".join([
+            f"- {task.id} (type: {task.type}"
+            + (f", after: {', '.join(task.depends_on)}" if task.depends_on else "")
+            + f", ~{plan['task_estimates'][task.id]['seconds']}s)"
+            for task in spec.tasks
+        ]), self.budget.share(0.4))
+        groups_desc = fit_json(plan["parallel_groups"], self.budget.share(0.2), indent=None)
         
-        return f"""Analyze this workflow and create an optimal execution plan:
+        return f"""Review this workflow execution plan:
 
 **Workflow**: {spec.name}
 **Description**: {spec.description}
@@ -70,56 +198,37 @@ Provide clear, actionable execution plans in a structured format."""
 **Tasks**:
 {tasks_desc}
 
-**Total Tasks**: {len(spec.tasks)}
+**Parallel groups** (in order): {groups_desc}
+**Critical path**: {" -> ".join(plan["critical_path"])} ({plan["critical_path_seconds"]}s)
+**Estimated duration**: {plan["estimated_duration"]} (from {plan["history_runs"]} past runs)
 
-Please provide:
-1. Recommended execution strategy (sequential, parallel, or hybrid)
-2. Task grouping for parallel execution
-3. Estimated execution time
-4. Potential risks or bottlenecks
-5. Optimization suggestions
-
-Format your response as a structured plan."""
+Respond with JSON: {{"risks": [...], "optimizations": [...], "notes": "..."}}
+- risks: potential risks or bottlenecks
+- optimizations: concrete optimization suggestions"""
     
-    def _parse_plan(self, llm_response: str, spec: WorkflowSpec) -> Dict[str, Any]:
-        """Parse LLM response into structured plan."""
+    def _parse_advice(self, llm_response: str) -> Dict[str, Any]:
+        """Parse the LLM's qualitative advice; structure and timings are not taken from it."""
         # Try to extract JSON if present
         try:
             if "{" in llm_response and "}" in llm_response:
                 start = llm_response.index("{")
                 end = llm_response.rindex("}") + 1
-                plan_data = json.loads(llm_response[start:end])
-                return plan_data
-        except:
+                data = json.loads(llm_response[start:end])
+                if isinstance(data, dict):
+                    return {
+                        "llm_suggestions": str(data.get("notes") or llm_response),
+                        "risks": [str(r) for r in data.get("risks") or []][:5],
+                        "optimizations": [str(o) for o in data.get("optimizations") or []][:5],
+                    }
+        except ValueError:
             pass
         
-        # Fallback: Create structured plan from spec
         return {
-            "workflow_id": spec.id,
-            "execution_strategy": self._detect_strategy(llm_response),
-            "task_order": [task.id for task in spec.tasks],
-            "parallel_groups": self._detect_parallel_groups(llm_response, spec),
-            "estimated_duration": "unknown",
             "llm_suggestions": llm_response,
             "risks": self._extract_risks(llm_response),
             "optimizations": self._extract_optimizations(llm_response)
         }
     
-    def _detect_strategy(self, response: str) -> str:
-        """Detect execution strategy from LLM response."""
-        response_lower = response.lower()
-        if "parallel" in response_lower:
-            return "parallel"
-        elif "hybrid" in response_lower:
-            return "hybrid"
-        return "sequential"
-    
-    def _detect_parallel_groups(self, response: str, spec: WorkflowSpec) -> List[List[str]]:
-        """Detect which tasks can run in parallel."""
-        # Simple heuristic: tasks with no dependencies can run in parallel
-        # In production, this would use dependency analysis
-        return [[task.id] for task in spec.tasks]
-    
     def _extract_risks(self, response: str) -> List[str]:
         """Extract risks from LLM response."""
         risks = []
@@ -138,11 +247,42 @@ Format your response as a structured plan."""
                 optimizations.append(line.strip())
         return optimizations[:5]  # Top 5 suggestions
     
+    async def plan_and_explain(self, spec: WorkflowSpec) -> Dict[str, Any]:
+        """
+        Plan a workflow and explain the plan, reusing a cached result.
+        
+        Returns ``plan``, ``explanation`` and whether they were ``cached``.
+        Results that fell back because the LLM failed are not cached.
+        """
+        key = self.plan_cache.make_key(spec, self.llm) if self.plan_cache else None
+        if key is not None:
+            start = time.perf_counter()
+            cached = await self.plan_cache.get_async(key)
+            if cached is not None:
+                self.log_action(
+                    "plan_cache_hit",
+                    workflow_id=spec.id,
+                    lookup_ms=round((time.perf_counter() - start) * 1000, 2)
+                )
+                # Advice is cached; estimates follow the latest run history
+                plan = {**cached["plan"], **self.analyze(spec, await self._cost_model())}
+                return {**cached, "plan": plan, "cached": True}
+        
+        plan = await self.plan_workflow(spec)
+        fell_back = self.used_fallback
+        explanation = await self.explain_plan(plan)
+        fell_back = fell_back or self.used_fallback
+        
+        result = {"plan": plan, "explanation": explanation}
+        if key is not None and not fell_back:
+            await self.plan_cache.set_async(key, result)
+        return {**result, "cached": False}
+    
     async def explain_plan(self, plan: Dict[str, Any]) -> str:
         """Generate human-friendly explanation of the plan."""
         prompt = f"""Explain this workflow execution plan in simple terms:
 
-{json.dumps(plan, indent=2)}
+{fit_json(plan, self.budget.share(0.7))}
 
 Provide a clear, concise explanation that a non-technical user can understand."""
         
@@ -4,6 +4,8 @@ import json
 import structlog
 
 from .base_agent import BaseAgent
+from ..llm.admission import Priority
+from ..llm.tokens import fit_json, truncate_trace
 
 logger = structlog.get_logger()
 
@@ -11,6 +13,12 @@ logger = structlog.get_logger()
 class RecoveryAgent(BaseAgent):
     """AI-powered error recovery agent."""
     
+    # Runs while a workflow is stalled on a failed task
+    latency_critical = True
+    completion_token_budget = 800
+    # Interactive chat goes first when a provider's quota is tight
+    priority = Priority.BACKGROUND
+    
     def get_system_prompt(self) -> str:
         return """You are an expert error recovery AI assistant. Your role is to:
 
@@ -70,6 +78,9 @@ Be specific, actionable, and prioritize safety."""
         task_context: Dict[str, Any]
     ) -> str:
         """Build prompt for error recovery analysis."""
+        # Errors and params are unbounded; keep the tail of traces and the shape of params
+        error_message = truncate_trace(error_message, self.budget.share(0.25))
+        params = fit_json(task_context.get('params', {}), self.budget.share(0.5))
         return f"""Analyze this task failure and suggest recovery actions:
 
 **Task ID**: {task_id}
@@ -77,7 +88,7 @@ Be specific, actionable, and prioritize safety."""
 **Error Message**: {error_message}
 
 **Task Configuration**:
-{json.dumps(task_context.get('params', {}), indent=2)}
+{params}
 
 **Execution Context**:
 - Attempt: {task_context.get('attempt', 1)}
@@ -189,7 +200,7 @@ Be specific and actionable."""
         prompt = f"""The following approach failed:
 
 **Task**: {task_id}
-**Failed Approach**: {json.dumps(failed_approach, indent=2)}
+**Failed Approach**: {fit_json(failed_approach, self.budget.share(0.7))}
 
 Suggest an alternative approach that might succeed. Be creative but practical."""
         
@@ -1,12 +1,34 @@
 """
 Self-Healing Agent - Automatically attempts to fix failed workflows.
 """
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, Union
+import asyncio
+import json
 from .base_agent import BaseAgent
+from .fix_store import LearnedFixStore, get_fix_store, normalize_error
+from .pipeline import AgentPipeline
 from .recovery_agent import RecoveryAgent
 from ..core.audit import AuditLog
+from ..llm import LLMProvider
 from ..llm.factory import get_llm_provider
 
+# Recovery plans rate their confidence in words
+_CONFIDENCE = {"high": 0.9, "medium": 0.6, "low": 0.3}
+
+# Recovery strategies and the fix types _apply_fix() knows
+_FIX_TYPES = {
+    "retry": "retry_with_backoff",
+    "modify": "adjust_parameters",
+    "skip": "skip_task",
+}
+
+# Learned fixes that fail more often than this are re-analyzed by the LLM
+_MIN_REUSE_SUCCESS_RATE = 0.5
+
+# Failures remembered between analyze_failure() and attempt_fix()
+_MAX_PENDING_FAILURES = 1000
+
 
 class SelfHealingAgent(BaseAgent):
     """
@@ -23,14 +45,29 @@ class SelfHealingAgent(BaseAgent):
     def __init__(
         self,
         audit: Optional[AuditLog] = None,
-        llm_provider: Optional[str] = None,
-        auto_fix_enabled: bool = False
+        llm_provider: Optional[Union[str, LLMProvider]] = None,
+        auto_fix_enabled: bool = False,
+        fix_store: Optional[LearnedFixStore] = None
     ):
-        super().__init__(name="SelfHealingAgent", audit=audit)
-        self.recovery_agent = RecoveryAgent(audit=audit, llm_provider=llm_provider)
+        if isinstance(llm_provider, str):
+            llm_provider = get_llm_provider(llm_provider)
+        super().__init__(llm_provider=llm_provider, audit=audit)
+        self.recovery_agent = RecoveryAgent(llm_provider=self.llm, audit=self.audit)
         self.auto_fix_enabled = auto_fix_enabled
         self.fix_history: List[Dict[str, Any]] = []
-        self.learned_patterns: Dict[str, Dict[str, Any]] = {}
+        # Shared and persistent, so fixes learned by one agent serve them all
+        self.fix_store = fix_store if fix_store is not None else get_fix_store()
+        self._pending: "OrderedDict[Tuple[str, str], Tuple[str, Optional[str]]]" = OrderedDict()
+        
+    def get_system_prompt(self) -> str:
+        return self.recovery_agent.get_system_prompt()
+        
+    def fallback_response(self, prompt: str) -> str:
+        return json.dumps({
+            "recovery_strategy": "manual",
+            "actions": ["Review the failure before retrying"],
+            "confidence": "low"
+        })
         
     async def analyze_failure(
         self,
@@ -49,50 +86,124 @@ class SelfHealingAgent(BaseAgent):
             context: Execution context
             
         Returns:
-            Analysis result with fix suggestions
+            Analysis result with fix suggestions; ``source`` is "failed" or
+            "timeout" if the recovery analysis did not finish
         """
-        self.log_action("analyze_failure", {
-            "workflow_id": workflow_id,
-            "task_id": task_id,
-            "error": error[:100]
-        })
+        self.log_action(
+            "analyze_failure",
+            workflow_id=workflow_id,
+            task_id=task_id,
+            error=error[:100]
+        )
+        
+        # Remember the error, so the outcome of the fix can be learned
+        task_type = context.get("type")
+        self._pending[(workflow_id, task_id)] = (error, task_type)
+        self._pending.move_to_end((workflow_id, task_id))
+        while len(self._pending) > _MAX_PENDING_FAILURES:
+            self._pending.popitem(last=False)
         
-        # Check if we've seen this error before
-        error_signature = self._get_error_signature(error)
-        learned_fix = self.learned_patterns.get(error_signature)
+        # Check if we've seen this error, or one like it, before
+        match = self.fix_store.match(error, task_type)
         
-        if learned_fix:
-            self.log_action("learned_fix_found", {
-                "error_signature": error_signature,
-                "success_rate": learned_fix.get("success_rate", 0)
-            })
+        if match and match.fix.success_rate >= _MIN_REUSE_SUCCESS_RATE:
+            learned_fix = match.fix
+            self.log_action(
+                "learned_fix_found",
+                error_signature=learned_fix.signature,
+                similarity=match.similarity,
+                success_rate=learned_fix.success_rate
+            )
             
             return {
-                "can_auto_fix": learned_fix["success_rate"] > 0.7,
-                "fix_strategy": learned_fix["strategy"],
-                "confidence": learned_fix["success_rate"],
-                "source": "learned"
+                "can_auto_fix": learned_fix.success_rate > 0.7,
+                "fix_strategy": learned_fix.strategy,
+                "confidence": learned_fix.success_rate,
+                "source": "learned",
+                "similarity": match.similarity,
+                "attempts": learned_fix.attempts
             }
             
-        # Use recovery agent to generate fix
-        recovery_result = await self.recovery_agent.suggest_recovery(
-            error_message=error,
-            task_context=context
-        )
+        # Use recovery agent to generate fix; a task that already failed a
+        # retry also gets an alternative approach, asked for in parallel
+        pipeline = AgentPipeline("self_healing")
+        pipeline.add("recovery", self.recovery_agent.analyze_failure, task_id, error, context)
+        if context.get("previous_attempts", 0) > 0:
+            pipeline.add(
+                "alternative",
+                self.recovery_agent.suggest_alternative_approach,
+                task_id,
+                {"type": context.get("type"), "params": context.get("params", {}), "error": error}
+            )
+        result = await pipeline.run()
+        if not result.ok("recovery"):
+            return {
+                "can_auto_fix": False,
+                "fix_strategy": {},
+                "confidence": 0,
+                "source": result.branches["recovery"].status,
+                "error": result.branches["recovery"].error
+            }
+        recovery_result = result["recovery"]
         
-        return {
+        analysis = {
             "can_auto_fix": self._is_safe_to_auto_fix(recovery_result),
-            "fix_strategy": recovery_result.get("suggestions", []),
-            "confidence": recovery_result.get("confidence", 0),
+            "fix_strategy": self._fix_strategy(recovery_result),
+            "confidence": self._confidence(recovery_result),
             "source": "generated"
         }
+        if result.ok("alternative"):
+            analysis["alternative_approach"] = result["alternative"]["alternative_approach"]
+        return analysis
+    
+    async def analyze_failures(
+        self,
+        workflow_id: str,
+        failures: List[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze several failed tasks of a workflow at once.
+        
+        Args:
+            workflow_id: Workflow identifier
+            failures: Dicts with ``task_id``, ``error`` and optional ``context``
+            
+        Returns:
+            Analysis per task ID; a task whose analysis failed or timed out
+            gets ``can_auto_fix`` False, ``source`` "failed" or "timeout"
+            and the ``error``
+        """
+        pipeline = AgentPipeline("self_healing_batch")
+        for failure in failures:
+            pipeline.add(
+                failure["task_id"],
+                self.analyze_failure,
+                workflow_id,
+                failure["task_id"],
+                failure["error"],
+                failure.get("context") or {}
+            )
+        result = await pipeline.run()
+        
+        analyses = {}
+        for task_id, branch in result.branches.items():
+            analyses[task_id] = branch.value if branch.ok else {
+                "can_auto_fix": False,
+                "fix_strategy": {},
+                "confidence": 0,
+                "source": branch.status,
+                "error": branch.error
+            }
+        return analyses
         
     async def attempt_fix(
         self,
         workflow_id: str,
         task_id: str,
         fix_strategy: Dict[str, Any],
-        require_approval: bool = True
+        require_approval: bool = True,
+        error: Optional[str] = None,
+        task_type: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Attempt to fix a failed workflow.
@@ -102,15 +213,19 @@ class SelfHealingAgent(BaseAgent):
             task_id: Failed task identifier
             fix_strategy: Fix strategy to apply
             require_approval: Whether to require human approval
+            error: Error being fixed; defaults to the one last passed to
+                analyze_failure() for this task
+            task_type: Plugin type of the task, likewise
             
         Returns:
             Fix result
         """
-        self.log_action("attempt_fix", {
-            "workflow_id": workflow_id,
-            "task_id": task_id,
-            "require_approval": require_approval
-        })
+        self.log_action(
+            "attempt_fix",
+            workflow_id=workflow_id,
+            task_id=task_id,
+            require_approval=require_approval
+        )
         
         if require_approval and not self.auto_fix_enabled:
             return {
@@ -119,6 +234,10 @@ class SelfHealingAgent(BaseAgent):
                 "fix_strategy": fix_strategy
             }
             
+        if error is None:
+            error, pending_type = self._pending.pop((workflow_id, task_id), (None, None))
+            task_type = task_type or pending_type
+            
         try:
             # Apply fix (implementation depends on fix type)
             result = await self._apply_fix(workflow_id, task_id, fix_strategy)
@@ -133,19 +252,21 @@ class SelfHealingAgent(BaseAgent):
             }
             self.fix_history.append(fix_record)
             
-            # Learn from this fix
-            if result.get("success"):
-                self._learn_from_fix(fix_strategy, success=True)
+            # Learn from this fix; the store writes to SQLite
+            await asyncio.to_thread(
+                self._learn_from_fix, error, task_type, fix_strategy, success=bool(result.get("success"))
+            )
                 
             return result
             
         except Exception as e:
-            self.log_action("fix_failed", {
-                "workflow_id": workflow_id,
-                "error": str(e)
-            })
+            self.log_action(
+                "fix_failed",
+                workflow_id=workflow_id,
+                error=str(e)
+            )
             
-            self._learn_from_fix(fix_strategy, success=False)
+            await asyncio.to_thread(self._learn_from_fix, error, task_type, fix_strategy, success=False)
             
             return {
                 "status": "failed",
@@ -185,11 +306,28 @@ class SelfHealingAgent(BaseAgent):
                 "message": f"Unknown fix strategy: {strategy_type}"
             }
             
-    def _get_error_signature(self, error: str) -> str:
-        """Generate a signature for an error to match against learned patterns."""
-        # Simple signature based on error type and first few words
-        words = error.lower().split()[:5]
-        return "_".join(words)
+    def _get_error_signature(self, error: str, task_type: Optional[str] = None) -> str:
+        """Signature an error is learned under; equal for errors differing only in IDs, paths or numbers."""
+        return self.fix_store.signature(normalize_error(error), task_type or "")
+        
+    def _confidence(self, recovery_result: Dict[str, Any]) -> float:
+        """Recovery plan confidence as a number between 0 and 1."""
+        confidence = recovery_result.get("confidence", 0)
+        if isinstance(confidence, str):
+            return _CONFIDENCE.get(confidence.lower(), 0.0)
+        try:
+            return float(confidence)
+        except (TypeError, ValueError):
+            return 0.0
+        
+    def _fix_strategy(self, recovery_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Fix strategy for attempt_fix() from a recovery plan."""
+        strategy = str(recovery_result.get("recovery_strategy", "unknown")).lower()
+        return {
+            "type": _FIX_TYPES.get(strategy, strategy),
+            "actions": recovery_result.get("actions", []),
+            "modified_params": recovery_result.get("modified_params", {})
+        }
         
     def _is_safe_to_auto_fix(self, recovery_result: Dict[str, Any]) -> bool:
         """Determine if a fix is safe to apply automatically."""
@@ -198,12 +336,15 @@ class SelfHealingAgent(BaseAgent):
         # 2. Fix doesn't involve destructive operations
         # 3. Fix is a known safe pattern
         
-        confidence = recovery_result.get("confidence", 0)
-        suggestions = recovery_result.get("suggestions", [])
+        confidence = self._confidence(recovery_result)
+        suggestions = recovery_result.get("actions", [])
         
         if confidence < 0.8:
             return False
             
+        if self._fix_strategy(recovery_result)["type"] not in _FIX_TYPES.values():
+            return False
+            
         # Check for destructive operations
         destructive_keywords = ["delete", "remove", "drop", "truncate"]
         for suggestion in suggestions:
@@ -213,39 +354,34 @@ class SelfHealingAgent(BaseAgent):
                 
         return True
         
-    def _learn_from_fix(self, fix_strategy: Dict[str, Any], success: bool) -> None:
+    def _learn_from_fix(
+        self,
+        error: Optional[str],
+        task_type: Optional[str],
+        fix_strategy: Dict[str, Any],
+        success: bool
+    ) -> None:
         """Learn from a fix attempt to improve future recommendations."""
-        strategy_signature = str(fix_strategy.get("type", "unknown"))
-        
-        if strategy_signature not in self.learned_patterns:
-            self.learned_patterns[strategy_signature] = {
-                "strategy": fix_strategy,
-                "attempts": 0,
-                "successes": 0,
-                "success_rate": 0.0
-            }
-            
-        pattern = self.learned_patterns[strategy_signature]
-        pattern["attempts"] += 1
-        
-        if success:
-            pattern["successes"] += 1
-            
-        pattern["success_rate"] = pattern["successes"] / pattern["attempts"]
+        if error is None:
+            # Not analyzed here and no error given; nothing to key it on
+            return
+        fix = self.fix_store.record(error, fix_strategy, success, task_type)
         
-        self.log_action("learned_pattern_updated", {
-            "strategy": strategy_signature,
-            "success_rate": pattern["success_rate"],
-            "attempts": pattern["attempts"]
-        })
+        self.log_action(
+            "learned_pattern_updated",
+            error_signature=fix.signature,
+            strategy=str(fix_strategy.get("type", "unknown")),
+            success_rate=fix.success_rate,
+            attempts=fix.attempts
+        )
         
     def get_fix_history(self) -> List[Dict[str, Any]]:
         """Get history of fix attempts."""
         return self.fix_history
         
     def get_learned_patterns(self) -> Dict[str, Dict[str, Any]]:
-        """Get learned fix patterns."""
-        return self.learned_patterns
+        """Get learned fix patterns by error signature."""
+        return self.fix_store.patterns()
         
     def get_statistics(self) -> Dict[str, Any]:
         """Get self-healing statistics."""
@@ -256,6 +392,7 @@ class SelfHealingAgent(BaseAgent):
             "total_fix_attempts": total_attempts,
             "successful_fixes": successful_fixes,
             "success_rate": successful_fixes / total_attempts if total_attempts > 0 else 0,
-            "learned_patterns": len(self.learned_patterns),
+            "learned_patterns": len(self.fix_store),
+            "learned_fix_lookups": self.fix_store.stats(),
             "auto_fix_enabled": self.auto_fix_enabled
         }
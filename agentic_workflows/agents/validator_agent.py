@@ -1,17 +1,74 @@
 """Validator Agent - Validates and auto-fixes workflow specs using LLM."""
 from typing import Dict, Any, List, Optional, Tuple
+import hashlib
 import json
+import threading
 import structlog
 
 from .base_agent import BaseAgent
-from ..core.spec import WorkflowSpec
+from .pipeline import AgentPipeline
+from ..config import get_settings
+from ..core.audit import AuditLog
+from ..core.spec import WorkflowSpec, spec_hash
+from ..core.validation import has_errors, validate_spec
+from ..llm import LLMProvider
+from ..llm.cache import ResultCache, create_cache_backend
+from ..llm.tokens import fit_json, truncate_text
 
 logger = structlog.get_logger()
 
+# Bump when the review prompt or parsing change, so cached reviews are redone
+VALIDATOR_VERSION = "1"
+
+
+class ValidationCache(ResultCache):
+    """LLM review issues keyed by spec content, validator version and model."""
+    
+    name = "validation"
+    
+    @staticmethod
+    def make_key(spec: WorkflowSpec, llm: LLMProvider) -> str:
+        model = getattr(llm.model, "value", llm.model)
+        payload = f"{VALIDATOR_VERSION}:{llm.provider_name}:{model}:{spec_hash(spec)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+_validation_cache: Optional[ValidationCache] = None
+_validation_cache_lock = threading.Lock()
+
+
+def get_validation_cache() -> ValidationCache:
+    """Return the process-wide validation cache configured in settings."""
+    global _validation_cache
+    with _validation_cache_lock:
+        if _validation_cache is None:
+            _validation_cache = ValidationCache(
+                create_cache_backend(table="validation_cache", prefix="validation_cache:"),
+                ttl=get_settings().plan_cache_ttl_seconds
+            )
+        return _validation_cache
+
 
 class ValidatorAgent(BaseAgent):
     """AI-powered workflow validator."""
     
+    # Deterministic output: same spec, same answer, served from the LLM cache
+    temperature = 0.0
+    completion_token_budget = 1000
+    
+    def __init__(
+        self,
+        llm_provider: Optional[LLMProvider] = None,
+        audit: Optional[AuditLog] = None,
+        validation_cache: Optional[ValidationCache] = None
+    ):
+        super().__init__(llm_provider, audit)
+        if validation_cache is None and get_settings().plan_cache_enabled:
+            validation_cache = get_validation_cache()
+        self.validation_cache = validation_cache
+        # Whether the last validate_workflow() included an LLM review
+        self.llm_reviewed = False
+    
     def get_system_prompt(self) -> str:
         return """You are an expert workflow validation AI assistant. Your role is to:
 
@@ -33,31 +90,82 @@ Be thorough, specific, and prioritize safety and reliability."""
     async def validate_workflow(
         self,
         spec: WorkflowSpec,
-        auto_fix: bool = False
+        auto_fix: bool = False,
+        llm_review: Optional[bool] = None
     ) -> Tuple[bool, List[Dict[str, Any]], Optional[WorkflowSpec]]:
         """
         Validate a workflow specification.
         
+        Structural, parameter and dependency checks always run and take
+        microseconds. The LLM review runs when ``llm_review`` is True, or by
+        default only when those checks found no errors; its issues are
+        cached per spec content.
+        
         Args:
             spec: Workflow specification to validate
             auto_fix: Whether to attempt automatic fixes
+            llm_review: Force (True) or skip (False) the LLM review
         
         Returns:
             Tuple of (is_valid, issues, fixed_spec)
         """
+        is_valid, issues, fixed_spec, _ = await self._validate(spec, auto_fix, llm_review, suggest=False)
+        return is_valid, issues, fixed_spec
+    
+    async def validate_and_suggest(
+        self,
+        spec: WorkflowSpec,
+        auto_fix: bool = False,
+        llm_review: Optional[bool] = None
+    ) -> Tuple[bool, List[Dict[str, Any]], Optional[WorkflowSpec], List[str]]:
+        """
+        ``validate_workflow()`` plus ``suggest_improvements()`` for a valid spec.
+        
+        The suggestions are requested alongside the LLM review rather than
+        after it, so both cost one round trip; they are dropped if the
+        review finds errors.
+        
+        Returns:
+            Tuple of (is_valid, issues, fixed_spec, suggestions)
+        """
+        return await self._validate(spec, auto_fix, llm_review, suggest=True)
+    
+    async def _validate(
+        self,
+        spec: WorkflowSpec,
+        auto_fix: bool,
+        llm_review: Optional[bool],
+        suggest: bool
+    ) -> Tuple[bool, List[Dict[str, Any]], Optional[WorkflowSpec], List[str]]:
         self.log_action("validating_workflow", workflow_id=spec.id, auto_fix=auto_fix)
         
         # Basic validation
         basic_issues = self._basic_validation(spec)
         
-        # LLM-powered validation
-        prompt = self._build_validation_prompt(spec)
-        llm_response = await self.think(prompt)
+        if llm_review is None:
+            llm_review = not has_errors(basic_issues)
         
-        llm_issues = self._parse_validation_response(llm_response)
+        # LLM-powered validation, with the suggestions in parallel
+        llm_issues: List[Dict[str, Any]] = []
+        suggestions: List[str] = []
+        if llm_review:
+            pipeline = AgentPipeline("validate")
+            pipeline.add("review", self._llm_validation, spec)
+            if suggest and not has_errors(basic_issues):
+                pipeline.add("suggestions", self.suggest_improvements, spec, default=[])
+            result = await pipeline.run()
+            if result.ok("review"):
+                llm_issues = result["review"]
+            else:
+                # Still report the structural checks
+                llm_review = False
+            suggestions = result.get("suggestions", [])
+        self.llm_reviewed = llm_review
         
         all_issues = basic_issues + llm_issues
-        is_valid = len([i for i in all_issues if i["severity"] == "error"]) == 0
+        is_valid = not has_errors(all_issues)
+        if not is_valid:
+            suggestions = []
         
         fixed_spec = None
         if auto_fix and not is_valid:
@@ -67,76 +175,39 @@ Be thorough, specific, and prioritize safety and reliability."""
             "validation_complete",
             workflow_id=spec.id,
             is_valid=is_valid,
-            issue_count=len(all_issues)
+            issue_count=len(all_issues),
+            llm_reviewed=llm_review
         )
         
-        return is_valid, all_issues, fixed_spec
+        return is_valid, all_issues, fixed_spec, suggestions
     
-    def _basic_validation(self, spec: WorkflowSpec) -> List[Dict[str, Any]]:
-        """Perform basic validation checks."""
-        issues = []
+    async def _llm_validation(self, spec: WorkflowSpec) -> List[Dict[str, Any]]:
+        """LLM review issues, reused for an unchanged spec."""
+        key = self.validation_cache.make_key(spec, self.llm) if self.validation_cache else None
+        if key is not None:
+            cached = await self.validation_cache.get_async(key)
+            if cached is not None:
+                self.log_action("validation_cache_hit", workflow_id=spec.id)
+                return cached["issues"]
         
-        # Check required fields
-        if not spec.id:
-            issues.append({
-                "severity": "error",
-                "field": "id",
-                "message": "Workflow ID is required",
-                "fix": "Add a unique workflow ID"
-            })
-        
-        if not spec.name:
-            issues.append({
-                "severity": "error",
-                "field": "name",
-                "message": "Workflow name is required",
-                "fix": "Add a descriptive workflow name"
-            })
-        
-        if not spec.tasks or len(spec.tasks) == 0:
-            issues.append({
-                "severity": "error",
-                "field": "tasks",
-                "message": "Workflow must have at least one task",
-                "fix": "Add tasks to the workflow"
-            })
-        
-        # Check task IDs are unique
-        task_ids = [task.id for task in spec.tasks]
-        if len(task_ids) != len(set(task_ids)):
-            issues.append({
-                "severity": "error",
-                "field": "tasks",
-                "message": "Task IDs must be unique",
-                "fix": "Ensure each task has a unique ID"
-            })
-        
-        # Check each task
-        for i, task in enumerate(spec.tasks):
-            if not task.id:
-                issues.append({
-                    "severity": "error",
-                    "field": f"tasks[{i}].id",
-                    "message": f"Task {i+1} is missing an ID",
-                    "fix": f"Add an ID to task {i+1}"
-                })
-            
-            if not task.type:
-                issues.append({
-                    "severity": "error",
-                    "field": f"tasks[{i}].type",
-                    "message": f"Task {task.id} is missing a type",
-                    "fix": f"Specify a plugin type for task {task.id}"
-                })
+        prompt = self._build_validation_prompt(spec)
+        llm_response = await self.think(prompt)
+        issues = self._parse_validation_response(llm_response)
         
+        if key is not None and not self.used_fallback:
+            await self.validation_cache.set_async(key, {"issues": issues})
         return issues
     
+    def _basic_validation(self, spec: WorkflowSpec) -> List[Dict[str, Any]]:
+        """Perform basic validation checks (see ``core.validation``)."""
+        return validate_spec(spec)
+    
     def _build_validation_prompt(self, spec: WorkflowSpec) -> str:
         """Build prompt for workflow validation."""
-        tasks_desc = "\n".join([
+        tasks_desc = truncate_text("\n".join([
             f"- {task.id}: type={task.type}, params={list(task.params.keys())}"
             for task in spec.tasks
-        ])
+        ]), self.budget.share(0.6))
         
         return f"""Validate this workflow specification and identify any issues:
 
@@ -214,15 +285,15 @@ Format as a structured list."""
         prompt = f"""Given this workflow specification and its issues, provide a corrected version:
 
 **Original Spec**:
-{json.dumps({
+{fit_json({
     'id': spec.id,
     'name': spec.name,
     'description': spec.description,
     'tasks': [{'id': t.id, 'type': t.type, 'params': t.params} for t in spec.tasks]
-}, indent=2)}
+}, self.budget.share(0.6))}
 
 **Issues**:
-{json.dumps(issues, indent=2)}
+{fit_json(issues, self.budget.share(0.25))}
 
 Provide the corrected workflow specification in valid YAML or JSON format."""
         
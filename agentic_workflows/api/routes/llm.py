@@ -1,12 +1,26 @@
 """LLM-powered AI endpoints."""
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Callable
+import json
+import re
+import time
 import structlog
+import yaml
 
 from ...agents import PlannerAgent, RecoveryAgent, ValidatorAgent
-from ...core.spec import WorkflowSpec, load_spec
+from ...agents.planner_agent import get_plan_cache
+from ...agents.validator_agent import get_validation_cache
+from ...core.exceptions import WorkflowValidationError
+from ...core.spec import parse_spec
 from ...llm import get_llm_provider
+from ...llm.admission import Priority, admission_snapshot, request_priority
+from ...llm.base import LLMProvider, LLMResponse, merge_chunks
+from ...llm.cache import get_completion_cache
+from ...llm.coalesce import get_single_flight
+from ...llm.router import provider_health_snapshot
+from ...llm.tokens import get_token_meter
 
 router = APIRouter()
 logger = structlog.get_logger()
@@ -16,6 +30,8 @@ class PlanRequest(BaseModel):
     """Request to plan a workflow."""
     workflow_spec: Dict[str, Any]
     provider: Optional[str] = None
+    # False returns the computed plan and ETA without asking the LLM
+    advice: bool = True
 
 
 class RecoveryRequest(BaseModel):
@@ -31,6 +47,8 @@ class ValidationRequest(BaseModel):
     workflow_spec: Dict[str, Any]
     auto_fix: bool = False
     provider: Optional[str] = None
+    # None reviews with the LLM only if the structural checks pass
+    llm_review: Optional[bool] = None
 
 
 class LLMTestRequest(BaseModel):
@@ -52,34 +70,195 @@ class GenerateWorkflowRequest(BaseModel):
     provider: Optional[str] = None
 
 
+DEMO_MODE_MESSAGE = (
+    "I'm currently running in demo mode. To enable full AI capabilities, please configure "
+    "an LLM provider (OpenAI or Claude) in your environment variables."
+)
+
+
+def _chat_prompt(request: ChatRequest) -> str:
+    """Build the context-aware assistant prompt for a chat message."""
+    system_prompt = """You are an AI assistant for Agentic Workflows, an enterprise workflow automation platform.
+You help users design, troubleshoot, and optimize their workflows. Be concise, practical, and focus on actionable advice."""
+    
+    context_info = ""
+    if request.context:
+        context_info = f"\n\nContext: {request.context}"
+    
+    return f"{system_prompt}\n\nUser: {request.message}{context_info}\n\nAssistant:"
+
+
+def _workflow_prompt(description: str) -> str:
+    """Build the workflow generation prompt."""
+    return f"""Generate a workflow specification in YAML format for the following requirement:
+
+{description}
+
+The workflow should include:
+- A descriptive name
+- Clear description
+- List of tasks with appropriate plugins (file_organizer, email_summarizer, http_task)
+- Task dependencies if needed
+- Proper error handling
+
+Return only valid YAML that follows this structure:
+```yaml
+name: Workflow Name
+description: Description
+tasks:
+  - id: task_1
+    type: plugin_name
+    params:
+      key: value
+    depends_on: []
+```"""
+
+
+def _parse_workflow(content: str, description: str) -> Dict[str, Any]:
+    """Extract the YAML workflow from a completion, keeping the raw text if it does not parse."""
+    # Try to extract YAML from code blocks
+    yaml_match = re.search(r'```(?:yaml)?\n(.*?)\n```', content, re.DOTALL)
+    if yaml_match:
+        yaml_content = yaml_match.group(1)
+    else:
+        yaml_content = content
+    
+    try:
+        return yaml.safe_load(yaml_content)
+    except yaml.YAMLError:
+        # If parsing fails, return raw response
+        return {
+            "name": "Generated Workflow",
+            "description": description,
+            "raw_response": content
+        }
+
+
+def _template_workflow(description: str) -> Dict[str, Any]:
+    """Single-task workflow returned when generation is not possible."""
+    return {
+        "name": "Generated Workflow",
+        "description": description,
+        "tasks": [
+            {
+                "id": "task_1",
+                "type": "http_task",
+                "params": {
+                    "url": "https://api.example.com/data",
+                    "method": "GET"
+                }
+            }
+        ]
+    }
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_completion(
+    llm: LLMProvider,
+    prompt: str,
+    endpoint: str,
+    finish: Optional[Callable[[LLMResponse], Dict[str, Any]]] = None
+) -> AsyncIterator[str]:
+    """
+    Relay a streamed completion as ``delta`` events followed by ``done``.
+    
+    ``done`` carries usage and time to first token, plus whatever ``finish``
+    derives from the assembled response. Failures after the stream has
+    started are reported as an ``error`` event.
+    """
+    start = time.perf_counter()
+    first_token_ms = None
+    chunks = []
+    try:
+        # A user is watching this stream
+        with request_priority(Priority.INTERACTIVE):
+            async for chunk in llm.stream_complete(prompt):
+                chunks.append(chunk)
+                if not chunk.content:
+                    continue
+                if first_token_ms is None:
+                    first_token_ms = round((time.perf_counter() - start) * 1000, 1)
+                yield _sse("delta", {"content": chunk.content})
+        
+        response = merge_chunks(chunks)
+        done = {
+            "status": "success",
+            "provider": response.model,
+            "tokens_used": response.tokens_used,
+            "finish_reason": response.finish_reason,
+            "time_to_first_token_ms": first_token_ms,
+        }
+        if finish:
+            done.update(finish(response))
+        logger.info(
+            "llm_stream_completed",
+            endpoint=endpoint,
+            provider=llm.provider_name,
+            time_to_first_token_ms=first_token_ms,
+            duration_ms=round((time.perf_counter() - start) * 1000, 1)
+        )
+        yield _sse("done", done)
+    except Exception as e:
+        logger.error("llm_stream_failed", endpoint=endpoint, error=str(e))
+        yield _sse("error", {"status": "error", "error": str(e)})
+
+
+def _event_stream(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Stop reverse proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/plan")
 async def plan_workflow(request: PlanRequest):
     """
     Generate AI-powered execution plan for a workflow.
     
     Uses LLM to analyze the workflow and suggest optimal execution strategy.
+    Plans are cached per spec content, so reopening an unchanged workflow
+    returns without calling the LLM.
     """
     try:
         # Create workflow spec from dict
-        spec = WorkflowSpec(**request.workflow_spec)
+        spec = parse_spec(request.workflow_spec)
         
         # Create planner with specified provider
         llm = get_llm_provider(request.provider) if request.provider else None
         planner = PlannerAgent(llm_provider=llm)
         
-        # Generate plan
-        plan = await planner.plan_workflow(spec)
+        if not request.advice:
+            return {
+                "status": "success",
+                "plan": await planner.plan_workflow(spec, advice=False),
+                "explanation": None,
+                "cached": False,
+                "provider": None
+            }
         
-        # Get explanation
-        explanation = await planner.explain_plan(plan)
+        # Generate plan and explanation (or reuse them)
+        with request_priority(Priority.INTERACTIVE):
+            result = await planner.plan_and_explain(spec)
         
         return {
             "status": "success",
-            "plan": plan,
-            "explanation": explanation,
+            "plan": result["plan"],
+            "explanation": result["explanation"],
+            "cached": result["cached"],
             "provider": planner.llm.model
         }
     
+    except (ValueError, WorkflowValidationError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid workflow spec: {str(e)}"
+        )
     except Exception as e:
         logger.error("plan_workflow_failed", error=str(e))
         raise HTTPException(
@@ -126,33 +305,43 @@ async def validate_workflow(request: ValidationRequest):
     """
     Validate workflow specification using AI.
     
-    Checks for errors, warnings, and suggests improvements.
+    Checks for errors, warnings, and suggests improvements. Structural,
+    plugin parameter and dependency checks answer instantly; the AI review
+    only runs when they pass (or when ``llm_review`` asks for it).
     """
     try:
-        # Create workflow spec from dict
-        spec = WorkflowSpec(**request.workflow_spec)
+        # Create workflow spec from dict; a malformed spec is a validation result
+        try:
+            spec = parse_spec(request.workflow_spec)
+        except ValueError as e:
+            return {
+                "status": "success",
+                "is_valid": False,
+                "issues": [{"severity": "error", "field": "spec", "message": str(e), "fix": "Fix the spec structure"}],
+                "suggestions": [],
+                "fixed_spec": None,
+                "llm_reviewed": False,
+                "provider": None
+            }
         
         # Create validator
         llm = get_llm_provider(request.provider) if request.provider else None
         validator = ValidatorAgent(llm_provider=llm)
         
-        # Validate
-        is_valid, issues, fixed_spec = await validator.validate_workflow(
+        # Validate; suggestions for a valid spec are fetched alongside the review
+        is_valid, issues, fixed_spec, suggestions = await validator.validate_and_suggest(
             spec,
-            auto_fix=request.auto_fix
+            auto_fix=request.auto_fix,
+            llm_review=request.llm_review
         )
         
-        # Get suggestions if valid
-        suggestions = []
-        if is_valid:
-            suggestions = await validator.suggest_improvements(spec)
-        
         return {
             "status": "success",
             "is_valid": is_valid,
             "issues": issues,
             "suggestions": suggestions,
             "fixed_spec": fixed_spec.dict() if fixed_spec else None,
+            "llm_reviewed": validator.llm_reviewed,
             "provider": validator.llm.model
         }
     
@@ -181,7 +370,8 @@ async def test_llm_provider(request: LLMTestRequest):
                 "message": "Provider not available (check API key)"
             }
         
-        response = await llm.complete(request.prompt)
+        with request_priority(Priority.INTERACTIVE):
+            response = await llm.complete(request.prompt)
         
         return {
             "status": "success",
@@ -213,20 +403,11 @@ async def chat_with_ai(request: ChatRequest):
             return {
                 "status": "unavailable",
                 "message": "AI provider not available. Using fallback response.",
-                "response": "I'm currently running in demo mode. To enable full AI capabilities, please configure an LLM provider (OpenAI or Claude) in your environment variables."
+                "response": DEMO_MODE_MESSAGE
             }
         
-        # Build context-aware prompt
-        system_prompt = """You are an AI assistant for Agentic Workflows, an enterprise workflow automation platform.
-You help users design, troubleshoot, and optimize their workflows. Be concise, practical, and focus on actionable advice."""
-        
-        context_info = ""
-        if request.context:
-            context_info = f"\n\nContext: {request.context}"
-        
-        full_prompt = f"{system_prompt}\n\nUser: {request.message}{context_info}\n\nAssistant:"
-        
-        response = await llm.complete(full_prompt)
+        with request_priority(Priority.INTERACTIVE):
+            response = await llm.complete(_chat_prompt(request))
         
         return {
             "status": "success",
@@ -258,18 +439,7 @@ async def generate_workflow(request: GenerateWorkflowRequest):
         if not llm.is_available():
             # Return a template workflow
             template = {
-                "name": "Generated Workflow",
-                "description": request.description,
-                "tasks": [
-                    {
-                        "id": "task_1",
-                        "type": "http_task",
-                        "params": {
-                            "url": "https://api.example.com/data",
-                            "method": "GET"
-                        }
-                    }
-                ],
+                **_template_workflow(request.description),
                 "note": "This is a template. Configure an AI provider for intelligent workflow generation."
             }
             return {
@@ -278,52 +448,10 @@ async def generate_workflow(request: GenerateWorkflowRequest):
                 "message": "AI provider not available. Returning template workflow."
             }
         
-        # Build workflow generation prompt
-        prompt = f"""Generate a workflow specification in YAML format for the following requirement:
-
-{request.description}
-
-The workflow should include:
-- A descriptive name
-- Clear description
-- List of tasks with appropriate plugins (file_organizer, email_summarizer, http_task)
-- Task dependencies if needed
-- Proper error handling
-
-Return only valid YAML that follows this structure:
-```yaml
-name: Workflow Name
-description: Description
-tasks:
-  - id: task_1
-    type: plugin_name
-    params:
-      key: value
-    depends_on: []
-```"""
-        
-        response = await llm.complete(prompt)
-        
-        # Extract YAML from response
-        import yaml
-        import re
+        with request_priority(Priority.INTERACTIVE):
+            response = await llm.complete(_workflow_prompt(request.description))
         
-        # Try to extract YAML from code blocks
-        yaml_match = re.search(r'```(?:yaml)?\n(.*?)\n```', response.content, re.DOTALL)
-        if yaml_match:
-            yaml_content = yaml_match.group(1)
-        else:
-            yaml_content = response.content
-        
-        try:
-            workflow_spec = yaml.safe_load(yaml_content)
-        except yaml.YAMLError:
-            # If parsing fails, return raw response
-            workflow_spec = {
-                "name": "Generated Workflow",
-                "description": request.description,
-                "raw_response": response.content
-            }
+        workflow_spec = _parse_workflow(response.content, request.description)
         
         return {
             "status": "success",
@@ -335,28 +463,60 @@ tasks:
     except Exception as e:
         logger.error("generate_workflow_failed", error=str(e))
         # Return template on error
-        template = {
-            "name": "Generated Workflow",
-            "description": request.description,
-            "tasks": [
-                {
-                    "id": "task_1",
-                    "type": "http_task",
-                    "params": {
-                        "url": "https://api.example.com/data",
-                        "method": "GET"
-                    }
-                }
-            ]
-        }
         return {
             "status": "error",
-            "workflow": template,
+            "workflow": _template_workflow(request.description),
             "error": str(e),
             "message": "Failed to generate workflow. Returning template."
         }
 
 
+@router.post("/chat/stream")
+async def chat_with_ai_stream(request: ChatRequest):
+    """
+    Streaming variant of ``/chat`` using server-sent events.
+    
+    Emits ``delta`` events with text as it is generated, then a ``done``
+    event with usage and time to first token, or an ``error`` event.
+    """
+    llm = get_llm_provider(request.provider)
+    
+    if not llm.is_available():
+        async def unavailable():
+            yield _sse("delta", {"content": DEMO_MODE_MESSAGE})
+            yield _sse("done", {"status": "unavailable"})
+        return _event_stream(unavailable())
+    
+    return _event_stream(_stream_completion(llm, _chat_prompt(request), "chat"))
+
+
+@router.post("/generate-workflow/stream")
+async def generate_workflow_stream(request: GenerateWorkflowRequest):
+    """
+    Streaming variant of ``/generate-workflow`` using server-sent events.
+    
+    The YAML is streamed as ``delta`` events; the ``done`` event carries the
+    parsed workflow.
+    """
+    llm = get_llm_provider(request.provider)
+    
+    if not llm.is_available():
+        async def unavailable():
+            yield _sse("done", {
+                "status": "template",
+                "workflow": _template_workflow(request.description),
+                "message": "AI provider not available. Returning template workflow."
+            })
+        return _event_stream(unavailable())
+    
+    def finish(response: LLMResponse) -> Dict[str, Any]:
+        return {"workflow": _parse_workflow(response.content, request.description)}
+    
+    return _event_stream(
+        _stream_completion(llm, _workflow_prompt(request.description), "generate_workflow", finish)
+    )
+
+
 @router.get("/providers")
 async def list_providers():
     """List available LLM providers and their status."""
@@ -379,5 +539,40 @@ async def list_providers():
     
     return {
         "status": "success",
-        "providers": providers
+        "providers": providers,
+        # Latency and error EWMAs used by LLM_PROVIDER=router
+        "routing": provider_health_snapshot(),
+        # Per-provider concurrency, RPM/TPM usage and queue depth
+        "admission": admission_snapshot()
+    }
+
+
+@router.get("/cache/stats")
+def cache_stats():
+    """Completion cache hit/miss counts, tokens saved, coalesced requests, plan and validation caches."""
+    # Sync handler: counting SQLite/Redis entries runs in the threadpool
+    return {
+        "status": "success",
+        "cache": get_completion_cache().stats(),
+        "coalescing": get_single_flight().stats(),
+        "plans": get_plan_cache().stats(),
+        "validations": get_validation_cache().stats()
+    }
+
+
+@router.get("/usage")
+async def token_usage():
+    """Prompt and completion tokens consumed per provider and model."""
+    return {
+        "status": "success",
+        "usage": get_token_meter().snapshot()
     }
+
+
+@router.delete("/cache")
+def clear_cache():
+    """Drop every cached completion, plan and validation result."""
+    get_completion_cache().clear()
+    get_plan_cache().clear()
+    get_validation_cache().clear()
+    return {"status": "success"}
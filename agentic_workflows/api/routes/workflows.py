@@ -1,5 +1,5 @@
 """Workflow management endpoints."""
-from fastapi import APIRouter, HTTPException, status, Depends, Request, BackgroundTasks
+from fastapi import APIRouter, HTTPException, status, Depends, Request, BackgroundTasks, Query
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
@@ -8,12 +8,16 @@ import yaml
 import structlog
 
 from ...db.database import get_db
-from ...db.models import Workflow, WorkflowExecution, User, AuditLog
+from ...db.audit_sink import get_db_audit_sink
+from ...db.models import Workflow, WorkflowExecution, User
 from ...core.orchestrator import Orchestrator
+from ...core.results import read_results
+from ...config import get_settings
 from .auth import get_current_user_from_token
 
 logger = structlog.get_logger()
 router = APIRouter()
+settings = get_settings()
 
 
 class WorkflowCreate(BaseModel):
@@ -51,19 +55,17 @@ class ExecutionResponse(BaseModel):
 
 
 def log_audit(db: Session, user_id: int, action: str, resource_type: str, resource_id: str, details: dict, request: Request):
-    """Log audit entry."""
+    """Queue audit entry; rows are bulk-inserted in the background."""
     try:
-        audit = AuditLog(
-            user_id=user_id,
-            action=action,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            details=details,
-            ip_address=request.client.host if request.client else None,
-            user_agent=request.headers.get("user-agent")
-        )
-        db.add(audit)
-        db.commit()
+        get_db_audit_sink().submit({
+            "user_id": user_id,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "details": details,
+            "ip_address": request.client.host if request.client else None,
+            "user_agent": request.headers.get("user-agent")
+        })
     except Exception as e:
         logger.error("audit_log_failed", error=str(e))
 
@@ -230,11 +232,26 @@ async def run_workflow_background(execution_id: int, workflow_spec: dict, db_ses
             spec_file = f.name
         
         try:
-            orchestrator = Orchestrator()
+            orchestrator = Orchestrator(
+                results_dir=settings.result_store_path,
+                result_segment_records=settings.result_segment_records,
+                compress_results=settings.result_store_compress
+            )
             result = orchestrator.run_spec(spec_file, dry_run=False)
             
+            # Full task output lives in the result store; keep only the summary
             execution.status = "completed"
-            execution.result = {"output": str(result), "status": "success"}
+            execution.result = {
+                "status": result["status"],
+                "run_id": result["workflow_id"],
+                "duration_seconds": result["duration_seconds"],
+                "tasks_total": result["tasks_total"],
+                "tasks_completed": result["tasks_completed"],
+                "tasks_failed": result["tasks_failed"],
+                "results_ref": result["results_ref"],
+                # The planner's cost model reads per-task timings via results_ref
+                "workflow_name": result["workflow_name"],
+            }
             execution.completed_at = datetime.utcnow()
             db.commit()
             
@@ -333,3 +350,35 @@ async def get_execution(
         raise HTTPException(status_code=404, detail="Execution not found")
     
     return execution.to_dict()
+
+
+@router.get("/executions/{execution_id}/results")
+def get_execution_results(
+    execution_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_from_token)
+):
+    """
+    Get full task results of an execution, one page at a time.
+
+    A plain ``def``: the query and the segment reads block, so FastAPI runs
+    it in its threadpool instead of on the event loop.
+    """
+    execution = db.query(WorkflowExecution).filter(
+        WorkflowExecution.id == execution_id,
+        WorkflowExecution.user_id == current_user.id
+    ).first()
+    
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    
+    results_ref = (execution.result or {}).get("results_ref")
+    if not results_ref:
+        raise HTTPException(status_code=404, detail="No stored results for this execution")
+    
+    try:
+        return read_results(results_ref["location"], offset=offset, limit=limit)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Stored results not found")
@@ -7,6 +7,7 @@ from starlette.middleware.sessions import SessionMiddleware
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
+import asyncio
 import structlog
 import time
 from pathlib import Path
@@ -14,6 +15,10 @@ from contextlib import asynccontextmanager
 
 from ..config import get_settings
 from ..core.exceptions import AgenticWorkflowsError
+from ..core.audit import shutdown_audit_writers
+from ..db.audit_sink import shutdown_db_audit_sink
+from ..llm.factory import warm_llm_providers
+from ..llm.http import close_http_clients
 from ..utils.sentry import init_sentry
 
 # Rate limiting
@@ -77,12 +82,22 @@ async def lifespan(app: FastAPI):
     # Initialize Sentry
     init_sentry(environment=settings.environment)
     
+    if settings.llm_warmup_enabled:
+        # In the background so startup never waits on a slow LLM endpoint
+        app.state.llm_warmup = asyncio.create_task(warm_llm_providers())
+    
     logger.info("startup_complete", message="App ready to accept requests")
     
     yield
     
     # Shutdown
     logger.info("application_shutting_down")
+    warmup = getattr(app.state, "llm_warmup", None)
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    await close_http_clients()
+    shutdown_db_audit_sink()
+    shutdown_audit_writers()
 
 
 def create_app() -> FastAPI:
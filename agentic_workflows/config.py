@@ -29,6 +29,14 @@ class Settings(BaseSettings):
     database_url: str = "sqlite:///./agentic_workflows.db"
     database_echo: bool = False
     
+    # DB audit rows are queued and bulk-inserted off the request path
+    db_audit_batch_size: int = 100
+    db_audit_flush_interval_seconds: float = 1.0
+    db_audit_queue_size: int = 10000
+    db_audit_retries: int = 3  # Bulk insert retries before falling back to row-by-row
+    db_audit_retry_backoff_seconds: float = 0.5
+    db_audit_spool_path: str = "./storage/db_audit_spool.jsonl"  # rows the DB rejected, replayed later
+    
     # Redis (Optional - not available on FREE tier)
     redis_url: Optional[str] = None
     redis_max_connections: int = 10
@@ -47,17 +55,43 @@ class Settings(BaseSettings):
     # Audit
     audit_log_path: str = "audit.log"
     audit_retention_days: int = 90
+    audit_buffered: bool = True  # Queue records and write them from a background thread
+    audit_flush_interval_seconds: float = 0.5
+    audit_fsync: str = "never"  # never, batch, close
+    audit_queue_size: int = 10000
+    audit_segmented: bool = False  # Rotate into indexed segments under audit_log_path without suffix
+    audit_segment_max_bytes: int = 64 * 1024 * 1024
+    audit_segment_max_seconds: int = 3600
+    audit_compression: str = "gzip"  # gzip, zstd, none
+    audit_level: str = "task"  # summary, task, item (item records roll up per task below "item")
+    audit_sample_rates: str = ""  # e.g. "thinking=0.1,node_start=0.5"; failures are never sampled
     
     # Workflow Execution (FREE tier optimized)
     max_concurrent_workflows: int = 5  # Reduced for FREE tier
     workflow_timeout_seconds: int = 1800  # 30 min max
     task_retry_max_attempts: int = 3
     task_retry_delay_seconds: int = 5
+    circuit_breaker_failure_threshold: int = 5  # Shared per dependency (host, DSN, LLM provider)
+    circuit_breaker_recovery_seconds: int = 60
+    adaptive_concurrency_initial: int = 4  # Per-dependency AIMD limit for outbound calls
+    adaptive_concurrency_min: int = 1
+    adaptive_concurrency_max: int = 64
+    adaptive_concurrency_latency_tolerance: float = 2.0  # Shrink when latency exceeds baseline x this
+    adaptive_concurrency_min_latency_delta_seconds: float = 0.01  # ...and is at least this far above it
+    outbound_rate_limits: str = ""  # e.g. "api.github.com=5000/hour,hooks.slack.com=1/s:5" (rate[:burst])
+    outbound_rate_limit_max_wait_seconds: float = 60  # Longest a call waits for its bucket before failing
+    plugin_timeout_seconds: float = 0  # Default per-task bound on plugin.execute(); 0 disables
+    plugin_timeout_isolation: str = "thread"  # thread (abandon on timeout) or process (terminate)
     
     # Storage
     storage_backend: str = "local"  # local, s3, azure, gcs
     storage_path: str = "./storage"
     
+    # Execution results (streamed to NDJSON segments per run)
+    result_store_path: str = "./storage/results"
+    result_segment_records: int = 500
+    result_store_compress: bool = True
+    
     # AWS (if using S3)
     aws_access_key_id: Optional[str] = None
     aws_secret_access_key: Optional[str] = None
@@ -68,10 +102,82 @@ class Settings(BaseSettings):
     openai_api_key: Optional[str] = None
     openai_model: str = "gpt-4-turbo-preview"
     openai_max_tokens: int = 4000
+    openai_base_url: str = "https://api.openai.com/v1"
+    
+    # Anthropic Claude
+    anthropic_api_key: Optional[str] = None
+    anthropic_base_url: str = "https://api.anthropic.com"
+    
+    # Shared async HTTP pool used by the LLM providers
+    llm_timeout_seconds: float = 30
+    llm_connect_timeout_seconds: float = 5
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry_seconds: float = 30
+    
+    # LLM completion cache (only requests at or below llm_cache_max_temperature)
+    llm_cache_enabled: bool = True
+    llm_cache_backend: str = "memory"  # memory, sqlite, redis
+    llm_cache_path: str = "./storage/llm_cache.db"
+    llm_cache_ttl_seconds: int = 86400
+    llm_cache_max_entries: int = 1000
+    llm_cache_max_temperature: float = 0.0
+    # Concurrent identical requests (same rule as the cache) share one call
+    llm_coalesce_enabled: bool = True
+    llm_coalesce_wait_seconds: float = 60
+    # LLM_PROVIDER=router spreads calls over these providers, fastest healthy first
+    llm_routing_providers: str = "openai,claude"
+    llm_routing_ewma_alpha: float = 0.3
+    llm_routing_error_threshold: float = 0.5
+    # Latency-critical agents duplicate a routed request after this long (0 disables)
+    llm_hedge_after_seconds: float = 2.0
+    # Per-provider admission: concurrent calls, then "provider=N,..." overrides
+    # and per-minute budgets; callers queue by priority for up to the timeout
+    llm_max_concurrency: int = 16
+    llm_concurrency_limits: str = ""
+    llm_requests_per_minute: str = ""
+    llm_tokens_per_minute: str = ""
+    llm_queue_timeout_seconds: float = 30
+    # Estimated prompt tokens per agent call (agents may override)
+    llm_prompt_token_budget: int = 3000
+    # Connect to the configured LLM provider at startup
+    llm_warmup_enabled: bool = True
+    # Plans and LLM validation reviews per spec content (same backend as the LLM cache)
+    plan_cache_enabled: bool = True
+    plan_cache_ttl_seconds: int = 604800
+    # Planner duration estimates, fitted on recent completed executions
+    planner_default_task_seconds: float = 5.0
+    cost_model_history_limit: int = 500
+    cost_model_refresh_seconds: int = 300
+    # Shared deadline for agent calls an endpoint fans out concurrently; 0 disables
+    agent_pipeline_timeout_seconds: float = 60
+    # Fixes that worked for past errors, reused by the self-healing agent without the LLM
+    learned_fix_store_path: str = "./storage/learned_fixes.db"  # empty keeps them in memory
+    learned_fix_similarity: float = 0.6
+    learned_fix_max_entries: int = 10000
+    # Record real LLM calls to a cassette, or replay them with no network
+    llm_cassette_mode: str = "off"  # off, record, replay
+    llm_cassette_path: str = "./storage/llm_cassette.jsonl"
+    llm_cassette_latency: str = "none"  # none, recorded, sampled
+    # Pause between words when the dummy provider streams
+    dummy_stream_delay_seconds: float = 0.02
     
     # Monitoring
     enable_metrics: bool = True
     metrics_port: int = 9090
+    # ObserverAgent memory bounds; completed workflows are kept as summaries
+    observer_recent_samples: int = 256
+    observer_completed_history: int = 1000
+    observer_max_error_patterns: int = 1000
+    observer_task_update_history: int = 20
+    # Incremental anomaly detection per workflow, task type and error pattern
+    anomaly_ewma_alpha: float = 0.1
+    anomaly_z_threshold: float = 3.0
+    anomaly_min_samples: int = 10
+    anomaly_error_rate_threshold: float = 0.3
+    anomaly_error_window_seconds: float = 300
+    anomaly_error_burst_threshold: int = 5
+    anomaly_max_series: int = 1000
     sentry_dsn: Optional[str] = None
     
     # CORS - use Field with json_schema_extra to prevent JSON parsing
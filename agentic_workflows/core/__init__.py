@@ -1,14 +1,23 @@
-from .spec import WorkflowSpec, TaskSpec, load_spec
+from .spec import WorkflowSpec, TaskSpec, load_spec, parse_spec, spec_hash
 from .agents import PlannerAgent, ExecutorAgent
 from .orchestrator import Orchestrator
-from .audit import AuditLog
+from .audit import AuditLog, AuditWriter, shutdown_audit_writers
+from .audit_store import SegmentedAuditStore
+from .results import ResultSink, read_results
 
 __all__ = [
     "WorkflowSpec",
     "TaskSpec",
     "load_spec",
+    "parse_spec",
+    "spec_hash",
     "PlannerAgent",
     "ExecutorAgent",
     "Orchestrator",
     "AuditLog",
+    "AuditWriter",
+    "shutdown_audit_writers",
+    "SegmentedAuditStore",
+    "ResultSink",
+    "read_results",
 ]
@@ -1,6 +1,9 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from .spec import WorkflowSpec, TaskSpec
 from .audit import AuditLog
+from .results import ResultSink
+from .retry import run_with_timeout
+from ..config import get_settings
 from datetime import datetime, timezone
 import importlib
 import time
@@ -30,6 +33,13 @@ def resolve_plugin(type_name: str):
     cls = getattr(module, class_name)
     return cls
 
+def plugin_timeout(plugin, params: Dict[str, Any]) -> Optional[float]:
+    """Bound on ``plugin.execute()``: task param, then plugin default, then the global setting."""
+    timeout = params.get("timeout_seconds", getattr(plugin, "timeout_seconds", None))
+    if timeout is None:
+        timeout = get_settings().plugin_timeout_seconds
+    return float(timeout) if timeout else None
+
 def now_iso() -> str:
     """Return current UTC timestamp in ISO format with milliseconds."""
     return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
@@ -46,7 +56,10 @@ class PlannerAgent:
                 "type": t.type,
                 "params": t.params
             })
-        self.audit.record({"agent": "planner", "workflow": spec.id, "plan_size": len(plan)})
+        self.audit.record(
+            {"agent": "planner", "workflow": spec.id, "plan_size": len(plan)},
+            level="summary"
+        )
         return plan
 
 class ExecutorAgent:
@@ -54,9 +67,24 @@ class ExecutorAgent:
         self.audit = audit or AuditLog()
         self.plugin_overrides = plugin_overrides or {}
 
-    def execute_plan(self, plan: List[Dict[str, Any]], dry_run: bool = True):
-        """Execute workflow plan with detailed timing and metadata for each task."""
+    def execute_plan(
+        self,
+        plan: List[Dict[str, Any]],
+        dry_run: bool = True,
+        sink: Optional[ResultSink] = None
+    ):
+        """
+        Execute workflow plan with detailed timing and metadata for each task.
+
+        When a ``sink`` is given, each task entry is streamed to it as soon as
+        the task finishes and ``results`` only holds compact stubs that
+        reference the stored records.
+        """
         results = {}
+
+        def store(task_id: str, entry: Dict[str, Any]) -> None:
+            results[task_id] = sink.write(task_id, entry) if sink else entry
+
         overall_start = time.time()
         
         for step in plan:
@@ -70,64 +98,70 @@ class ExecutorAgent:
             task_start_ts = now_iso()
             
             try:
-                # Resolve and instantiate plugin
-                cls = resolve_plugin(typ)
-                plugin = cls(params=params, audit=self.audit)
-                
-                # Get plan for visibility
-                planned_actions = plugin.plan()
-                self.audit.record({
-                    "agent": "executor",
-                    "task_id": task_id,
-                    "type": typ,
-                    "planned_actions": len(planned_actions),
-                    "dry_run": dry_run
-                })
-                
-                if dry_run:
-                    # Dry run mode - return plan without execution
-                    task_end_ts = now_iso()
-                    task_duration = round(time.time() - task_start_time, 3)
-                    results[task_id] = {
-                        "status": "planned",
-                        "type": typ,
-                        "plan": planned_actions,
-                        "start_ts": task_start_ts,
-                        "end_ts": task_end_ts,
-                        "duration_seconds": task_duration,
-                        "dry_run": True
-                    }
-                else:
-                    # Real execution
-                    exec_result = plugin.execute()
-                    task_end_ts = now_iso()
-                    task_duration = round(time.time() - task_start_time, 3)
-                    
-                    # Normalize plugin output
-                    if isinstance(exec_result, dict):
-                        status = exec_result.get("status", "completed")
-                        result_data = exec_result
-                    else:
-                        status = "completed"
-                        result_data = {"output": str(exec_result)}
-                    
-                    results[task_id] = {
-                        "status": status,
-                        "type": typ,
-                        "result": result_data,
-                        "start_ts": task_start_ts,
-                        "end_ts": task_end_ts,
-                        "duration_seconds": task_duration,
-                        "dry_run": False
-                    }
+                # Item-level audit records of this task roll up into one record
+                with self.audit.rollup(task_id=task_id, type=typ):
+                    # Resolve and instantiate plugin
+                    cls = resolve_plugin(typ)
+                    plugin = cls(params=params, audit=self.audit)
                     
+                    # Get plan for visibility
+                    planned_actions = plugin.plan()
                     self.audit.record({
                         "agent": "executor",
                         "task_id": task_id,
-                        "status": status,
-                        "duration": task_duration
+                        "type": typ,
+                        "planned_actions": len(planned_actions),
+                        "dry_run": dry_run
                     })
                     
+                    if dry_run:
+                        # Dry run mode - return plan without execution
+                        task_end_ts = now_iso()
+                        task_duration = round(time.time() - task_start_time, 3)
+                        store(task_id, {
+                            "status": "planned",
+                            "type": typ,
+                            "plan": planned_actions,
+                            "start_ts": task_start_ts,
+                            "end_ts": task_end_ts,
+                            "duration_seconds": task_duration,
+                            "dry_run": True
+                        })
+                    else:
+                        # Real execution, bounded by the task's timeout
+                        exec_result = run_with_timeout(
+                            plugin.execute,
+                            plugin_timeout(plugin, params),
+                            isolation=get_settings().plugin_timeout_isolation
+                        )
+                        task_end_ts = now_iso()
+                        task_duration = round(time.time() - task_start_time, 3)
+                        
+                        # Normalize plugin output
+                        if isinstance(exec_result, dict):
+                            status = exec_result.get("status", "completed")
+                            result_data = exec_result
+                        else:
+                            status = "completed"
+                            result_data = {"output": str(exec_result)}
+                        
+                        store(task_id, {
+                            "status": status,
+                            "type": typ,
+                            "result": result_data,
+                            "start_ts": task_start_ts,
+                            "end_ts": task_end_ts,
+                            "duration_seconds": task_duration,
+                            "dry_run": False
+                        })
+                        
+                        self.audit.record({
+                            "agent": "executor",
+                            "task_id": task_id,
+                            "status": status,
+                            "duration": task_duration
+                        })
+                    
             except Exception as e:
                 task_end_ts = now_iso()
                 task_duration = round(time.time() - task_start_time, 3)
@@ -140,7 +174,7 @@ class ExecutorAgent:
                     "duration": task_duration
                 })
                 
-                results[task_id] = {
+                store(task_id, {
                     "status": "failed",
                     "type": typ,
                     "error": error_msg,
@@ -148,7 +182,7 @@ class ExecutorAgent:
                     "end_ts": task_end_ts,
                     "duration_seconds": task_duration,
                     "dry_run": dry_run
-                }
+                })
         
         overall_duration = round(time.time() - overall_start, 3)
         
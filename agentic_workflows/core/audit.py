@@ -1,14 +1,444 @@
+import atexit
 import json
+import os
+import queue
+import random
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config import get_settings
+
+FSYNC_POLICIES = ("never", "batch", "close")
+
+# Verbosity levels, least to most detailed
+AUDIT_LEVELS = {"summary": 0, "task": 1, "item": 2}
+
+
+def encode_record(entry: Dict[str, Any]) -> str:
+    """Serialize one audit record as a JSON line."""
+    return json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+
+
+class AuditFile:
+    """
+    Single append-only audit file.
+
+    The handle is opened lazily and kept open between writes. All methods are
+    thread-safe so buffered and unbuffered loggers can share one target.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._fh = None
+        self._closed = False
+
+    def write(self, entries: List[Dict[str, Any]], fsync: bool = False) -> None:
+        lines = [encode_record(e) for e in entries]
+        with self._lock:
+            if self._closed:
+                # Late records after shutdown: plain open/append/close
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.writelines(lines)
+                return
+            if self._fh is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fh = self.path.open("a", encoding="utf-8")
+            self._fh.writelines(lines)
+            self._fh.flush()
+            if fsync:
+                os.fsync(self._fh.fileno())
+
+    def sync(self, fsync: bool = False) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+                if fsync:
+                    os.fsync(self._fh.fileno())
+
+    def close(self, fsync: bool = False) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+                if fsync:
+                    os.fsync(self._fh.fileno())
+                self._fh.close()
+                self._fh = None
+            self._closed = True
+
+
+class _FlushRequest:
+    """Queue marker asking the flusher to drain and signal completion."""
+
+    def __init__(self, stop: bool = False):
+        self.done = threading.Event()
+        self.stop = stop
+
+
+class AuditWriter:
+    """
+    Background writer that batches audit records for one target.
+
+    Records are queued by ``submit`` and written by a daemon thread, one
+    ``write`` call (and one ``writelines``) per batch; JSON encoding happens
+    on that thread too. If the queue is full, the thread is not running or
+    the writer has been closed, records are written synchronously instead.
+
+    fsync policy:
+        never: leave durability to the OS page cache
+        batch: fsync after every batch
+        close: fsync only on ``flush()`` and ``close()``
+    """
+
+    def __init__(
+        self,
+        target,
+        flush_interval: float = 0.5,
+        fsync: str = "never",
+        max_queue: int = 10000,
+        batch_size: int = 1000
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.target = target
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.batch_size = batch_size
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"audit-writer:{Path(target.path).name}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, entry: Dict[str, Any]) -> None:
+        """Queue one record; falls back to a synchronous write when needed."""
+        if self._closed or not self._thread.is_alive():
+            self.target.write([entry])
+            return
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.target.write([entry])
+
+    def flush(self, timeout: Optional[float] = 5.0) -> None:
+        """Block until every record submitted so far has been written."""
+        if self._closed or not self._thread.is_alive():
+            self.target.sync(fsync=self.fsync != "never")
+            return
+        request = _FlushRequest()
+        self._queue.put(request)
+        request.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Drain the queue, stop the flusher thread and close the target."""
+        if self._closed:
+            return
+        if self._thread.is_alive():
+            request = _FlushRequest(stop=True)
+            self._queue.put(request)
+            request.done.wait(timeout)
+            self._thread.join(timeout)
+        self._closed = True
+        # Anything that raced in after the stop marker is written directly
+        leftovers = self._drain_nowait()
+        if leftovers:
+            self.target.write(leftovers)
+        self.target.close(fsync=self.fsync != "never")
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Dict[str, Any]] = []
+            request: Optional[_FlushRequest] = None
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            while True:
+                if isinstance(item, _FlushRequest):
+                    request = item
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self.target.write(batch, fsync=self.fsync == "batch")
+            if request is not None:
+                self.target.sync(fsync=self.fsync != "never")
+                request.done.set()
+                if request.stop:
+                    return
+
+    def _drain_nowait(self) -> List[Dict[str, Any]]:
+        entries = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return entries
+            if isinstance(item, _FlushRequest):
+                item.done.set()
+            else:
+                entries.append(item)
+
+
+# One target (and at most one writer) per audit location, shared by every
+# AuditLog pointing at it
+_targets: Dict[Path, Any] = {}
+_writers: Dict[Path, AuditWriter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_audit_target(path: Path, segmented: bool = False):
+    """Return the shared target for ``path``, creating it on first use."""
+    from .audit_store import SegmentedAuditStore
+
+    key = Path(path).resolve()
+    with _registry_lock:
+        target = _targets.get(key)
+        if target is None:
+            if segmented:
+                settings = get_settings()
+                target = SegmentedAuditStore(
+                    key,
+                    max_segment_bytes=settings.audit_segment_max_bytes,
+                    max_segment_seconds=settings.audit_segment_max_seconds,
+                    compression=settings.audit_compression,
+                    retention_days=settings.audit_retention_days
+                )
+            else:
+                target = AuditFile(key)
+            _targets[key] = target
+        return target
+
+
+def get_audit_writer(target, **options) -> AuditWriter:
+    """Return the shared background writer for ``target``."""
+    key = Path(target.path).resolve()
+    with _registry_lock:
+        writer = _writers.get(key)
+        if writer is None or writer._closed:
+            writer = AuditWriter(target, **options)
+            _writers[key] = writer
+        return writer
+
+
+def shutdown_audit_writers() -> None:
+    """Flush and close every audit writer and target."""
+    with _registry_lock:
+        writers = list(_writers.values())
+        targets = list(_targets.values())
+        _writers.clear()
+        _targets.clear()
+    for writer in writers:
+        writer.close()
+    for target in targets:
+        target.close()
+
+
+def _reset_after_fork() -> None:
+    # Flusher threads do not survive fork(); children start with a fresh registry
+    global _registry_lock
+    _registry_lock = threading.Lock()
+    _writers.clear()
+    _targets.clear()
+
+
+atexit.register(shutdown_audit_writers)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse ``"event=rate,event=rate"`` into a dict of sampling rates."""
+    rates = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        name, _, rate = part.partition("=")
+        value = float(rate)
+        if not 0.0 <= value <= 1.0:
+            raise ValueError(f"Sample rate for {name.strip()!r} must be within [0, 1]")
+        rates[name.strip()] = value
+    return rates
+
+
+def event_type(entry: Dict[str, Any]) -> str:
+    """Name used for sampling and roll-up counts of an audit record."""
+    for key in ("event", "action", "orchestrator", "plugin", "agent"):
+        if entry.get(key):
+            return str(entry[key])
+    return "record"
+
+
+def is_failure(entry: Dict[str, Any]) -> bool:
+    """Failures are always recorded at full fidelity."""
+    if entry.get("error"):
+        return True
+    if str(entry.get("status", "")).lower() in ("failed", "error"):
+        return True
+    return "fail" in event_type(entry).lower()
+
+
+class _Rollup:
+    """Per-task aggregate of records suppressed by level or sampling."""
+
+    def __init__(self, fields: Dict[str, Any]):
+        self.fields = fields
+        self.counts: Dict[str, int] = {}
+        self.first_ts: Optional[str] = None
+        self.last_ts: Optional[str] = None
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        name = event_type(entry)
+        self.counts[name] = self.counts.get(name, 0) + 1
+        if self.first_ts is None:
+            self.first_ts = entry["ts"]
+        self.last_ts = entry["ts"]
+
+
+_current_rollup: ContextVar[Optional[_Rollup]] = ContextVar("audit_rollup", default=None)
+_current_workflow: ContextVar[Optional[str]] = ContextVar("audit_workflow", default=None)
+
+
+def current_workflow_id() -> Optional[str]:
+    """Workflow id stamped on audit records written from this context."""
+    return _current_workflow.get()
+
+
+@contextmanager
+def audit_workflow(workflow_id: str):
+    """
+    Stamp ``workflow_id`` on every audit record written inside the block.
+
+    Like rollups, the id lives in a context variable, so it follows asyncio
+    tasks and ``asyncio.to_thread`` calls started inside the block.
+    """
+    token = _current_workflow.set(workflow_id)
+    try:
+        yield workflow_id
+    finally:
+        _current_workflow.reset(token)
+
 
 class AuditLog:
-    def __init__(self, path="audit.log"):
+    """
+    Audit trail with verbosity levels and per-event sampling.
+
+    Records carry a level: ``summary`` (run start/end), ``task`` (one per
+    task or node step) or ``item`` (one per file, email, row...). Records
+    above the configured level are not written; inside a ``rollup()`` scope
+    they are counted and emitted as one aggregate record when the scope
+    ends. Sampling rates per event type thin out the records that are
+    written. Failures bypass both levels and sampling.
+    """
+
+    def __init__(
+        self,
+        path="audit.log",
+        buffered: Optional[bool] = None,
+        flush_interval: Optional[float] = None,
+        fsync: Optional[str] = None,
+        segmented: Optional[bool] = None,
+        level: Optional[str] = None,
+        sample_rates: Optional[Dict[str, float]] = None
+    ):
+        settings = get_settings()
+        if segmented is None:
+            segmented = settings.audit_segmented
         self.path = Path(path)
+        if segmented:
+            # "audit.log" becomes the segment directory "audit/"
+            self.path = self.path.with_suffix("")
+        self.target = get_audit_target(self.path, segmented=segmented)
 
-    def record(self, entry: dict):
+        level = level or settings.audit_level
+        if level not in AUDIT_LEVELS:
+            raise ValueError(f"audit level must be one of {tuple(AUDIT_LEVELS)}, got {level!r}")
+        self.level = level
+        self.sample_rates = (
+            sample_rates if sample_rates is not None
+            else parse_sample_rates(settings.audit_sample_rates)
+        )
+
+        if buffered is None:
+            buffered = settings.audit_buffered
+        self._writer = None
+        if buffered:
+            self._writer = get_audit_writer(
+                self.target,
+                flush_interval=flush_interval or settings.audit_flush_interval_seconds,
+                fsync=fsync or settings.audit_fsync,
+                max_queue=settings.audit_queue_size
+            )
+
+    def record(self, entry: dict, level: str = "task"):
         entry = dict(entry)
         entry.setdefault("ts", datetime.now(timezone.utc).isoformat())
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        with self.path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        if not is_failure(entry):
+            keep = AUDIT_LEVELS[level] <= AUDIT_LEVELS[self.level]
+            if keep:
+                rate = self.sample_rates.get(event_type(entry), 1.0)
+                if rate < 1.0:
+                    keep = random.random() < rate
+                    entry["sample_rate"] = rate
+            if not keep:
+                rollup = _current_rollup.get()
+                if rollup is not None:
+                    rollup.add(entry)
+                return
+
+        self._write(entry)
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        workflow_id = _current_workflow.get()
+        if workflow_id is not None and "workflow_id" not in entry:
+            entry = {**entry, "workflow_id": workflow_id}
+        if self._writer is not None:
+            self._writer.submit(entry)
+        else:
+            self.target.write([entry])
+
+    @contextmanager
+    def rollup(self, **fields):
+        """
+        Aggregate suppressed records of the enclosed task into one record.
+
+        The scope is tracked with a context variable, so it follows the
+        current thread or asyncio task and parallel tasks do not mix.
+        """
+        scope = _Rollup(fields)
+        token = _current_rollup.set(scope)
+        try:
+            yield scope
+        finally:
+            _current_rollup.reset(token)
+            if scope.counts:
+                self._write({
+                    "event": "audit_rollup",
+                    **fields,
+                    "counts": scope.counts,
+                    "suppressed": sum(scope.counts.values()),
+                    "first_ts": scope.first_ts,
+                    "last_ts": scope.last_ts,
+                    "ts": datetime.now(timezone.utc).isoformat()
+                })
+
+    def flush(self):
+        """Wait until all buffered records have been written."""
+        if self._writer is not None:
+            self._writer.flush()
+        else:
+            self.target.sync()
@@ -0,0 +1,426 @@
+"""Segmented, compressed and indexed audit log store."""
+import gzip
+import io
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Union
+
+import structlog
+
+from .audit import encode_record
+
+logger = structlog.get_logger()
+
+# Record fields mapped to line offsets in each segment's sidecar index
+INDEX_FIELDS = ("workflow_id", "node_id", "task_id")
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+
+TimeBound = Union[None, float, str, datetime]
+
+
+def _zstd():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+def _to_epoch(value: TimeBound) -> Optional[float]:
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SegmentedAuditStore:
+    """
+    Audit store split into time- or size-rotated segments.
+
+    Layout of the store directory:
+        seg-<start>-<pid>.jsonl           active segment of a writer process
+        seg-<start>-<pid>.jsonl.gz|.zst   sealed, compressed segment
+        seg-<start>-<pid>.idx.json        field -> value -> line offsets
+        seg-<start>-<pid>.meta.json       time range, counts, distinct keys
+
+    The meta file is written last and marks a segment as sealed. Queries
+    read the small meta files first, then the index and data of matching
+    segments only. Every process writes its own active segment, so several
+    workers can share one directory; raw segments left behind by dead
+    processes are sealed on startup. Retention removes whole segments.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_seconds: int = 3600,
+        compression: str = "gzip",
+        retention_days: int = 0,
+        recover: bool = True
+    ):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(
+                f"compression must be one of {tuple(COMPRESSION_SUFFIXES)}, got {compression!r}"
+            )
+        if compression == "zstd" and _zstd() is None:
+            logger.warning("zstandard_not_installed", fallback="gzip")
+            compression = "gzip"
+
+        self.path = Path(directory)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+        self.compression = compression
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._reset_active()
+
+        if recover and self.path.exists():
+            self._seal_orphans()
+
+    # Writing
+
+    def _reset_active(self) -> None:
+        self._fh = None
+        self._active: Optional[Path] = None
+        self._bytes = 0
+        self._records = 0
+        self._first_epoch: Optional[float] = None
+        self._last_epoch: Optional[float] = None
+        self._index: Dict[str, Dict[str, List[int]]] = {f: {} for f in INDEX_FIELDS}
+
+    def _open_active(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        self._active = self.path / f"seg-{stamp}-{os.getpid()}.jsonl"
+        self._fh = self._active.open("ab")
+
+    def write(self, entries: List[Dict[str, Any]], fsync: bool = False) -> None:
+        """Append records to the active segment, rotating when it is full."""
+        with self._lock:
+            if self._fh is None:
+                self._open_active()
+            now = time.time()
+            chunks = []
+            for entry in entries:
+                data = encode_record(entry).encode("utf-8")
+                for field in INDEX_FIELDS:
+                    value = entry.get(field)
+                    if value is not None:
+                        self._index[field].setdefault(str(value), []).append(self._bytes)
+                chunks.append(data)
+                self._bytes += len(data)
+                self._records += 1
+            self._fh.writelines(chunks)
+            self._fh.flush()
+            if fsync:
+                os.fsync(self._fh.fileno())
+
+            if self._first_epoch is None:
+                self._first_epoch = now
+            self._last_epoch = now
+
+            if (
+                self._bytes >= self.max_segment_bytes
+                or now - self._first_epoch >= self.max_segment_seconds
+            ):
+                self._seal_active()
+                self._apply_retention()
+
+    def sync(self, fsync: bool = False) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+                if fsync:
+                    os.fsync(self._fh.fileno())
+
+    def close(self, fsync: bool = False) -> None:
+        """Seal the active segment. Later writes open a new one."""
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+                if fsync:
+                    os.fsync(self._fh.fileno())
+            self._seal_active()
+
+    def rotate(self) -> None:
+        """Seal the active segment now, regardless of size or age."""
+        self.close()
+
+    def _seal_active(self) -> None:
+        if self._fh is None:
+            return
+        self._fh.close()
+        if self._records:
+            self._seal(
+                self._active,
+                self._index,
+                records=self._records,
+                size=self._bytes,
+                first_epoch=self._first_epoch,
+                last_epoch=self._last_epoch
+            )
+        else:
+            self._active.unlink(missing_ok=True)
+        self._reset_active()
+
+    def _seal(
+        self,
+        raw: Path,
+        index: Dict[str, Dict[str, List[int]]],
+        records: int,
+        size: int,
+        first_epoch: float,
+        last_epoch: float
+    ) -> None:
+        stem = raw.name[: -len(".jsonl")]
+        data_path = raw.with_name(raw.name + COMPRESSION_SUFFIXES[self.compression])
+
+        (self.path / f"{stem}.idx.json").write_text(json.dumps(index), encoding="utf-8")
+
+        if self.compression != "none":
+            tmp = data_path.with_name(data_path.name + ".tmp")
+            with raw.open("rb") as src:
+                if self.compression == "gzip":
+                    with gzip.open(tmp, "wb") as dst:
+                        shutil.copyfileobj(src, dst)
+                else:
+                    with tmp.open("wb") as dst:
+                        _zstd().ZstdCompressor().copy_stream(src, dst)
+            os.replace(tmp, data_path)
+
+        meta = {
+            "file": data_path.name,
+            "compression": self.compression,
+            "records": records,
+            "bytes": size,
+            "first_epoch": first_epoch,
+            "last_epoch": last_epoch,
+            "keys": {field: sorted(values) for field, values in index.items()},
+        }
+        (self.path / f"{stem}.meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+        if self.compression != "none":
+            raw.unlink()
+
+    def _seal_orphans(self) -> None:
+        """Seal raw segments whose writer process is gone."""
+        with self._lock:
+            for raw in sorted(self.path.glob("seg-*.jsonl")):
+                stem = raw.name[: -len(".jsonl")]
+                if (self.path / f"{stem}.meta.json").exists():
+                    continue
+                try:
+                    pid = int(stem.rsplit("-", 1)[1])
+                except ValueError:
+                    continue
+                if _pid_alive(pid):
+                    continue
+
+                index: Dict[str, Dict[str, List[int]]] = {f: {} for f in INDEX_FIELDS}
+                records = 0
+                offset = 0
+                with raw.open("rb") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            for field in INDEX_FIELDS:
+                                value = entry.get(field)
+                                if value is not None:
+                                    index[field].setdefault(str(value), []).append(offset)
+                            records += 1
+                        offset += len(line)
+                if not records:
+                    raw.unlink()
+                    continue
+                mtime = raw.stat().st_mtime
+                self._seal(raw, index, records, offset, first_epoch=mtime, last_epoch=mtime)
+                logger.info("audit_segment_recovered", segment=raw.name, records=records)
+
+    # Retention
+
+    def _apply_retention(self) -> int:
+        if self.retention_days <= 0:
+            return 0
+        return self._prune(time.time() - self.retention_days * 86400)
+
+    def apply_retention(self, retention_days: Optional[int] = None) -> int:
+        """
+        Delete sealed segments whose newest record is older than the cutoff.
+
+        Returns:
+            Number of segments removed
+        """
+        days = self.retention_days if retention_days is None else retention_days
+        if days <= 0:
+            return 0
+        with self._lock:
+            return self._prune(time.time() - days * 86400)
+
+    def _prune(self, cutoff: float) -> int:
+        removed = 0
+        for meta_path, meta in self._sealed_segments():
+            if meta["last_epoch"] < cutoff:
+                stem = meta_path.name[: -len(".meta.json")]
+                # Meta goes first so a partial delete never looks sealed
+                meta_path.unlink(missing_ok=True)
+                (self.path / meta["file"]).unlink(missing_ok=True)
+                (self.path / f"{stem}.idx.json").unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            logger.info("audit_segments_pruned", removed=removed)
+        return removed
+
+    # Querying
+
+    def _sealed_segments(self):
+        if not self.path.exists():
+            return
+        for meta_path in sorted(self.path.glob("seg-*.meta.json")):
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            yield meta_path, meta
+
+    def _read_lines(self, data_path: Path, compression: str) -> Iterator[tuple]:
+        """Yield ``(offset, line)`` pairs from a segment file."""
+        if compression == "gzip":
+            stream = gzip.open(data_path, "rb")
+        elif compression == "zstd":
+            raw = data_path.open("rb")
+            stream = io.BufferedReader(_zstd().ZstdDecompressor().stream_reader(raw))
+        else:
+            stream = data_path.open("rb")
+        with stream:
+            offset = 0
+            for line in stream:
+                yield offset, line
+                offset += len(line)
+
+    def query(
+        self,
+        workflow_id: Optional[str] = None,
+        node_id: Optional[str] = None,
+        task_id: Optional[str] = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield audit records matching all given filters, oldest segment first.
+
+        Sealed segments are skipped using their meta file (time range and
+        distinct keys); matching ones are read only up to the last indexed
+        offset. Unsealed segments are scanned in full.
+        """
+        filters = {
+            field: str(value)
+            for field, value in (("workflow_id", workflow_id), ("node_id", node_id), ("task_id", task_id))
+            if value is not None
+        }
+        since_epoch = _to_epoch(since)
+        until_epoch = _to_epoch(until)
+        self.sync()
+
+        emitted = 0
+
+        def within_time(entry: Dict[str, Any]) -> bool:
+            if since_epoch is None and until_epoch is None:
+                return True
+            ts = entry.get("ts")
+            if not ts:
+                return False
+            epoch = _to_epoch(ts)
+            if since_epoch is not None and epoch < since_epoch:
+                return False
+            if until_epoch is not None and epoch > until_epoch:
+                return False
+            return True
+
+        sealed_stems: Set[str] = set()
+        for meta_path, meta in self._sealed_segments():
+            stem = meta_path.name[: -len(".meta.json")]
+            sealed_stems.add(stem)
+            if since_epoch is not None and meta["last_epoch"] < since_epoch:
+                continue
+            if until_epoch is not None and meta["first_epoch"] > until_epoch:
+                continue
+            if any(value not in meta["keys"].get(field, ()) for field, value in filters.items()):
+                continue
+
+            wanted = None
+            if filters:
+                index = json.loads((self.path / f"{stem}.idx.json").read_text(encoding="utf-8"))
+                for field, value in filters.items():
+                    offsets = set(index.get(field, {}).get(value, ()))
+                    wanted = offsets if wanted is None else wanted & offsets
+                if not wanted:
+                    continue
+                last_wanted = max(wanted)
+
+            for offset, line in self._read_lines(self.path / meta["file"], meta["compression"]):
+                if wanted is not None:
+                    if offset > last_wanted:
+                        break
+                    if offset not in wanted:
+                        continue
+                entry = json.loads(line)
+                if not within_time(entry):
+                    continue
+                yield entry
+                emitted += 1
+                if limit is not None and emitted >= limit:
+                    return
+
+        for raw in sorted(self.path.glob("seg-*.jsonl")) if self.path.exists() else ():
+            if raw.name[: -len(".jsonl")] in sealed_stems:
+                continue
+            for _, line in self._read_lines(raw, "none"):
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if any(str(entry.get(field)) != value for field, value in filters.items()):
+                    continue
+                if not within_time(entry):
+                    continue
+                yield entry
+                emitted += 1
+                if limit is not None and emitted >= limit:
+                    return
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarize sealed segments on disk."""
+        segments = [meta for _, meta in self._sealed_segments()]
+        return {
+            "directory": str(self.path),
+            "sealed_segments": len(segments),
+            "records": sum(m["records"] for m in segments),
+            "uncompressed_bytes": sum(m["bytes"] for m in segments),
+            "stored_bytes": sum(
+                (self.path / m["file"]).stat().st_size
+                for m in segments
+                if (self.path / m["file"]).exists()
+            ),
+        }
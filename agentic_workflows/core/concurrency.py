@@ -0,0 +1,352 @@
+"""Adaptive (AIMD) concurrency limits per external dependency."""
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Deque, Dict, Optional
+
+import structlog
+
+from ..config import get_settings
+from .exceptions import (
+    CircuitOpenError,
+    ExternalServiceRateLimitedError,
+    ExternalServiceTimeoutError,
+    ExternalServiceUnavailableError
+)
+
+logger = structlog.get_logger()
+
+# The caller stopped waiting; says nothing about the dependency
+_ABANDONED = (asyncio.CancelledError, GeneratorExit, KeyboardInterrupt, SystemExit)
+
+
+def is_overload(error: BaseException) -> bool:
+    """
+    Whether a failed call means the dependency is overloaded: a timeout, a
+    429 or a 5xx. Client errors (4xx, bad input, refused connections...)
+    are not a reason to shrink the limit.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ExternalServiceTimeoutError,
+                          ExternalServiceRateLimitedError, ExternalServiceUnavailableError)):
+        return True
+    # HTTP client errors (httpx, requests) without importing them here
+    if "timeout" in type(error).__name__.lower():
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is None:
+        status = (getattr(error, "details", None) or {}).get("status_code")
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+class _Waiter:
+    """A caller queued for a slot, woken from whichever thread releases one."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.granted = False
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+
+    def wake(self, limiter: "AdaptiveLimiter") -> None:
+        if self.loop is None:
+            self.event.set()
+            return
+
+        def resolve():
+            if self.future.done():
+                # Cancelled while the slot was on its way: pass it on
+                limiter._release()
+            else:
+                self.future.set_result(True)
+
+        try:
+            self.loop.call_soon_threadsafe(resolve)
+        except RuntimeError:
+            # Loop already closed
+            limiter._release()
+
+
+class Slot:
+    """One acquired unit of concurrency; marks how the call went."""
+
+    def __init__(self):
+        self.ok = True
+
+    def failed(self) -> None:
+        """Count the call as overload (429, 5xx...) even if nothing was raised."""
+        self.ok = False
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that adapts to the latency and errors of one dependency.
+
+    Additive increase, multiplicative decrease: every successful call while
+    the limit is in use grows it by ``1 / limit`` (about +1 per round
+    trip of calls). An overload (timeout, 429, 5xx) or a smoothed latency above
+    ``latency_tolerance`` times the baseline cuts it by ``decrease_factor``,
+    at most once per ``cooldown`` seconds. The baseline follows the fastest
+    observed latencies and drifts upward slowly, so a slower but stable
+    backend does not look permanently overloaded. Latency only counts as
+    congestion after ``min_latency_samples`` calls and when it is at least
+    ``min_latency_delta`` seconds above the baseline, so jitter on fast
+    calls is not mistaken for overload.
+
+    Waiting is FIFO and shared by threads and asyncio tasks.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        smoothing: float = 0.2,
+        cooldown: float = 1.0,
+        min_latency_samples: int = 5,
+        min_latency_delta: float = 0.01,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.cooldown = cooldown
+        self.min_latency_samples = min_latency_samples
+        self.min_latency_delta = min_latency_delta
+        self.clock = clock
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+        self.latency_ewma: Optional[float] = None
+        self.latency_baseline: Optional[float] = None
+        self._last_decrease = 0.0
+        self.calls = 0
+        self.errors = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _try_acquire(self) -> bool:
+        if not self._waiters and self._in_flight < self.limit:
+            self._in_flight += 1
+            return True
+        return False
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        """Block until a slot is free."""
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+        if waiter.event.wait(timeout):
+            return
+        with self._lock:
+            if waiter.granted:
+                return
+            self._waiters.remove(waiter)
+        raise self._timeout_error(timeout)
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> None:
+        """Wait for a slot without blocking the event loop."""
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                if waiter.granted:
+                    granted = True
+                else:
+                    granted = False
+                    self._waiters.remove(waiter)
+            if granted:
+                if isinstance(e, asyncio.TimeoutError):
+                    # The slot arrived just as the wait expired: keep it
+                    return
+                if waiter.future.done():
+                    self._release()
+                else:
+                    # ``wake`` passes the slot on once it sees the cancelled future
+                    waiter.future.cancel()
+                raise
+            waiter.future.cancel()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise self._timeout_error(timeout)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            ready = self._grant_waiting()
+        for waiter in ready:
+            waiter.wake(self)
+
+    def _grant_waiting(self):
+        # Called with the lock held: pass free slots to waiters in FIFO order
+        ready = []
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+            self._in_flight += 1
+            ready.append(waiter)
+        return ready
+
+    def _timeout_error(self, timeout):
+        return ExternalServiceTimeoutError(
+            f"No concurrency slot for {self.name} within {timeout}s",
+            details={"limit": self.limit, "in_flight": self._in_flight}
+        )
+
+    def record(self, latency: float, ok: bool = True) -> None:
+        """Feed one call outcome into the limit."""
+        with self._lock:
+            self.calls += 1
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+                self.latency_baseline = latency
+            else:
+                self.latency_ewma += self.smoothing * (latency - self.latency_ewma)
+                self.latency_baseline = min(
+                    latency, self.latency_baseline + 0.01 * (latency - self.latency_baseline)
+                )
+
+            congested = (
+                self.calls >= self.min_latency_samples
+                and self.latency_ewma > self.latency_baseline * self.latency_tolerance
+                and self.latency_ewma - self.latency_baseline > self.min_latency_delta
+            )
+            if not ok:
+                self.errors += 1
+            if not ok or congested:
+                now = self.clock()
+                if now - self._last_decrease >= self.cooldown:
+                    old = self.limit
+                    self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+                    self._last_decrease = now
+                    if self.limit != old:
+                        logger.info(
+                            "concurrency_limit_decreased",
+                            dependency=self.name,
+                            limit=self.limit,
+                            reason="error" if not ok else "latency"
+                        )
+            elif self._in_flight >= self.limit / 2:
+                # Only grow while the current limit is actually being used
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            ready = self._grant_waiting()
+        for waiter in ready:
+            waiter.wake(self)
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None):
+        """
+        Hold a slot around a blocking call and record its outcome.
+
+        Exceptions count as overload only when ``is_overload`` says so. Other
+        exceptions and abandoned calls (cancelled, generator closed) are not
+        recorded at all: their latency says nothing about the dependency.
+        """
+        self.acquire(timeout)
+        slot = Slot()
+        start = self.clock()
+        recorded = True
+        try:
+            yield slot
+        except _ABANDONED:
+            recorded = False
+            raise
+        except BaseException as e:
+            if is_overload(e):
+                slot.failed()
+            else:
+                recorded = False
+            raise
+        finally:
+            if recorded:
+                self.record(self.clock() - start, slot.ok)
+            self._release()
+
+    @asynccontextmanager
+    async def slot_async(self, timeout: Optional[float] = None):
+        """Hold a slot around an awaited call and record its outcome, as ``slot``."""
+        await self.acquire_async(timeout)
+        slot = Slot()
+        start = self.clock()
+        recorded = True
+        try:
+            yield slot
+        except _ABANDONED:
+            recorded = False
+            raise
+        except BaseException as e:
+            if is_overload(e):
+                slot.failed()
+            else:
+                recorded = False
+            raise
+        finally:
+            if recorded:
+                self.record(self.clock() - start, slot.ok)
+            self._release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiters),
+            "latency_ewma": self.latency_ewma,
+            "latency_baseline": self.latency_baseline,
+            "calls": self.calls,
+            "errors": self.errors,
+        }
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(key: str, **options) -> AdaptiveLimiter:
+    """Return the shared limiter for a dependency key (same keys as circuit breakers)."""
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            settings = get_settings()
+            options.setdefault("initial_limit", settings.adaptive_concurrency_initial)
+            options.setdefault("min_limit", settings.adaptive_concurrency_min)
+            options.setdefault("max_limit", settings.adaptive_concurrency_max)
+            options.setdefault("latency_tolerance", settings.adaptive_concurrency_latency_tolerance)
+            options.setdefault("min_latency_delta", settings.adaptive_concurrency_min_latency_delta_seconds)
+            limiter = AdaptiveLimiter(key, **options)
+            _limiters[key] = limiter
+        return limiter
+
+
+def limiter_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Current limit and latency figures of every limiter."""
+    with _limiters_lock:
+        return {key: limiter.snapshot() for key, limiter in _limiters.items()}
+
+
+def reset_limiters() -> None:
+    with _limiters_lock:
+        _limiters.clear()
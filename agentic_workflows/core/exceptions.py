@@ -197,3 +197,17 @@ class ExternalServiceTimeoutError(ExternalServiceError):
 class ExternalServiceUnavailableError(ExternalServiceError):
     """External service unavailable."""
     pass
+
+
+class CircuitOpenError(ExternalServiceUnavailableError):
+    """Call rejected locally by an open circuit breaker; nothing was sent."""
+    pass
+
+
+class ExternalServiceRateLimitedError(ExternalServiceError):
+    """External service rate limit reached (HTTP 429 or exhausted quota)."""
+    
+    @property
+    def retry_after(self) -> Optional[float]:
+        """Seconds the service asked callers to wait, if known."""
+        return self.details.get("retry_after_seconds")
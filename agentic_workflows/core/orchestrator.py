@@ -1,15 +1,27 @@
 from .spec import load_spec
 from .agents import PlannerAgent, ExecutorAgent, now_iso
-from .audit import AuditLog
+from .audit import AuditLog, audit_workflow
+from .results import ResultSink
 from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
 import time
 import uuid
 import platform
 import os
 
 class Orchestrator:
-    def __init__(self, audit_path="audit.log"):
+    def __init__(
+        self,
+        audit_path="audit.log",
+        results_dir: Optional[str] = None,
+        result_segment_records: int = 500,
+        compress_results: bool = True
+    ):
         self.audit = AuditLog(audit_path)
+        self.results_dir = results_dir
+        self.result_segment_records = result_segment_records
+        self.compress_results = compress_results
         self.planner = PlannerAgent(audit=self.audit)
         self.executor = ExecutorAgent(audit=self.audit)
 
@@ -23,6 +35,10 @@ class Orchestrator:
         - Numeric duration in seconds
         - Per-task timing and results
         - Run metadata (environment, host, etc.)
+        
+        If the orchestrator was created with ``results_dir``, full task results
+        are streamed to ``<results_dir>/<workflow_id>`` and the response only
+        carries per-task stubs plus a ``results_ref`` summary.
         """
         # Generate unique run ID
         run_id = f"wf_{uuid.uuid4().hex}"
@@ -43,10 +59,21 @@ class Orchestrator:
             "spec_name": spec.name,
             "dry_run": dry_run,
             "tasks_count": len(plan)
-        })
+        }, level="summary")
         
-        # Execute plan
-        exec_output = self.executor.execute_plan(plan, dry_run=dry_run)
+        # Execute plan, streaming results to disk when a store is configured
+        sink = None
+        if self.results_dir:
+            sink = ResultSink(
+                str(Path(self.results_dir) / run_id),
+                segment_records=self.result_segment_records,
+                compress=self.compress_results
+            )
+        try:
+            with audit_workflow(run_id):
+                exec_output = self.executor.execute_plan(plan, dry_run=dry_run, sink=sink)
+        finally:
+            results_ref = sink.close() if sink else None
         
         # Timing
         end_time = time.time()
@@ -81,6 +108,7 @@ class Orchestrator:
             
             # Detailed results
             "results": results,
+            "results_ref": results_ref,
             
             # Metadata
             "metadata": {
@@ -101,6 +129,7 @@ class Orchestrator:
             "duration": total_duration,
             "tasks_completed": response["tasks_completed"],
             "tasks_failed": response["tasks_failed"]
-        })
+        }, level="summary")
+        self.audit.flush()
         
         return response
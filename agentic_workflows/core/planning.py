@@ -0,0 +1,245 @@
+"""Deterministic workflow planning: dependency levels, critical path and cost model."""
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+
+from .exceptions import WorkflowValidationError
+from .results import read_task_timings
+from .spec import TaskSpec, WorkflowSpec
+from ..config import get_settings
+
+logger = structlog.get_logger()
+
+
+def task_dependencies(spec: WorkflowSpec) -> Dict[str, List[str]]:
+    """Dependencies of each task, checked to name tasks of the spec."""
+    ids = [task.id for task in spec.tasks]
+    if len(set(ids)) != len(ids):
+        duplicates = sorted({task_id for task_id in ids if ids.count(task_id) > 1})
+        raise WorkflowValidationError(
+            f"Duplicate task ids: {duplicates}",
+            details={"tasks": duplicates}
+        )
+    known = set(ids)
+    dependencies = {}
+    for task in spec.tasks:
+        missing = [dep for dep in task.depends_on if dep not in known]
+        if missing:
+            raise WorkflowValidationError(
+                f"Task {task.id} depends on unknown tasks {missing}",
+                details={"task_id": task.id, "missing": missing}
+            )
+        dependencies[task.id] = list(task.depends_on)
+    return dependencies
+
+
+def parallel_groups(spec: WorkflowSpec) -> List[List[str]]:
+    """
+    Tasks grouped into levels that can run in parallel.
+
+    A task's level is one more than its deepest dependency, so every group
+    only depends on earlier groups. Within a group tasks keep spec order,
+    which makes the result deterministic.
+    """
+    dependencies = task_dependencies(spec)
+    level: Dict[str, int] = {}
+    remaining = [task.id for task in spec.tasks]
+    while remaining:
+        ready = [
+            task_id for task_id in remaining
+            if all(dep in level for dep in dependencies[task_id])
+        ]
+        if not ready:
+            raise WorkflowValidationError(
+                f"Dependency cycle between tasks {remaining}",
+                details={"tasks": remaining}
+            )
+        for task_id in ready:
+            level[task_id] = 1 + max((level[dep] for dep in dependencies[task_id]), default=-1)
+        remaining = [task_id for task_id in remaining if task_id not in level]
+
+    groups: List[List[str]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+    for task in spec.tasks:
+        groups[level[task.id]].append(task.id)
+    return groups
+
+
+def critical_path(spec: WorkflowSpec, durations: Dict[str, float]) -> Tuple[List[str], float]:
+    """Longest chain of dependent tasks by duration, and its total seconds."""
+    dependencies = task_dependencies(spec)
+    finish: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+    for group in parallel_groups(spec):
+        for task_id in group:
+            slowest = max(dependencies[task_id], key=lambda dep: finish[dep], default=None)
+            previous[task_id] = slowest
+            finish[task_id] = (finish[slowest] if slowest else 0.0) + durations.get(task_id, 0.0)
+    if not finish:
+        return [], 0.0
+
+    # Ties go to the task that appears first in the spec
+    end = max(finish, key=lambda task_id: finish[task_id])
+    path = [end]
+    while previous[path[-1]] is not None:
+        path.append(previous[path[-1]])
+    return list(reversed(path)), finish[end]
+
+
+@dataclass
+class TaskEstimate:
+    """Estimated duration of one task and where it came from."""
+    seconds: float
+    source: str  # "task", "type" or "default"
+    samples: int = 0
+
+
+class CostModel:
+    """
+    Task durations learned from past runs.
+
+    A task is estimated from the median of its own earlier runs in the same
+    workflow, then from the median of every run of its plugin type, then
+    from ``default_seconds``. Medians keep one slow outlier from moving the
+    estimate. Per-run overhead outside the tasks is learned the same way.
+    Only the most recent ``max_samples`` observations per key are kept.
+    """
+
+    def __init__(self, default_seconds: float = 5.0, min_samples: int = 1, max_samples: int = 200):
+        self.default_seconds = default_seconds
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self._by_task: Dict[Tuple[str, str], Deque[float]] = {}
+        self._by_type: Dict[str, Deque[float]] = {}
+        self._overhead: Deque[float] = deque(maxlen=max_samples)
+        self.runs = 0
+
+    def _samples(self, store: Dict[Any, Deque[float]], key: Any) -> Deque[float]:
+        samples = store.get(key)
+        if samples is None:
+            samples = store[key] = deque(maxlen=self.max_samples)
+        return samples
+
+    def observe(self, workflow_name: str, task_id: str, task_type: str, seconds: float) -> None:
+        self._samples(self._by_task, (workflow_name, task_id)).append(seconds)
+        self._samples(self._by_type, task_type).append(seconds)
+
+    def observe_run(self, result: Dict[str, Any]) -> None:
+        """Learn from the stored summary of one completed execution."""
+        timings = [
+            t for t in result.get("task_timings") or []
+            if t.get("status") != "failed" and t.get("duration_seconds") is not None
+        ]
+        if not timings:
+            return
+        self.runs += 1
+        workflow_name = result.get("workflow_name", "")
+        for timing in timings:
+            self.observe(workflow_name, timing["task_id"], timing.get("type", ""), float(timing["duration_seconds"]))
+        total = result.get("duration_seconds")
+        if total is not None:
+            self._overhead.append(max(0.0, float(total) - sum(float(t["duration_seconds"]) for t in timings)))
+
+    def estimate(self, task: TaskSpec, workflow_name: str = "") -> TaskEstimate:
+        samples = self._by_task.get((workflow_name, task.id))
+        if samples and len(samples) >= self.min_samples:
+            return TaskEstimate(statistics.median(samples), "task", len(samples))
+        samples = self._by_type.get(task.type)
+        if samples and len(samples) >= self.min_samples:
+            return TaskEstimate(statistics.median(samples), "type", len(samples))
+        return TaskEstimate(self.default_seconds, "default")
+
+    @property
+    def overhead_seconds(self) -> float:
+        return statistics.median(self._overhead) if self._overhead else 0.0
+
+    @classmethod
+    def fit(cls, results: Iterable[Dict[str, Any]], **kwargs) -> "CostModel":
+        """Model fitted on execution summaries, oldest first."""
+        model = cls(**kwargs)
+        for result in results:
+            model.observe_run(result or {})
+        return model
+
+
+def load_task_timings(results_ref: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-task timings of one run, read from its result store's timings sidecar."""
+    if not results_ref or not results_ref.get("location"):
+        return []
+    try:
+        return read_task_timings(results_ref["location"])
+    except (OSError, ValueError) as e:
+        # Pruned or unreadable results only cost this run's samples
+        logger.debug("task_timings_unavailable", location=results_ref.get("location"), error=str(e))
+        return []
+
+
+def load_execution_history(limit: int = 500) -> List[Dict[str, Any]]:
+    """
+    Result summaries of the most recent completed executions, oldest first,
+    each with the ``task_timings`` of its stored task results.
+    """
+    from ..db.database import get_db_context
+    from ..db.models import WorkflowExecution
+
+    with get_db_context() as db:
+        rows = (
+            db.query(WorkflowExecution.result)
+            .filter(WorkflowExecution.status == "completed")
+            .order_by(WorkflowExecution.completed_at.desc())
+            .limit(limit)
+            .all()
+        )
+    return [
+        {**row.result, "task_timings": load_task_timings(row.result.get("results_ref"))}
+        for row in reversed(rows) if row.result
+    ]
+
+
+_model: Optional[CostModel] = None
+_fitted_at = 0.0
+_refitting = False
+_model_lock = threading.Lock()
+
+
+def get_cost_model() -> CostModel:
+    """
+    Process-wide cost model, refitted from the database at most every
+    ``cost_model_refresh_seconds``. Without a database it falls back to
+    defaults.
+
+    The history is read outside the lock; while one caller refits, the
+    others keep getting the previous model.
+    """
+    global _model, _fitted_at, _refitting
+    settings = get_settings()
+    with _model_lock:
+        fresh = _model is not None and time.monotonic() - _fitted_at < settings.cost_model_refresh_seconds
+        if fresh or (_model is not None and _refitting):
+            return _model
+        _refitting = True
+    try:
+        try:
+            history = load_execution_history(settings.cost_model_history_limit)
+        except Exception as e:
+            logger.warning("cost_model_history_unavailable", error=str(e))
+            history = []
+        model = CostModel.fit(history, default_seconds=settings.planner_default_task_seconds)
+    except BaseException:
+        with _model_lock:
+            _refitting = False
+        raise
+    with _model_lock:
+        _model, _fitted_at, _refitting = model, time.monotonic(), False
+    logger.info("cost_model_fitted", runs=model.runs)
+    return model
+
+
+def reset_cost_model() -> None:
+    global _model
+    with _model_lock:
+        _model = None
@@ -0,0 +1,242 @@
+"""Outbound token-bucket rate limiting with Retry-After / X-RateLimit awareness."""
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import structlog
+
+from ..config import get_settings
+from .exceptions import ExternalServiceRateLimitedError
+
+logger = structlog.get_logger()
+
+_PERIODS = {"s": 1.0, "sec": 1.0, "second": 1.0, "m": 60.0, "min": 60.0, "minute": 60.0,
+            "h": 3600.0, "hour": 3600.0, "d": 86400.0, "day": 86400.0}
+
+
+def parse_rate(spec: str) -> Tuple[float, Optional[int]]:
+    """
+    Parse ``"<count>/<period>[:<burst>]"`` into (tokens per second, burst).
+
+    Periods are a unit (``s``, ``min``, ``hour``...) or a number of seconds:
+    ``"10/s"``, ``"600/min:20"``, ``"5000/3600"``.
+    """
+    spec = spec.strip()
+    burst = None
+    if ":" in spec:
+        spec, burst_part = spec.rsplit(":", 1)
+        burst = int(burst_part)
+    count, _, period = spec.partition("/")
+    period = period.strip() or "s"
+    seconds = _PERIODS.get(period.lower())
+    if seconds is None:
+        seconds = float(period)
+    return float(count) / seconds, burst
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[float, Optional[int]]]:
+    """Parse ``"key=rate,key=rate"`` (see ``parse_rate``) into a dict."""
+    limits = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        key, _, rate = part.partition("=")
+        limits[key.strip()] = parse_rate(rate)
+    return limits
+
+
+def _retry_after_seconds(value: str) -> Optional[float]:
+    # Either delta-seconds or an HTTP date
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _reset_seconds(value: str) -> Optional[float]:
+    # X-RateLimit-Reset is epoch seconds on some APIs and a delta on others
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    if reset > 1e9:
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+def backoff_from_headers(headers: Mapping[str, str], status_code: Optional[int] = None) -> Optional[float]:
+    """
+    Seconds the server asked us to wait, or ``None``.
+
+    Honors ``Retry-After`` and, when the remaining quota reported by
+    ``X-RateLimit-Remaining`` / ``RateLimit-Remaining`` is zero, the matching
+    ``*-Reset`` header. Header lookup is case-insensitive.
+    """
+    lowered = {k.lower(): v for k, v in (headers or {}).items()}
+    if "retry-after" in lowered and (status_code in (None, 429, 503)):
+        wait = _retry_after_seconds(str(lowered["retry-after"]))
+        if wait is not None:
+            return wait
+    for prefix in ("x-ratelimit-", "ratelimit-"):
+        remaining = lowered.get(prefix + "remaining")
+        if remaining is None:
+            continue
+        try:
+            exhausted = float(remaining) <= 0
+        except ValueError:
+            continue
+        if exhausted and prefix + "reset" in lowered:
+            return _reset_seconds(str(lowered[prefix + "reset"]))
+    return None
+
+
+class TokenBucket:
+    """
+    Thread- and task-safe token bucket for one host or credential.
+
+    ``rate`` tokens per second refill up to ``burst``; ``rate=None`` means
+    no steady-state limit, so the bucket only enforces server-requested
+    pauses. ``pause(seconds)`` holds back every caller of this bucket (and
+    only this bucket) until the server's window reopens.
+    """
+
+    def __init__(self, name: str, rate: Optional[float] = None, burst: Optional[int] = None):
+        self.name = name
+        self._lock = threading.Lock()
+        self.configure(rate, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self.waits = 0
+        self.pauses = 0
+
+    def configure(self, rate: Optional[float], burst: Optional[int] = None) -> None:
+        with self._lock:
+            self.rate = rate
+            self.burst = burst or (max(1, int(rate)) if rate else 1)
+            if hasattr(self, "_tokens"):
+                self._tokens = min(self._tokens, float(self.burst))
+
+    def _reserve(self) -> float:
+        """Take a token if one is free; otherwise return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.rate is None:
+                return 0.0
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def _deadline_error(self, timeout):
+        return ExternalServiceRateLimitedError(
+            f"Rate limit for {self.name} not available within {timeout}s",
+            details={"bucket": self.name, "retry_after_seconds": self.wait_time()}
+        )
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        """Block until a token is available."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise self._deadline_error(timeout)
+            self.waits += 1
+            time.sleep(wait)
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> None:
+        """Wait for a token without blocking the event loop."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise self._deadline_error(timeout)
+            self.waits += 1
+            await asyncio.sleep(wait)
+
+    def wait_time(self) -> float:
+        """Seconds until the bucket accepts calls again (ignoring refill)."""
+        with self._lock:
+            return max(0.0, self._paused_until - time.monotonic())
+
+    def pause(self, seconds: float) -> None:
+        """Reject (delay) every call on this bucket for ``seconds``."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._paused_until:
+                self._paused_until = until
+                self._tokens = 0.0
+                self._updated = until
+                self.pauses += 1
+        logger.info("rate_limit_paused", bucket=self.name, seconds=round(seconds, 3))
+
+    def update_from_response(self, headers: Mapping[str, str], status_code: Optional[int] = None) -> Optional[float]:
+        """Apply server rate-limit headers; returns the pause applied, if any."""
+        wait = backoff_from_headers(headers, status_code)
+        if wait is None and status_code == 429:
+            # 429 without guidance: back off one refill interval (at least 1s)
+            wait = max(1.0, 1.0 / self.rate) if self.rate else 1.0
+        if wait:
+            self.pause(wait)
+        return wait
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "paused_for": round(self.wait_time(), 3),
+            "waits": self.waits,
+            "pauses": self.pauses,
+        }
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str, rate: Optional[str] = None) -> TokenBucket:
+    """
+    Return the shared bucket for a host or credential key.
+
+    The key's bucket is configured from ``OUTBOUND_RATE_LIMITS`` and
+    otherwise only honors server-sent pauses. A ``rate`` (``"10/s"`` etc.,
+    e.g. from a task spec) gets its own bucket, shared by callers asking for
+    the same key and rate; it never reconfigures the key's bucket, which
+    callers should still acquire for its limit and pauses.
+    """
+    with _buckets_lock:
+        name = key if rate is None else f"{key}@{rate.strip()}"
+        bucket = _buckets.get(name)
+        if bucket is None:
+            if rate is None:
+                configured = parse_rate_limits(get_settings().outbound_rate_limits).get(key)
+            else:
+                configured = parse_rate(rate)
+            bucket = TokenBucket(name, *(configured or (None, None)))
+            _buckets[name] = bucket
+        return bucket
+
+
+def rate_limiter_snapshot() -> Dict[str, Dict[str, Any]]:
+    with _buckets_lock:
+        return {key: bucket.snapshot() for key, bucket in _buckets.items()}
+
+
+def reset_rate_limiters() -> None:
+    with _buckets_lock:
+        _buckets.clear()
@@ -0,0 +1,211 @@
+"""Streaming result sink for workflow executions."""
+import gzip
+import json
+from pathlib import Path
+from typing import Dict, Any, List
+
+MANIFEST_NAME = "manifest.json"
+# Uncompressed per-task timings, so planning never reads the payloads
+TIMINGS_NAME = "timings.ndjson"
+TIMING_FIELDS = ("task_id", "type", "status", "duration_seconds")
+
+# Keys that carry the (potentially huge) task payload. Everything else in a
+# task entry is small metadata and stays in the in-memory run summary.
+PAYLOAD_KEYS = ("result", "plan")
+
+
+class ResultSink:
+    """
+    Writes per-task results to NDJSON segment files as tasks finish.
+
+    Each run gets its own directory containing ``part-NNNNN.ndjson[.gz]``
+    segments of at most ``segment_records`` records, a ``timings.ndjson``
+    sidecar with the timing fields of each task, and a ``manifest.json``
+    written on close. Only counters are kept in memory, so the footprint of a
+    run does not depend on how much output its tasks produce.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_records: int = 500,
+        compress: bool = True
+    ):
+        if segment_records < 1:
+            raise ValueError("segment_records must be at least 1")
+        self.directory = Path(directory)
+        self.segment_records = segment_records
+        self.compress = compress
+        self.records_written = 0
+        self.bytes_written = 0
+        self.status_counts: Dict[str, int] = {}
+        self._segment = -1
+        self._fh = None
+        self._timings_fh = None
+        self._closed = False
+
+    def _segment_path(self, index: int) -> Path:
+        suffix = ".ndjson.gz" if self.compress else ".ndjson"
+        return self.directory / f"part-{index:05d}{suffix}"
+
+    def _roll(self) -> None:
+        """Close the current segment and open the next one."""
+        if self._fh is not None:
+            self._fh.close()
+        self._segment += 1
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._segment_path(self._segment)
+        self._fh = gzip.open(path, "wb") if self.compress else path.open("wb")
+
+    def write(self, task_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Persist a task entry and return its compact in-memory stub.
+
+        The stub keeps status, timing and error fields and replaces the
+        payload with a ``ref`` pointing at the record's position in the store.
+        """
+        if self._closed:
+            raise RuntimeError("ResultSink is closed")
+        if self.records_written % self.segment_records == 0:
+            self._roll()
+
+        line = json.dumps({"task_id": task_id, **entry}, ensure_ascii=False, default=str)
+        data = (line + "\n").encode("utf-8")
+        self._fh.write(data)
+        if self._timings_fh is None:
+            self._timings_fh = (self.directory / TIMINGS_NAME).open("w", encoding="utf-8")
+        timing = {"task_id": task_id, **{f: entry.get(f) for f in TIMING_FIELDS[1:]}}
+        self._timings_fh.write(json.dumps(timing, default=str) + "\n")
+
+        index = self.records_written
+        self.records_written += 1
+        self.bytes_written += len(data)
+        status = entry.get("status", "unknown")
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+        stub = {k: v for k, v in entry.items() if k not in PAYLOAD_KEYS}
+        stub["ref"] = {"segment": self._segment, "index": index}
+        return stub
+
+    def summary(self) -> Dict[str, Any]:
+        """Return references and aggregates describing the stored results."""
+        return {
+            "location": str(self.directory),
+            "records": self.records_written,
+            "segments": self._segment + 1,
+            "segment_records": self.segment_records,
+            "compressed": self.compress,
+            "bytes_written": self.bytes_written,
+            "status_counts": dict(self.status_counts),
+        }
+
+    def close(self) -> Dict[str, Any]:
+        """Flush the open segment and write the manifest."""
+        if self._closed:
+            return self.summary()
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if self._timings_fh is not None:
+            self._timings_fh.close()
+            self._timings_fh = None
+        self._closed = True
+
+        summary = self.summary()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / MANIFEST_NAME).write_text(json.dumps(summary), encoding="utf-8")
+        return summary
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _iter_segment(path: Path):
+    opener = gzip.open if path.name.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_results(directory: str):
+    """Yield every stored task record of a run, in write order, one segment at a time."""
+    run_dir = Path(directory)
+    manifest_path = run_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"No result manifest in {run_dir}")
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    suffix = ".ndjson.gz" if manifest["compressed"] else ".ndjson"
+    for segment in range(manifest["segments"]):
+        yield from _iter_segment(run_dir / f"part-{segment:05d}{suffix}")
+
+
+def read_task_timings(directory: str) -> List[Dict[str, Any]]:
+    """Timing fields of every task of a run, read from the sidecar only."""
+    run_dir = Path(directory)
+    if not (run_dir / MANIFEST_NAME).exists():
+        raise FileNotFoundError(f"No result manifest in {run_dir}")
+    path = run_dir / TIMINGS_NAME
+    if not path.exists():
+        # Run without tasks
+        return []
+    with path.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def read_results(directory: str, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+    """
+    Read one page of stored task results.
+
+    Only the segments overlapping ``[offset, offset + limit)`` are opened.
+
+    Args:
+        directory: Run directory produced by ``ResultSink``
+        offset: Index of the first record to return
+        limit: Maximum number of records to return
+
+    Returns:
+        Dict with ``items``, ``offset``, ``limit``, ``total`` and ``next_offset``
+    """
+    if offset < 0 or limit < 1:
+        raise ValueError("offset must be >= 0 and limit must be >= 1")
+
+    run_dir = Path(directory)
+    manifest_path = run_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"No result manifest in {run_dir}")
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    total = manifest["records"]
+    per_segment = manifest["segment_records"]
+    suffix = ".ndjson.gz" if manifest["compressed"] else ".ndjson"
+
+    items: List[Dict[str, Any]] = []
+    end = min(offset + limit, total)
+    position = offset
+    while position < end:
+        segment = position // per_segment
+        skip = position - segment * per_segment
+        path = run_dir / f"part-{segment:05d}{suffix}"
+        for i, record in enumerate(_iter_segment(path)):
+            if i < skip:
+                continue
+            items.append(record)
+            position += 1
+            if position >= end:
+                break
+        else:
+            # Segment ended early (truncated write); stop rather than spin
+            if position < (segment + 1) * per_segment:
+                break
+
+    return {
+        "items": items,
+        "offset": offset,
+        "limit": limit,
+        "total": total,
+        "next_offset": position if position < total else None,
+    }
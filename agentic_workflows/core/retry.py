@@ -1,7 +1,14 @@
-"""Retry logic and circuit breaker implementation."""
+"""Retry logic, circuit breaker and timeout implementation."""
+import asyncio
+import contextvars
 import time
 import functools
-from typing import Callable, Optional, Type, Tuple, Any
+import inspect
+import logging
+import multiprocessing
+import threading
+from typing import Callable, Optional, Type, Tuple, Any, Dict
+from urllib.parse import urlsplit
 from enum import Enum
 import structlog
 from tenacity import (
@@ -13,11 +20,14 @@ from tenacity import (
     after_log
 )
 
+from ..config import get_settings
 from .exceptions import (
     TaskRetryExhaustedError,
+    TaskTimeoutError,
     ExternalServiceError,
     ExternalServiceTimeoutError,
-    ExternalServiceUnavailableError
+    ExternalServiceUnavailableError,
+    CircuitOpenError
 )
 
 logger = structlog.get_logger()
@@ -31,40 +41,121 @@ class CircuitState(Enum):
 
 
 class CircuitBreaker:
-    """Circuit breaker pattern implementation."""
+    """
+    Circuit breaker pattern implementation.
+    
+    State changes are guarded by a lock, so one breaker can be shared by
+    threads and asyncio tasks. In HALF_OPEN only ``half_open_max_calls``
+    trial calls are let through; the rest are rejected until one succeeds.
+    
+    A trial that ends without recording an outcome (cancelled, abandoned
+    or failing with an unexpected exception) must hand its slot back with
+    ``release()``; slots held longer than ``recovery_timeout`` expire.
+    """
     
     def __init__(
         self,
         failure_threshold: int = 5,
         recovery_timeout: int = 60,
-        expected_exception: Type[Exception] = Exception
+        expected_exception: Type[Exception] = Exception,
+        name: Optional[str] = None,
+        half_open_max_calls: int = 1
     ):
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
         self.expected_exception = expected_exception
+        self.name = name
+        self.half_open_max_calls = half_open_max_calls
         self.failure_count = 0
         self.last_failure_time: Optional[float] = None
         self.state = CircuitState.CLOSED
+        self._half_open_calls = 0
+        self._half_open_since = 0.0
+        # Bumped on every HALF_OPEN period, so stale releases are ignored
+        self._trial_generation = 0
+        self._lock = threading.Lock()
+    
+    def before_call(self, label: str = "call") -> Optional[int]:
+        """
+        Reserve a call slot or raise if the circuit is open.
+        
+        Returns a token for ``release()`` when the call is a half-open
+        trial, otherwise None.
+        """
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                if self._should_attempt_reset():
+                    self.state = CircuitState.HALF_OPEN
+                    self._half_open_calls = 0
+                    self._half_open_since = time.time()
+                    self._trial_generation += 1
+                    logger.info("circuit_breaker_half_open", breaker=self.name, func=label)
+                else:
+                    raise CircuitOpenError(
+                        f"Circuit breaker is OPEN for {self.name or label}",
+                        details={"failure_count": self.failure_count, "breaker": self.name}
+                    )
+            if self.state == CircuitState.HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    if time.time() - self._half_open_since < self.recovery_timeout:
+                        raise CircuitOpenError(
+                            f"Circuit breaker is HALF_OPEN for {self.name or label}, trial in progress",
+                            details={"failure_count": self.failure_count, "breaker": self.name}
+                        )
+                    # The trial never reported back; start a new one
+                    logger.warning("circuit_breaker_trial_expired", breaker=self.name, func=label)
+                    self._half_open_calls = 0
+                    self._half_open_since = time.time()
+                    self._trial_generation += 1
+                self._half_open_calls += 1
+                return self._trial_generation
+            return None
+    
+    def release(self, token: Optional[int]) -> None:
+        """
+        Hand back a trial slot without recording an outcome.
+        
+        Safe to call after ``record_success``/``record_failure`` or for a
+        call that was not a trial; it then does nothing.
+        """
+        if token is None:
+            return
+        with self._lock:
+            if (
+                self.state == CircuitState.HALF_OPEN
+                and token == self._trial_generation
+                and self._half_open_calls > 0
+            ):
+                self._half_open_calls -= 1
     
     def call(self, func: Callable, *args, **kwargs) -> Any:
         """Execute function with circuit breaker protection."""
-        if self.state == CircuitState.OPEN:
-            if self._should_attempt_reset():
-                self.state = CircuitState.HALF_OPEN
-                logger.info("circuit_breaker_half_open", func=func.__name__)
-            else:
-                raise ExternalServiceUnavailableError(
-                    f"Circuit breaker is OPEN for {func.__name__}",
-                    details={"failure_count": self.failure_count}
-                )
-        
+        token = self.before_call(func.__name__)
         try:
             result = func(*args, **kwargs)
-            self._on_success()
-            return result
-        except self.expected_exception as e:
-            self._on_failure()
+        except self.expected_exception:
+            self.record_failure()
             raise
+        except BaseException:
+            self.release(token)
+            raise
+        self.record_success()
+        return result
+    
+    async def call_async(self, func: Callable, *args, **kwargs) -> Any:
+        """Await a coroutine function with circuit breaker protection."""
+        token = self.before_call(func.__name__)
+        try:
+            result = await func(*args, **kwargs)
+        except self.expected_exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Cancelled or unexpected: neither proves nor disproves recovery
+            self.release(token)
+            raise
+        self.record_success()
+        return result
     
     def _should_attempt_reset(self) -> bool:
         """Check if enough time has passed to attempt reset."""
@@ -72,25 +163,113 @@ class CircuitBreaker:
             return True
         return time.time() - self.last_failure_time >= self.recovery_timeout
     
-    def _on_success(self):
+    def record_success(self):
         """Handle successful execution."""
-        self.failure_count = 0
-        if self.state == CircuitState.HALF_OPEN:
-            self.state = CircuitState.CLOSED
-            logger.info("circuit_breaker_closed")
+        with self._lock:
+            self.failure_count = 0
+            if self.state == CircuitState.HALF_OPEN:
+                self.state = CircuitState.CLOSED
+                logger.info("circuit_breaker_closed", breaker=self.name)
     
-    def _on_failure(self):
+    def record_failure(self):
         """Handle failed execution."""
-        self.failure_count += 1
-        self.last_failure_time = time.time()
-        
-        if self.failure_count >= self.failure_threshold:
-            self.state = CircuitState.OPEN
-            logger.warning(
-                "circuit_breaker_opened",
-                failure_count=self.failure_count,
-                threshold=self.failure_threshold
-            )
+        with self._lock:
+            self.failure_count += 1
+            self.last_failure_time = time.time()
+            
+            if self.state == CircuitState.HALF_OPEN or self.failure_count >= self.failure_threshold:
+                if self.state != CircuitState.OPEN:
+                    logger.warning(
+                        "circuit_breaker_opened",
+                        breaker=self.name,
+                        failure_count=self.failure_count,
+                        threshold=self.failure_threshold
+                    )
+                self.state = CircuitState.OPEN
+    
+    # Backwards-compatible names
+    _on_success = record_success
+    _on_failure = record_failure
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state for health and metrics endpoints."""
+        return {
+            "name": self.name,
+            "state": self.state.value,
+            "failure_count": self.failure_count,
+            "last_failure_time": self.last_failure_time,
+        }
+
+
+class CircuitBreakerRegistry:
+    """
+    Process-wide circuit breakers keyed by dependency.
+    
+    Keys name the thing that fails, not the caller: ``http://api.host:443``,
+    ``db:postgresql://db.host/app`` or ``llm:openai``. Every workflow and
+    plugin calling the same dependency shares one breaker, so an outage is
+    detected once and rejected fast everywhere.
+    """
+    
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+    
+    def get(
+        self,
+        key: str,
+        failure_threshold: int = 5,
+        recovery_timeout: int = 60,
+        expected_exception: Type[Exception] = Exception
+    ) -> CircuitBreaker:
+        """Return the breaker for ``key``; settings apply on first creation only."""
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    failure_threshold=failure_threshold,
+                    recovery_timeout=recovery_timeout,
+                    expected_exception=expected_exception,
+                    name=key
+                )
+                self._breakers[key] = breaker
+            return breaker
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {key: breaker.snapshot() for key, breaker in self._breakers.items()}
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+
+circuit_breakers = CircuitBreakerRegistry()
+
+
+def get_circuit_breaker(key: str, **options) -> CircuitBreaker:
+    """Return the shared circuit breaker for a dependency key."""
+    if "failure_threshold" not in options or "recovery_timeout" not in options:
+        settings = get_settings()
+        options.setdefault("failure_threshold", settings.circuit_breaker_failure_threshold)
+        options.setdefault("recovery_timeout", settings.circuit_breaker_recovery_seconds)
+    return circuit_breakers.get(key, **options)
+
+
+def breaker_key_for_url(url: str) -> str:
+    """Dependency key for an HTTP endpoint: scheme, host and port."""
+    parts = urlsplit(url or "")
+    port = parts.port or {"http": 80, "https": 443}.get(parts.scheme, "")
+    return f"{parts.scheme}://{parts.hostname}:{port}"
+
+
+def breaker_key_for_dsn(dsn: str) -> str:
+    """Dependency key for a database DSN, without credentials."""
+    parts = urlsplit(dsn or "")
+    if not parts.hostname:
+        return f"db:{dsn}"
+    port = f":{parts.port}" if parts.port else ""
+    return f"db:{parts.scheme}://{parts.hostname}{port}{parts.path}"
 
 
 def with_retry(
@@ -103,6 +282,9 @@ def with_retry(
     """
     Decorator for retrying functions with exponential backoff.
     
+    Works on both regular and ``async def`` functions; coroutines sleep with
+    ``asyncio.sleep`` between attempts instead of blocking the event loop.
+    
     Args:
         max_attempts: Maximum number of retry attempts
         wait_min: Minimum wait time between retries (seconds)
@@ -111,30 +293,47 @@ def with_retry(
         reraise: Whether to reraise the exception after exhausting retries
     """
     def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        @retry(
+        retry_policy = retry(
             stop=stop_after_attempt(max_attempts),
             wait=wait_exponential(multiplier=1, min=wait_min, max=wait_max),
             retry=retry_if_exception_type(retry_on),
-            before_sleep=before_sleep_log(logger, "warning"),
-            after=after_log(logger, "info"),
+            before_sleep=before_sleep_log(logger, logging.WARNING),
+            after=after_log(logger, logging.INFO),
             reraise=reraise
         )
+        
+        def on_error(e: Exception):
+            logger.error(
+                "function_retry_failed",
+                func=func.__name__,
+                error=str(e),
+                exc_info=True
+            )
+            if reraise:
+                raise TaskRetryExhaustedError(
+                    f"Function {func.__name__} failed after {max_attempts} attempts",
+                    details={"error": str(e)}
+                )
+        
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            @retry_policy
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                except retry_on as e:
+                    on_error(e)
+                    raise
+            
+            return async_wrapper
+        
+        @functools.wraps(func)
+        @retry_policy
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
             except retry_on as e:
-                logger.error(
-                    "function_retry_failed",
-                    func=func.__name__,
-                    error=str(e),
-                    exc_info=True
-                )
-                if reraise:
-                    raise TaskRetryExhaustedError(
-                        f"Function {func.__name__} failed after {max_attempts} attempts",
-                        details={"error": str(e)}
-                    )
+                on_error(e)
                 raise
         
         return wrapper
@@ -144,7 +343,8 @@ def with_retry(
 def with_circuit_breaker(
     failure_threshold: int = 5,
     recovery_timeout: int = 60,
-    expected_exception: Type[Exception] = Exception
+    expected_exception: Type[Exception] = Exception,
+    key: Optional[str] = None
 ):
     """
     Decorator for circuit breaker pattern.
@@ -153,14 +353,27 @@ def with_circuit_breaker(
         failure_threshold: Number of failures before opening circuit
         recovery_timeout: Seconds to wait before attempting recovery
         expected_exception: Exception type to catch
+        key: Dependency key; decorated functions with the same key share
+            one breaker from the process-wide registry. Without a key the
+            decorated function gets a private breaker.
     """
-    circuit_breaker = CircuitBreaker(
+    options = dict(
         failure_threshold=failure_threshold,
         recovery_timeout=recovery_timeout,
         expected_exception=expected_exception
     )
+    if key is not None:
+        circuit_breaker = get_circuit_breaker(key, **options)
+    else:
+        circuit_breaker = CircuitBreaker(**options)
     
     def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await circuit_breaker.call_async(func, *args, **kwargs)
+            return async_wrapper
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             return circuit_breaker.call(func, *args, **kwargs)
@@ -168,31 +381,141 @@ def with_circuit_breaker(
     return decorator
 
 
-def with_timeout(seconds: int):
+TIMEOUT_ISOLATION = ("thread", "process")
+
+
+def run_with_timeout(
+    func: Callable,
+    seconds: Optional[float],
+    *args,
+    isolation: str = "thread",
+    **kwargs
+) -> Any:
+    """
+    Run a synchronous callable and raise ``TaskTimeoutError`` after ``seconds``.
+    
+    Unlike ``signal.alarm`` this works from any thread, accepts fractional
+    seconds and leaves signal handlers alone.
+    
+    isolation:
+        thread: run in a daemon thread (with the caller's context variables).
+            On timeout the caller gets control back immediately but the
+            thread cannot be killed; it is abandoned and finishes on its own.
+        process: run in a forked child process that is terminated on
+            timeout. The return value must be picklable. Falls back to
+            ``thread`` where fork is unavailable.
+    
+    ``seconds`` of ``None`` or ``<= 0`` calls ``func`` directly.
+    """
+    if isolation not in TIMEOUT_ISOLATION:
+        raise ValueError(f"isolation must be one of {TIMEOUT_ISOLATION}, got {isolation!r}")
+    if not seconds or seconds <= 0:
+        return func(*args, **kwargs)
+    
+    name = getattr(func, "__qualname__", repr(func))
+    if isolation == "process":
+        if "fork" in multiprocessing.get_all_start_methods():
+            return _run_in_process(func, seconds, name, args, kwargs)
+        logger.warning("timeout_process_isolation_unavailable", func=name)
+    return _run_in_thread(func, seconds, name, args, kwargs)
+
+
+def _timeout_error(name: str, seconds: float, isolation: str) -> TaskTimeoutError:
+    return TaskTimeoutError(
+        f"{name} timed out after {seconds}s",
+        details={"timeout_seconds": seconds, "isolation": isolation}
+    )
+
+
+def _run_in_thread(func, seconds, name, args, kwargs):
+    outcome: Dict[str, Any] = {}
+    context = contextvars.copy_context()
+    
+    def target():
+        try:
+            outcome["result"] = context.run(func, *args, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+    
+    worker = threading.Thread(target=target, name=f"timeout:{name}", daemon=True)
+    worker.start()
+    worker.join(seconds)
+    if worker.is_alive():
+        logger.warning("timeout_thread_abandoned", func=name, timeout=seconds)
+        raise _timeout_error(name, seconds, "thread")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
+
+
+def _run_in_process(func, seconds, name, args, kwargs):
+    ctx = multiprocessing.get_context("fork")
+    receiver, sender = ctx.Pipe(duplex=False)
+    
+    def target():
+        try:
+            payload = ("result", func(*args, **kwargs))
+        except BaseException as e:
+            payload = ("error", e)
+        try:
+            sender.send(payload)
+        except Exception as e:
+            # Unpicklable result or exception
+            sender.send(("error", RuntimeError(f"{name}: {payload[0]} not transferable: {e}")))
+    
+    child = ctx.Process(target=target, name=f"timeout:{name}", daemon=True)
+    child.start()
+    sender.close()
+    try:
+        if not receiver.poll(seconds):
+            child.terminate()
+            child.join(1.0)
+            if child.is_alive():
+                child.kill()
+            logger.warning("timeout_process_terminated", func=name, timeout=seconds)
+            raise _timeout_error(name, seconds, "process")
+        try:
+            kind, value = receiver.recv()
+        except EOFError:
+            raise RuntimeError(f"{name} exited with code {child.exitcode} without a result")
+    finally:
+        receiver.close()
+        child.join(1.0)
+    if kind == "error":
+        raise value
+    return value
+
+
+async def await_with_timeout(awaitable, seconds: Optional[float], name: str = "coroutine") -> Any:
+    """Await with a deadline, raising ``TaskTimeoutError`` like ``run_with_timeout``."""
+    if not seconds or seconds <= 0:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout=seconds)
+    except asyncio.TimeoutError:
+        raise _timeout_error(name, seconds, "asyncio") from None
+
+
+def with_timeout(seconds: float, isolation: str = "thread"):
     """
     Decorator for function timeout.
     
+    Coroutine functions are bounded with ``asyncio.wait_for``; regular
+    functions go through ``run_with_timeout``. Both raise ``TaskTimeoutError``.
+    
     Args:
-        seconds: Timeout in seconds
+        seconds: Timeout in seconds (fractions allowed)
+        isolation: ``thread`` or ``process`` for regular functions
     """
     def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await await_with_timeout(func(*args, **kwargs), seconds, func.__name__)
+            return async_wrapper
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            import signal
-            
-            def timeout_handler(signum, frame):
-                raise TimeoutError(f"Function {func.__name__} timed out after {seconds} seconds")
-            
-            # Set the signal handler and alarm
-            signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(seconds)
-            
-            try:
-                result = func(*args, **kwargs)
-            finally:
-                # Disable the alarm
-                signal.alarm(0)
-            
-            return result
+            return run_with_timeout(func, seconds, *args, isolation=isolation, **kwargs)
         return wrapper
     return decorator
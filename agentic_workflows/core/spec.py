@@ -1,5 +1,7 @@
 """Workflow specification data models and loading."""
-from dataclasses import dataclass, field
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
 from typing import List, Dict, Any, Optional
 import yaml
 from pathlib import Path
@@ -12,6 +14,7 @@ class TaskSpec:
     type: str
     params: Dict[str, Any] = field(default_factory=dict)
     run_if: Optional[Dict[str, Any]] = None
+    depends_on: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -38,6 +41,11 @@ def load_spec(path: str) -> WorkflowSpec:
     except yaml.YAMLError as e:
         raise ValueError(f"Invalid YAML in {path}: {e}")
     
+    return parse_spec(data)
+
+
+def parse_spec(data: Any) -> WorkflowSpec:
+    """Build a validated workflow specification from parsed YAML or JSON."""
     # Validate structure
     if not isinstance(data, dict):
         raise ValueError(f"Spec must be a YAML object, got {type(data)}")
@@ -51,22 +59,29 @@ def load_spec(path: str) -> WorkflowSpec:
     # Validate and load tasks
     tasks = []
     for i, t in enumerate(data.get('tasks', [])):
+        if isinstance(t, TaskSpec):
+            tasks.append(t)
+            continue
         if not isinstance(t, dict):
             raise ValueError(f"Task {i} must be an object, got {type(t)}")
         
         task_id = t.get('id')
         task_type = t.get('type')
+        depends_on = t.get('depends_on') or []
         
         if not task_id:
             raise ValueError(f"Task {i} missing required field: id")
         if not task_type:
             raise ValueError(f"Task {i} missing required field: type")
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
         
         tasks.append(TaskSpec(
             id=task_id,
             type=task_type,
             params=t.get('params', {}),
-            run_if=t.get('run_if')
+            run_if=t.get('run_if'),
+            depends_on=list(depends_on)
         ))
     
     return WorkflowSpec(
@@ -76,3 +91,27 @@ def load_spec(path: str) -> WorkflowSpec:
         tasks=tasks,
         metadata=data.get('metadata', {})
     )
+
+
+def _normalize(value: Any) -> Any:
+    """Drop None and empty values so equivalent specs serialize identically."""
+    if isinstance(value, dict):
+        items = ((str(k), _normalize(v)) for k, v in value.items())
+        return {k: v for k, v in items if v is not None and v != {} and v != []}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def spec_hash(spec: WorkflowSpec) -> str:
+    """
+    Content hash of a workflow specification.
+    
+    Key order, surrounding whitespace and omitted optional fields do not
+    change the hash; task order and every value do.
+    """
+    normalized = _normalize(asdict(spec))
+    payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
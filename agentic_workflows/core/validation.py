@@ -0,0 +1,229 @@
+"""Fast deterministic workflow spec validation against plugin parameter schemas."""
+import threading
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import structlog
+
+from .spec import WorkflowSpec
+
+logger = structlog.get_logger()
+
+# Python types accepted for each schema type; bool is not a number here
+_TYPES: Dict[str, Tuple[type, ...]] = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list, tuple),
+}
+
+# Read by the executor for every task, whatever the plugin
+COMMON_PARAMS: Dict[str, Dict[str, Any]] = {
+    "dry_run": {"type": "boolean"},
+    "timeout_seconds": {"type": "number"},
+}
+
+
+def _issue(severity: str, field: str, message: str, fix: str) -> Dict[str, Any]:
+    return {"severity": severity, "field": field, "message": message, "fix": fix}
+
+
+class CompiledSchema:
+    """A plugin parameter schema prepared for repeated checks."""
+
+    __slots__ = ("plugin", "required", "known", "checks")
+
+    def __init__(self, plugin: str, schema: Dict[str, Dict[str, Any]]):
+        schema = {**COMMON_PARAMS, **schema}
+        self.plugin = plugin
+        self.required: Tuple[str, ...] = tuple(name for name, rule in schema.items() if rule.get("required"))
+        # An empty plugin schema means its parameters are not declared
+        self.known: Optional[FrozenSet[str]] = frozenset(schema) if len(schema) > len(COMMON_PARAMS) else None
+        self.checks: Dict[str, Tuple[Optional[str], Optional[FrozenSet[Any]]]] = {
+            name: (rule.get("type"), frozenset(rule["options"]) if rule.get("options") else None)
+            for name, rule in schema.items()
+        }
+
+    def validate(self, params: Dict[str, Any], field: str) -> List[Dict[str, Any]]:
+        issues = []
+        for name in self.required:
+            if params.get(name) is None:
+                issues.append(_issue(
+                    "error", f"{field}.{name}",
+                    f"Missing required parameter '{name}' for {self.plugin}",
+                    f"Add '{name}' to the task params"
+                ))
+        for name, value in params.items():
+            check = self.checks.get(name)
+            if check is None:
+                if self.known is not None:
+                    issues.append(_issue(
+                        "warning", f"{field}.{name}",
+                        f"Unknown parameter '{name}' for {self.plugin}; it will be ignored",
+                        f"Remove it or use one of: {', '.join(sorted(self.known))}"
+                    ))
+                continue
+            if value is None:
+                continue
+            type_name, options = check
+            if type_name and not (
+                isinstance(value, _TYPES[type_name])
+                and not (isinstance(value, bool) and type_name in ("integer", "number"))
+            ):
+                issues.append(_issue(
+                    "error", f"{field}.{name}",
+                    f"Parameter '{name}' must be {type_name}, got {type(value).__name__}",
+                    f"Set '{name}' to a {type_name} value"
+                ))
+            elif options is not None and isinstance(value, str) and value not in options:
+                issues.append(_issue(
+                    "error", f"{field}.{name}",
+                    f"Parameter '{name}' must be one of {sorted(options)}, got '{value}'",
+                    f"Use one of: {', '.join(sorted(options))}"
+                ))
+        return issues
+
+
+_schemas: Dict[str, Optional[CompiledSchema]] = {}
+_schemas_lock = threading.Lock()
+
+
+def plugin_schema(task_type: str) -> Optional[CompiledSchema]:
+    """
+    Compiled schema of a registered plugin type, or None if it is unknown.
+
+    Compiled on first use from the executor's plugin registry and the
+    plugin class's ``params_schema``.
+    """
+    with _schemas_lock:
+        if task_type in _schemas:
+            return _schemas[task_type]
+    from .agents import PLUGIN_REGISTRY, resolve_plugin
+
+    schema = None
+    if task_type in PLUGIN_REGISTRY:
+        try:
+            plugin = resolve_plugin(task_type)
+            schema = CompiledSchema(task_type, getattr(plugin, "params_schema", {}))
+        except Exception as e:
+            # Registered but not importable here; check only the common params
+            logger.warning("plugin_schema_unavailable", plugin=task_type, error=str(e))
+            schema = CompiledSchema(task_type, {})
+    with _schemas_lock:
+        _schemas[task_type] = schema
+    return schema
+
+
+def reset_plugin_schemas() -> None:
+    with _schemas_lock:
+        _schemas.clear()
+
+
+def _dependency_issues(spec: WorkflowSpec) -> List[Dict[str, Any]]:
+    ids = {task.id for task in spec.tasks if task.id}
+    issues = []
+    for i, task in enumerate(spec.tasks):
+        for dep in task.depends_on:
+            if dep == task.id:
+                issues.append(_issue(
+                    "error", f"tasks[{i}].depends_on",
+                    f"Task {task.id} depends on itself",
+                    f"Remove '{dep}' from depends_on"
+                ))
+            elif dep not in ids:
+                issues.append(_issue(
+                    "error", f"tasks[{i}].depends_on",
+                    f"Task {task.id} depends on unknown task '{dep}'",
+                    "Depend only on task IDs defined in this workflow"
+                ))
+    if issues:
+        return issues
+
+    # Kahn's algorithm; whatever never becomes ready is on or behind a cycle
+    remaining = {task.id: set(task.depends_on) for task in spec.tasks}
+    while True:
+        ready = [task_id for task_id, deps in remaining.items() if not deps]
+        if not ready:
+            break
+        for task_id in ready:
+            del remaining[task_id]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    if remaining:
+        cycle = sorted(remaining)
+        issues.append(_issue(
+            "error", "tasks",
+            f"Dependency cycle among tasks {cycle}",
+            "Remove one of the depends_on links in the cycle"
+        ))
+    return issues
+
+
+def validate_spec(spec: WorkflowSpec) -> List[Dict[str, Any]]:
+    """
+    Structural, parameter and dependency checks of a spec, without the LLM.
+
+    Returns issues in the validator's format (``severity``, ``field``,
+    ``message``, ``fix``); any ``error`` makes the spec invalid.
+    """
+    issues = []
+
+    # Check required fields
+    if not spec.id:
+        issues.append(_issue("error", "id", "Workflow ID is required", "Add a unique workflow ID"))
+    if not spec.name:
+        issues.append(_issue("error", "name", "Workflow name is required", "Add a descriptive workflow name"))
+    if not spec.tasks:
+        issues.append(_issue("error", "tasks", "Workflow must have at least one task", "Add tasks to the workflow"))
+
+    # Check task IDs are unique
+    seen = set()
+    duplicates = []
+    for task in spec.tasks:
+        if task.id in seen and task.id not in duplicates:
+            duplicates.append(task.id)
+        seen.add(task.id)
+    if duplicates:
+        issues.append(_issue(
+            "error", "tasks",
+            f"Task IDs must be unique; duplicated: {duplicates}",
+            "Ensure each task has a unique ID"
+        ))
+
+    # Check each task
+    for i, task in enumerate(spec.tasks):
+        field = f"tasks[{i}]"
+        if not task.id:
+            issues.append(_issue("error", f"{field}.id", f"Task {i+1} is missing an ID", f"Add an ID to task {i+1}"))
+        if not task.type:
+            issues.append(_issue(
+                "error", f"{field}.type",
+                f"Task {task.id} is missing a type",
+                f"Specify a plugin type for task {task.id}"
+            ))
+            continue
+        if not isinstance(task.params, dict):
+            issues.append(_issue(
+                "error", f"{field}.params",
+                f"Params of task {task.id} must be an object",
+                "Write params as key: value pairs"
+            ))
+            continue
+        schema = plugin_schema(task.type)
+        if schema is None:
+            issues.append(_issue(
+                "error", f"{field}.type",
+                f"Unknown plugin type '{task.type}' for task {task.id}",
+                "Use a registered plugin type"
+            ))
+            continue
+        issues.extend(schema.validate(task.params, f"{field}.params"))
+
+    if not duplicates:
+        issues.extend(_dependency_issues(spec))
+    return issues
+
+
+def has_errors(issues: List[Dict[str, Any]]) -> bool:
+    return any(issue.get("severity") == "error" for issue in issues)
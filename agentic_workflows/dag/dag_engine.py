@@ -7,8 +7,13 @@ from typing import Dict, List, Any, Optional, Set, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 import time
-from ..core.audit import AuditLog
-from ..core.exceptions import WorkflowExecutionError
+import uuid
+from ..core.audit import AuditLog, audit_workflow, current_workflow_id
+from ..core.exceptions import (
+    WorkflowExecutionError,
+    CircuitOpenError,
+    ExternalServiceRateLimitedError
+)
 
 
 class NodeStatus(Enum):
@@ -70,11 +75,13 @@ class DAGEngine:
         self,
         audit: Optional[AuditLog] = None,
         max_concurrent: int = 10,
-        default_timeout: int = 300
+        default_timeout: int = 300,
+        workflow_id: Optional[str] = None
     ):
         self.audit = audit or AuditLog()
         self.max_concurrent = max_concurrent
         self.default_timeout = default_timeout
+        self.workflow_id = workflow_id
         self.nodes: Dict[str, DAGNode] = {}
         self.execution_order: List[List[str]] = []
         
@@ -221,6 +228,21 @@ class DAGEngine:
                 # Exponential backoff
                 await asyncio.sleep(2 ** node.retry_count)
                 
+            except CircuitOpenError as e:
+                # A shared circuit breaker is open: the dependency is known to
+                # be down, so backing off and retrying here only adds latency
+                node.error = str(e)
+                node.status = NodeStatus.FAILED
+                node.end_time = time.time()
+                self.audit.record({
+                    "event": "node_failed",
+                    "node_id": node_id,
+                    "error": node.error,
+                    "circuit_open": True,
+                    "retry_count": node.retry_count
+                })
+                raise
+                
             except Exception as e:
                 error_msg = str(e)
                 node.error = error_msg
@@ -236,9 +258,11 @@ class DAGEngine:
                         "retry_count": node.retry_count
                     })
                     raise
-                    
-                # Exponential backoff
-                await asyncio.sleep(2 ** node.retry_count)
+                
+                # Rate-limited services say when to come back; otherwise
+                # exponential backoff
+                retry_after = e.retry_after if isinstance(e, ExternalServiceRateLimitedError) else None
+                await asyncio.sleep(retry_after if retry_after is not None else 2 ** node.retry_count)
                 
     async def execute(
         self,
@@ -255,6 +279,16 @@ class DAGEngine:
         Returns:
             DAGExecutionResult with execution details
         """
+        # Node tasks inherit the context, so their records carry the id too
+        workflow_id = self.workflow_id or current_workflow_id() or f"dag_{uuid.uuid4().hex}"
+        with audit_workflow(workflow_id):
+            return await self._execute(executor_func, fail_fast)
+            
+    async def _execute(
+        self,
+        executor_func: Callable[[DAGNode], Any],
+        fail_fast: bool
+    ) -> DAGExecutionResult:
         start_time = time.time()
         
         # Validate and compute execution order
@@ -265,7 +299,7 @@ class DAGEngine:
             "event": "dag_start",
             "total_nodes": len(self.nodes),
             "execution_levels": len(self.execution_order)
-        })
+        }, level="summary")
         
         failed_nodes = []
         successful_nodes = []
@@ -345,7 +379,7 @@ class DAGEngine:
             "successful": len(successful_nodes),
             "failed": len(failed_nodes),
             "skipped": len(skipped_nodes)
-        })
+        }, level="summary")
         
         return DAGExecutionResult(
             success=success,
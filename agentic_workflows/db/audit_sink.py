@@ -0,0 +1,268 @@
+"""Batched, background audit logging to the database."""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+
+from ..config import get_settings
+
+logger = structlog.get_logger()
+
+
+class _Drain:
+    """Queue marker asking the worker to commit pending rows and signal."""
+
+    def __init__(self, stop: bool = False):
+        self.done = threading.Event()
+        self.stop = stop
+
+
+class DBAuditSink:
+    """
+    Queues ``AuditLog`` rows and bulk-inserts them from a background thread.
+
+    A batch is committed once ``batch_size`` rows are pending or
+    ``flush_interval`` seconds have passed, using one session and one commit
+    per batch. ``submit`` never waits and never touches the database: when
+    the bounded queue is full or the worker has stopped, the row goes to
+    the spool instead.
+
+    A failed batch is retried ``retries`` times with exponential backoff,
+    then inserted row by row. Rows the database still rejects are appended
+    to ``spool_path`` (JSON lines) and replayed on startup and after the
+    next batch that commits.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        retries: int = 3,
+        retry_backoff: float = 0.5,
+        spool_path: Optional[str] = None
+    ):
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.spool_path = spool_path
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._spool_lock = threading.Lock()
+        self._spooled = bool(spool_path and os.path.exists(spool_path))
+        self.rows_written = 0
+        self.batches_written = 0
+        self.rows_spooled = 0
+        self._thread = threading.Thread(target=self._run, name="db-audit-sink", daemon=True)
+        self._thread.start()
+
+    def _sessions(self):
+        if self._session_factory is None:
+            from .database import get_session_local
+            self._session_factory = get_session_local()
+        return self._session_factory
+
+    def submit(self, row: Dict[str, Any]) -> None:
+        """Queue one audit row (``AuditLog`` column values); safe to call from the event loop."""
+        row = dict(row)
+        row.setdefault("created_at", datetime.utcnow())
+        if self._closed or not self._thread.is_alive():
+            logger.warning("db_audit_sink_stopped")
+        else:
+            try:
+                self._queue.put_nowait(row)
+                return
+            except queue.Full:
+                logger.warning("db_audit_queue_full", queue_size=self._queue.maxsize)
+        # The worker (or the next sink started) replays the spool
+        self._spool([row])
+
+    def flush(self, timeout: Optional[float] = 10.0) -> None:
+        """Block until every row submitted so far is committed."""
+        if self._closed or not self._thread.is_alive():
+            return
+        marker = _Drain()
+        self._queue.put(marker)
+        marker.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Commit everything still queued or spooled and stop the worker."""
+        if self._closed:
+            return
+        if self._thread.is_alive():
+            marker = _Drain(stop=True)
+            self._queue.put(marker)
+            marker.done.wait(timeout)
+            self._thread.join(timeout)
+        self._closed = True
+
+        leftovers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _Drain):
+                item.done.set()
+            else:
+                leftovers.append(item)
+        if leftovers:
+            self._insert(leftovers)
+        # Rows that overflowed since the last batch; failures stay spooled
+        self._replay_spool()
+
+    def _run(self) -> None:
+        pending: List[Dict[str, Any]] = []
+        deadline: Optional[float] = None
+        self._replay_spool()
+        while True:
+            timeout = self.flush_interval if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            marker = item if isinstance(item, _Drain) else None
+            if item is not None and marker is None:
+                if not pending:
+                    deadline = time.monotonic() + self.flush_interval
+                pending.append(item)
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if pending and (marker or due or len(pending) >= self.batch_size):
+                if self._insert(pending) and self._spooled:
+                    # The database is back; retry what it rejected earlier
+                    self._replay_spool()
+                pending = []
+                deadline = None
+            if marker is not None:
+                marker.done.set()
+                if marker.stop:
+                    return
+
+    def _bulk_insert(self, rows: List[Dict[str, Any]]) -> None:
+        from .models import AuditLog
+
+        db = self._sessions()()
+        try:
+            db.bulk_insert_mappings(AuditLog, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _insert(self, rows: List[Dict[str, Any]], replay: bool = False) -> bool:
+        """Commit ``rows``; returns whether the batch went in without spooling."""
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            try:
+                self._bulk_insert(rows)
+                self.rows_written += len(rows)
+                self.batches_written += 1
+                return True
+            except Exception as e:
+                logger.warning("db_audit_batch_failed", error=str(e), rows=len(rows), attempt=attempt + 1)
+
+        # One bad row should not take the rest of the batch with it
+        failed = []
+        for row in rows:
+            try:
+                self._bulk_insert([row])
+                self.rows_written += 1
+            except Exception as e:
+                logger.error("db_audit_row_failed", error=str(e), action=row.get("action"))
+                failed.append(row)
+        if failed:
+            self._spool(failed, replay_soon=not replay)
+        return not failed
+
+    def _spool(self, rows: List[Dict[str, Any]], replay_soon: bool = True) -> None:
+        if not self.spool_path:
+            logger.error("db_audit_rows_dropped", rows=len(rows))
+            return
+        with self._spool_lock:
+            os.makedirs(os.path.dirname(self.spool_path) or ".", exist_ok=True)
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    if isinstance(row.get("created_at"), datetime):
+                        row = dict(row, created_at=row["created_at"].isoformat())
+                    f.write(json.dumps(row, default=str) + "\n")
+            # Rows rejected again on replay wait for the next startup
+            self._spooled = self._spooled or replay_soon
+            self.rows_spooled += len(rows)
+        logger.warning("db_audit_rows_spooled", rows=len(rows), path=self.spool_path)
+
+    def _replay_spool(self) -> None:
+        # Take the file first so rows that fail again are spooled afresh
+        with self._spool_lock:
+            if not self._spooled:
+                return
+            self._spooled = False
+            replaying = self.spool_path + ".replay"
+            try:
+                os.replace(self.spool_path, replaying)
+            except FileNotFoundError:
+                return
+        with open(replaying, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        os.remove(replaying)
+        logger.info("db_audit_spool_replay", rows=len(rows))
+        for row in rows:
+            if isinstance(row.get("created_at"), str):
+                row["created_at"] = datetime.fromisoformat(row["created_at"])
+        for start in range(0, len(rows), self.batch_size):
+            self._insert(rows[start:start + self.batch_size], replay=True)
+
+
+_sink: Optional[DBAuditSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_db_audit_sink() -> DBAuditSink:
+    """Return the process-wide DB audit sink, starting it on first use."""
+    global _sink
+    with _sink_lock:
+        if _sink is None or _sink._closed:
+            settings = get_settings()
+            _sink = DBAuditSink(
+                batch_size=settings.db_audit_batch_size,
+                flush_interval=settings.db_audit_flush_interval_seconds,
+                max_queue=settings.db_audit_queue_size,
+                retries=settings.db_audit_retries,
+                retry_backoff=settings.db_audit_retry_backoff_seconds,
+                spool_path=settings.db_audit_spool_path or None
+            )
+        return _sink
+
+
+def shutdown_db_audit_sink() -> None:
+    """Drain and stop the DB audit sink if it was started."""
+    global _sink
+    with _sink_lock:
+        sink, _sink = _sink, None
+    if sink is not None:
+        sink.close()
+
+
+def _reset_after_fork() -> None:
+    # The worker thread does not survive fork(); children start a new sink
+    global _sink, _sink_lock
+    _sink = None
+    _sink_lock = threading.Lock()
+
+
+atexit.register(shutdown_db_audit_sink)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
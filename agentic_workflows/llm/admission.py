@@ -0,0 +1,312 @@
+"""Per-provider admission control: concurrency, RPM/TPM budgets and priority queueing."""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional
+
+import structlog
+
+from .base import LLMChunk, LLMProvider, LLMResponse, ProviderWrapper
+from .tokens import estimate_messages_tokens
+from ..config import get_settings
+from ..core.exceptions import ExternalServiceTimeoutError
+
+logger = structlog.get_logger()
+
+WINDOW_SECONDS = 60.0
+
+
+class Priority(IntEnum):
+    """Queue priority of an LLM call; lower values are admitted first."""
+    INTERACTIVE = 0  # A user is waiting on the response
+    NORMAL = 1
+    BACKGROUND = 2  # Analysis nobody is watching in real time
+
+
+_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar("llm_priority", default=Priority.NORMAL)
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """Queue LLM calls made inside the block at ``priority``."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _Ticket:
+    """A queued caller; ordered by priority, then arrival."""
+
+    def __init__(self, priority: int, seq: int, tokens: int):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.loop = asyncio.get_running_loop()
+        self.future: Optional[asyncio.Future] = None
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def wake(self) -> None:
+        future = self.future
+        if future is None:
+            return
+
+        def resolve():
+            if not future.done():
+                future.set_result(None)
+
+        try:
+            self.loop.call_soon_threadsafe(resolve)
+        except RuntimeError:
+            # Loop already closed
+            pass
+
+
+class _Usage:
+    """Actual token usage of an admitted call, set by the caller."""
+    tokens_used: Optional[int] = None
+
+
+class ProviderGate:
+    """
+    Admission control for one LLM provider.
+
+    A call is admitted when fewer than ``max_concurrency`` calls are in
+    flight and the last minute's requests and tokens leave room under
+    ``requests_per_minute`` and ``tokens_per_minute`` (None = unlimited).
+    Waiting callers are admitted strictly by priority, FIFO within a
+    priority, so background work never jumps ahead of interactive calls.
+    Token usage is reserved from an estimate at admission and corrected to
+    the actual usage when the call finishes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        queue_timeout: Optional[float] = None
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._queue: List[_Ticket] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        # [admitted_at, tokens] for calls admitted in the last minute
+        self._window: Deque[List[float]] = deque()
+        self.admitted = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+
+    def _expire(self, now: float) -> None:
+        while self._window and now - self._window[0][0] >= WINDOW_SECONDS:
+            self._window.popleft()
+
+    def _blocked_for(self, tokens: int, now: float) -> Optional[float]:
+        """
+        0 if a call of ``tokens`` fits now, else seconds until the window
+        frees enough room, or None if only a release can make room.
+        """
+        if self.max_concurrency is not None and self._in_flight >= self.max_concurrency:
+            return None
+        self._expire(now)
+        wait = 0.0
+        if self.requests_per_minute is not None and len(self._window) >= self.requests_per_minute:
+            oldest = self._window[len(self._window) - self.requests_per_minute]
+            wait = max(wait, oldest[0] + WINDOW_SECONDS - now)
+        if self.tokens_per_minute is not None:
+            # A single call larger than the whole budget is admitted into an empty window
+            excess = sum(entry[1] for entry in self._window) + min(tokens, self.tokens_per_minute) - self.tokens_per_minute
+            for admitted_at, used in self._window:
+                if excess <= 0:
+                    break
+                excess -= used
+                wait = max(wait, admitted_at + WINDOW_SECONDS - now)
+        return wait
+
+    def _wake_head(self) -> None:
+        if self._queue:
+            self._queue[0].wake()
+
+    async def acquire(self, tokens: int, priority: int = Priority.NORMAL, timeout: Optional[float] = None) -> List[float]:
+        """Wait for admission; returns the window entry to settle in ``release``."""
+        timeout = self.queue_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        ticket = _Ticket(int(priority), next(self._seq), tokens)
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    wait = self._blocked_for(tokens, now) if self._queue[0] is ticket else None
+                    if wait == 0:
+                        heapq.heappop(self._queue)
+                        self._in_flight += 1
+                        entry = [now, float(tokens)]
+                        self._window.append(entry)
+                        self.admitted += 1
+                        self.total_wait += now - start
+                        # The next caller may fit as well
+                        self._wake_head()
+                        return entry
+                    ticket.future = ticket.loop.create_future()
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    wait = remaining if wait is None else min(wait, remaining)
+                try:
+                    await asyncio.wait_for(ticket.future, wait)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            logger.warning("llm_queue_timeout", provider=self.name, priority=Priority(ticket.priority).name, timeout=timeout)
+            raise ExternalServiceTimeoutError(
+                f"LLM request to {self.name} waited more than {timeout}s in queue",
+                details={"provider": self.name, "queue_timeout_seconds": timeout}
+            ) from None
+        finally:
+            with self._lock:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._wake_head()
+
+    def release(self, entry: List[float], tokens_used: Optional[int] = None) -> None:
+        """Free the concurrency slot and settle the reserved tokens."""
+        with self._lock:
+            self._in_flight -= 1
+            if tokens_used:
+                entry[1] = float(tokens_used)
+            self._wake_head()
+
+    @asynccontextmanager
+    async def admit(self, tokens: int, priority: Optional[int] = None, timeout: Optional[float] = None):
+        """Hold an admission for the block; set ``tokens_used`` on the yielded object to settle."""
+        entry = await self.acquire(tokens, _priority.get() if priority is None else priority, timeout)
+        usage = _Usage()
+        try:
+            yield usage
+        finally:
+            self.release(entry, usage.tokens_used)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                "max_concurrency": self.max_concurrency,
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "in_flight": self._in_flight,
+                "queued": len(self._queue),
+                "requests_last_minute": len(self._window),
+                "tokens_last_minute": int(sum(entry[1] for entry in self._window)),
+                "admitted": self.admitted,
+                "timeouts": self.timeouts,
+                "avg_queue_wait_ms": round(self.total_wait / self.admitted * 1000, 1) if self.admitted else 0.0,
+            }
+
+
+class GatedProvider(ProviderWrapper):
+    """Provider wrapper that passes every call through its provider's gate."""
+
+    def __init__(self, provider: LLMProvider, gate: ProviderGate):
+        super().__init__(provider)
+        self.gate = gate
+
+    def _reserve(self, messages: List[Dict[str, str]], max_tokens: Optional[int]) -> int:
+        # Providers count max_tokens against TPM when the request is accepted
+        return estimate_messages_tokens(messages) + self.effective_params(None, max_tokens)[1]
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        async with self.gate.admit(self._reserve(messages, max_tokens)) as usage:
+            response = await self.provider.chat(messages, temperature, max_tokens, **kwargs)
+            usage.tokens_used = response.tokens_used
+            return response
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[LLMChunk]:
+        # The admission is held until the stream ends
+        async with self.gate.admit(self._reserve(messages, max_tokens)) as usage:
+            async for chunk in self.provider.stream_chat(messages, temperature, max_tokens, **kwargs):
+                if chunk.tokens_used:
+                    usage.tokens_used = chunk.tokens_used
+                yield chunk
+
+
+def _parse_limits(spec: str) -> Dict[str, int]:
+    """Parse ``"openai=500,claude=50"``."""
+    limits = {}
+    for part in (spec or "").split(","):
+        key, _, value = part.partition("=")
+        if key.strip() and value.strip():
+            limits[key.strip().lower()] = int(value)
+    return limits
+
+
+_gates: Dict[str, ProviderGate] = {}
+_gates_lock = threading.Lock()
+
+
+def get_provider_gate(provider_name: str) -> ProviderGate:
+    """Shared gate for a provider, configured from settings on first use."""
+    with _gates_lock:
+        gate = _gates.get(provider_name)
+        if gate is None:
+            settings = get_settings()
+            gate = ProviderGate(
+                provider_name,
+                max_concurrency=_parse_limits(settings.llm_concurrency_limits).get(
+                    provider_name, settings.llm_max_concurrency or None
+                ),
+                requests_per_minute=_parse_limits(settings.llm_requests_per_minute).get(provider_name),
+                tokens_per_minute=_parse_limits(settings.llm_tokens_per_minute).get(provider_name),
+                queue_timeout=settings.llm_queue_timeout_seconds or None
+            )
+            _gates[provider_name] = gate
+        return gate
+
+
+def gate(provider: LLMProvider) -> GatedProvider:
+    """Wrap ``provider`` with the shared gate of its backend."""
+    return GatedProvider(provider, get_provider_gate(provider.provider_name))
+
+
+def admission_snapshot() -> Dict[str, Dict[str, Any]]:
+    with _gates_lock:
+        gates = list(_gates.items())
+    return {name: g.snapshot() for name, g in gates}
+
+
+def reset_provider_gates() -> None:
+    with _gates_lock:
+        _gates.clear()
@@ -1,9 +1,12 @@
 """Base LLM provider interface."""
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator
 from dataclasses import dataclass
 from enum import Enum
 
+from ..core.concurrency import AdaptiveLimiter, get_limiter
+from ..core.retry import CircuitBreaker, get_circuit_breaker
+
 
 class LLMModel(str, Enum):
     """Supported LLM models."""
@@ -26,15 +29,63 @@ class LLMResponse:
     metadata: Dict[str, Any]
 
 
+@dataclass
+class LLMChunk:
+    """
+    Incremental piece of a streamed completion.
+    
+    Every chunk carries a text delta; the last one also carries the finish
+    reason and token usage once the provider reports them.
+    """
+    content: str
+    model: str = ""
+    finish_reason: Optional[str] = None
+    tokens_used: int = 0
+
+
+def merge_chunks(chunks: List[LLMChunk]) -> LLMResponse:
+    """Assemble streamed chunks into a single ``LLMResponse``."""
+    model, finish_reason, tokens_used = "", "stop", 0
+    for chunk in chunks:
+        model = chunk.model or model
+        finish_reason = chunk.finish_reason or finish_reason
+        tokens_used = chunk.tokens_used or tokens_used
+    return LLMResponse(
+        content="".join(chunk.content for chunk in chunks),
+        model=model,
+        tokens_used=tokens_used,
+        finish_reason=finish_reason,
+        metadata={"streamed": True}
+    )
+
+
+async def collect_stream(chunks: AsyncIterator[LLMChunk]) -> LLMResponse:
+    """Drain a stream into a single ``LLMResponse``."""
+    return merge_chunks([chunk async for chunk in chunks])
+
+
 class LLMProvider(ABC):
     """Base class for all LLM providers."""
     
+    # Name of the backend; instances of one provider share a circuit breaker
+    provider_name = "llm"
+    
     def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
         self.api_key = api_key
         self.model = model
         self.default_temperature = 0.7
         self.default_max_tokens = 2000
     
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """Process-wide breaker for this provider's backend (``llm:<name>``)."""
+        return get_circuit_breaker(f"llm:{self.provider_name}")
+    
+    @property
+    def concurrency_limiter(self) -> AdaptiveLimiter:
+        """Process-wide adaptive concurrency limit for this provider's backend."""
+        return get_limiter(f"llm:{self.provider_name}")
+    
     @abstractmethod
     async def complete(
         self,
@@ -63,6 +114,39 @@ class LLMProvider(ABC):
         """Check if provider is available."""
         pass
     
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[LLMChunk]:
+        """
+        Stream a chat completion as it is generated.
+        
+        Providers without native streaming yield the whole completion as a
+        single chunk.
+        """
+        response = await self.chat(messages, temperature, max_tokens, **kwargs)
+        yield LLMChunk(
+            content=response.content,
+            model=response.model,
+            finish_reason=response.finish_reason,
+            tokens_used=response.tokens_used
+        )
+    
+    def stream_complete(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[LLMChunk]:
+        """Stream a completion for a single prompt."""
+        messages = self.format_messages(prompt, system_prompt)
+        return self.stream_chat(messages, temperature, max_tokens, **kwargs)
+    
     def format_messages(
         self,
         prompt: str,
@@ -74,3 +158,58 @@ class LLMProvider(ABC):
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
         return messages
+
+
+class ProviderWrapper(LLMProvider):
+    """
+    Base for providers that add behavior around another provider.
+    
+    Identity (name, model, defaults) is taken from the wrapped provider, so
+    breakers, limiters and cache keys stay those of the real backend.
+    """
+    
+    def __init__(self, provider: LLMProvider):
+        super().__init__(provider.api_key, provider.model)
+        self.provider = provider
+        self.provider_name = provider.provider_name
+        self.default_temperature = provider.default_temperature
+        self.default_max_tokens = provider.default_max_tokens
+    
+    def is_available(self) -> bool:
+        return self.provider.is_available()
+    
+    async def complete(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        messages = self.format_messages(prompt, system_prompt)
+        return await self.chat(messages, temperature, max_tokens, **kwargs)
+    
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        return await self.provider.chat(messages, temperature, max_tokens, **kwargs)
+    
+    def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[LLMChunk]:
+        return self.provider.stream_chat(messages, temperature, max_tokens, **kwargs)
+    
+    def effective_params(self, temperature: Optional[float], max_tokens: Optional[int]):
+        """Temperature and max_tokens the wrapped provider will actually use."""
+        return (
+            self.provider.default_temperature if temperature is None else temperature,
+            max_tokens or self.provider.default_max_tokens
+        )
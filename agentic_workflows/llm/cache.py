@@ -0,0 +1,433 @@
+"""Completion cache for LLM providers."""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import structlog
+
+from .base import LLMChunk, LLMProvider, LLMResponse, ProviderWrapper, merge_chunks
+from ..config import get_settings
+
+logger = structlog.get_logger()
+
+
+async def _off_loop(backend, method, *args):
+    """Run a cache call in a worker thread unless ``backend`` never blocks."""
+    if getattr(backend, "blocking", True):
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+
+class MemoryCacheBackend:
+    """In-process LRU with per-entry expiry."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at and expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl if ttl else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """Persistent cache in a local SQLite file, shared by processes on one host."""
+
+    blocking = True
+
+    def __init__(self, path: str, table: str = "llm_cache"):
+        self.path = Path(path)
+        self.table = table
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] and row[1] < time.time():
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl if ttl else None)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class RedisCacheBackend:
+    """Cache shared by every worker through Redis; expiry is handled by Redis."""
+
+    blocking = True
+
+    def __init__(self, url: str, max_connections: int = 10, prefix: str = "llm_cache:"):
+        import redis
+        self.prefix = prefix
+        self._client = redis.from_url(url, max_connections=max_connections, decode_responses=True)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._client.get(self.prefix + key)
+        return json.loads(value) if value else None
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        if ttl:
+            self._client.setex(self.prefix + key, ttl, json.dumps(value))
+        else:
+            self._client.set(self.prefix + key, json.dumps(value))
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(self.prefix + "*"):
+            self._client.delete(key)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._client.scan_iter(self.prefix + "*"))
+
+
+class CompletionCache:
+    """
+    Cache of LLM responses keyed by provider, model, messages, temperature
+    and max_tokens.
+
+    Only deterministic requests are cached: a request whose temperature is
+    above ``max_temperature`` bypasses the cache, since repeating it is
+    expected to give a different answer.
+    """
+
+    def __init__(self, backend, ttl: int = 3600, max_temperature: float = 0.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.tokens_saved = 0
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: Optional[str],
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        extra: Optional[Dict[str, Any]] = None
+    ) -> str:
+        payload = json.dumps(
+            {
+                "provider": provider,
+                "model": str(model),
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "extra": extra or {},
+            },
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def cacheable(self, temperature: float) -> bool:
+        if temperature > self.max_temperature:
+            with self._lock:
+                self.bypassed += 1
+            return False
+        return True
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            logger.warning("llm_cache_read_failed", error=str(e))
+            return None
+
+    def _write(self, key: str, response: LLMResponse) -> None:
+        try:
+            self.backend.set(key, asdict(response), self.ttl)
+        except Exception as e:
+            logger.warning("llm_cache_write_failed", error=str(e))
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        return self._response(self._read(key))
+
+    async def get_async(self, key: str) -> Optional[LLMResponse]:
+        """``get`` without blocking the event loop on backend I/O."""
+        return self._response(await _off_loop(self.backend, self._read, key))
+
+    def _response(self, value: Optional[Dict[str, Any]]) -> Optional[LLMResponse]:
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.tokens_saved += value.get("tokens_used", 0)
+        value = dict(value)
+        value["metadata"] = {**value.get("metadata", {}), "cache": "hit"}
+        return LLMResponse(**value)
+
+    def set(self, key: str, response: LLMResponse) -> None:
+        self._write(key, response)
+
+    async def set_async(self, key: str, response: LLMResponse) -> None:
+        await _off_loop(self.backend, self._write, key, response)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "tokens_saved": self.tokens_saved,
+                "ttl_seconds": self.ttl,
+                "max_temperature": self.max_temperature,
+            }
+        try:
+            stats["entries"] = len(self.backend)
+        except Exception:
+            stats["entries"] = None
+        return stats
+
+
+class ResultCache:
+    """
+    JSON results of derived computations (plans, validations) by key.
+
+    Read and write failures are logged and treated as misses, so a broken
+    backend only costs the recomputation.
+    """
+
+    name = "result"
+
+    def __init__(self, backend, ttl: int = 604800):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"{self.name}_cache_read_failed", error=str(e))
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def _write(self, key: str, value: Dict[str, Any]) -> None:
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            logger.warning(f"{self.name}_cache_write_failed", error=str(e))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._read(key)
+
+    async def get_async(self, key: str) -> Optional[Dict[str, Any]]:
+        """``get`` without blocking the event loop on backend I/O."""
+        return await _off_loop(self.backend, self._read, key)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._write(key, value)
+
+    async def set_async(self, key: str, value: Dict[str, Any]) -> None:
+        await _off_loop(self.backend, self._write, key, value)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "ttl_seconds": self.ttl,
+            }
+        try:
+            stats["entries"] = len(self.backend)
+        except Exception:
+            stats["entries"] = None
+        return stats
+
+
+class CachedProvider(ProviderWrapper):
+    """Provider wrapper that answers repeated deterministic requests from a cache."""
+
+    def __init__(self, provider: LLMProvider, cache: "CompletionCache"):
+        super().__init__(provider)
+        self.cache = cache
+
+    def _key(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        kwargs: Dict[str, Any]
+    ) -> Optional[str]:
+        """Cache key for a request, or None when it is not cacheable."""
+        # Key on the effective values so "default" and explicit defaults match
+        effective_temperature, effective_max_tokens = self.effective_params(temperature, max_tokens)
+        if not self.cache.cacheable(effective_temperature):
+            return None
+        return self.cache.make_key(
+            self.provider_name,
+            self.provider.model,
+            messages,
+            effective_temperature,
+            effective_max_tokens,
+            kwargs
+        )
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        key = self._key(messages, temperature, max_tokens, kwargs)
+        if key is None:
+            return await self.provider.chat(messages, temperature, max_tokens, **kwargs)
+
+        cached = await self.cache.get_async(key)
+        if cached is not None:
+            return cached
+
+        response = await self.provider.chat(messages, temperature, max_tokens, **kwargs)
+        await self.cache.set_async(key, response)
+        return response
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[LLMChunk]:
+        """Replay a cached completion as one chunk, or stream and cache it."""
+        key = self._key(messages, temperature, max_tokens, kwargs)
+        if key is not None:
+            cached = await self.cache.get_async(key)
+            if cached is not None:
+                yield LLMChunk(
+                    content=cached.content,
+                    model=cached.model,
+                    finish_reason=cached.finish_reason,
+                    tokens_used=cached.tokens_used
+                )
+                return
+
+        chunks: List[LLMChunk] = []
+        async for chunk in self.provider.stream_chat(messages, temperature, max_tokens, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        if key is not None:
+            # Only reached when the stream ran to completion
+            await self.cache.set_async(key, merge_chunks(chunks))
+
+
+def create_cache_backend(table: str = "llm_cache", prefix: str = "llm_cache:"):
+    """
+    Backend selected by ``llm_cache_backend``.
+
+    ``table`` (SQLite) and ``prefix`` (Redis) keep caches that share the
+    backend apart; the memory backend is always private.
+    """
+    settings = get_settings()
+    if settings.llm_cache_backend == "redis":
+        if settings.redis_url:
+            try:
+                return RedisCacheBackend(settings.redis_url, settings.redis_max_connections, prefix=prefix)
+            except ImportError:
+                logger.warning("redis package not installed, using memory LLM cache")
+        else:
+            logger.warning("llm_cache_redis_not_configured", fallback="memory")
+    elif settings.llm_cache_backend == "sqlite":
+        return SQLiteCacheBackend(settings.llm_cache_path, table=table)
+    return MemoryCacheBackend(settings.llm_cache_max_entries)
+
+
+_cache: Optional[CompletionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_completion_cache() -> CompletionCache:
+    """Return the process-wide completion cache configured in settings."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = get_settings()
+            _cache = CompletionCache(
+                create_cache_backend(),
+                ttl=settings.llm_cache_ttl_seconds,
+                max_temperature=settings.llm_cache_max_temperature
+            )
+        return _cache
@@ -0,0 +1,285 @@
+"""Record/replay LLM provider for deterministic offline benchmarks."""
+import asyncio
+import json
+import random
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import structlog
+
+from .base import LLMChunk, LLMProvider, LLMResponse, ProviderWrapper, merge_chunks
+from .cache import CompletionCache
+from ..core.exceptions import StorageNotFoundError
+
+logger = structlog.get_logger()
+
+LATENCY_MODES = ("none", "recorded", "sampled")
+
+
+class Cassette:
+    """
+    Recorded LLM interactions in a JSON-lines file.
+
+    Each line holds the request, the response, the latency and, for
+    streams, the chunks with their offsets. Requests are matched on the
+    messages and the explicit parameters, not on the provider, so a
+    cassette recorded against one backend replays under any provider name.
+    Repeated identical requests replay their recordings in order, wrapping
+    around when they run out.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self.latencies: List[float] = []
+        if self.path.exists():
+            with self.path.open() as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+
+    @staticmethod
+    def key(
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        extra: Dict[str, Any]
+    ) -> str:
+        return CompletionCache.make_key("cassette", "", messages, temperature, max_tokens, extra)
+
+    def _index(self, interaction: Dict[str, Any]) -> None:
+        self._interactions.setdefault(interaction["key"], []).append(interaction)
+        self.latencies.append(interaction["latency"])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(recordings) for recordings in self._interactions.values())
+
+    def record(self, interaction: Dict[str, Any]) -> None:
+        """Append one interaction to the file and the index."""
+        line = json.dumps(interaction, default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as f:
+                f.write(line + "\n")
+            self._index(interaction)
+
+    def next(self, key: str) -> Optional[Dict[str, Any]]:
+        """The next recording for ``key``, or None if there is none."""
+        with self._lock:
+            recordings = self._interactions.get(key)
+            if not recordings:
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            return recordings[cursor % len(recordings)]
+
+    def rewind(self) -> None:
+        with self._lock:
+            self._cursors.clear()
+
+
+class RecordingProvider(ProviderWrapper):
+    """Provider wrapper that records every call to a cassette."""
+
+    def __init__(self, provider: LLMProvider, cassette: Cassette):
+        super().__init__(provider)
+        self.cassette = cassette
+
+    def _interaction(self, messages, temperature, max_tokens, kwargs, latency: float) -> Dict[str, Any]:
+        return {
+            "key": Cassette.key(messages, temperature, max_tokens, kwargs),
+            "provider": self.provider_name,
+            "model": getattr(self.model, "value", self.model),
+            "request": {
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "extra": kwargs,
+            },
+            "latency": round(latency, 4),
+            "recorded_at": time.time(),
+        }
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        start = time.perf_counter()
+        response = await self.provider.chat(messages, temperature, max_tokens, **kwargs)
+        interaction = self._interaction(messages, temperature, max_tokens, kwargs, time.perf_counter() - start)
+        interaction["response"] = asdict(response)
+        self.cassette.record(interaction)
+        return response
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[LLMChunk]:
+        start = time.perf_counter()
+        chunks: List[LLMChunk] = []
+        offsets: List[float] = []
+        async for chunk in self.provider.stream_chat(messages, temperature, max_tokens, **kwargs):
+            chunks.append(chunk)
+            offsets.append(round(time.perf_counter() - start, 4))
+            yield chunk
+        # Only complete streams are recorded
+        interaction = self._interaction(messages, temperature, max_tokens, kwargs, time.perf_counter() - start)
+        interaction["response"] = asdict(merge_chunks(chunks))
+        interaction["chunks"] = [{**asdict(chunk), "at": at} for chunk, at in zip(chunks, offsets)]
+        self.cassette.record(interaction)
+
+
+class ReplayProvider(LLMProvider):
+    """
+    Provider that answers from a cassette without touching the network.
+
+    ``latency`` chooses how long each answer takes: ``none`` answers
+    immediately; ``recorded`` waits as long as the recorded call took, and
+    streams chunks at their recorded offsets; ``sampled`` draws from all
+    recorded latencies with a seeded generator, which reproduces the
+    latency distribution deterministically for load tests. Unrecorded
+    requests go to ``fallback`` if one is given, otherwise they raise.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        provider_name: str = "replay",
+        model: Optional[str] = None,
+        latency: str = "none",
+        seed: int = 0,
+        fallback: Optional[LLMProvider] = None
+    ):
+        if latency not in LATENCY_MODES:
+            raise ValueError(f"latency must be one of {LATENCY_MODES}, got {latency!r}")
+        super().__init__(None, model or "replay")
+        self.provider_name = provider_name
+        self.cassette = cassette
+        self.latency = latency
+        self.fallback = fallback
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    def _delay(self, recorded: float) -> float:
+        if self.latency == "recorded":
+            return recorded
+        if self.latency == "sampled" and self.cassette.latencies:
+            with self._random_lock:
+                return self._random.choice(self.cassette.latencies)
+        return 0.0
+
+    def _lookup(self, messages, temperature, max_tokens, kwargs) -> Optional[Dict[str, Any]]:
+        interaction = self.cassette.next(Cassette.key(messages, temperature, max_tokens, kwargs))
+        if interaction is not None:
+            self.hits += 1
+            return interaction
+        self.misses += 1
+        if self.fallback is None:
+            raise StorageNotFoundError(
+                f"No recording in {self.cassette.path} for this request",
+                details={"cassette": str(self.cassette.path), "messages": len(messages)}
+            )
+        logger.debug("cassette_miss", cassette=str(self.cassette.path))
+        return None
+
+    async def complete(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        messages = self.format_messages(prompt, system_prompt)
+        return await self.chat(messages, temperature, max_tokens, **kwargs)
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        interaction = self._lookup(messages, temperature, max_tokens, kwargs)
+        if interaction is None:
+            return await self.fallback.chat(messages, temperature, max_tokens, **kwargs)
+        delay = self._delay(interaction["latency"])
+        if delay:
+            await asyncio.sleep(delay)
+        response = LLMResponse(**interaction["response"])
+        response.metadata = {**response.metadata, "replayed": True}
+        return response
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[LLMChunk]:
+        interaction = self._lookup(messages, temperature, max_tokens, kwargs)
+        if interaction is None:
+            async for chunk in self.fallback.stream_chat(messages, temperature, max_tokens, **kwargs):
+                yield chunk
+            return
+
+        recorded = interaction.get("chunks")
+        if not recorded:
+            # Recorded without streaming: one chunk once the call would have finished
+            response = interaction["response"]
+            recorded = [{
+                "content": response["content"],
+                "model": response["model"],
+                "finish_reason": response["finish_reason"],
+                "tokens_used": response["tokens_used"],
+                "at": interaction["latency"],
+            }]
+        # Keep the recorded shape of the stream, scaled to the chosen total latency
+        delay = self._delay(interaction["latency"])
+        scale = delay / interaction["latency"] if interaction["latency"] else 0.0
+        start = time.perf_counter()
+        for chunk in recorded:
+            wait = chunk["at"] * scale - (time.perf_counter() - start)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield LLMChunk(**{k: v for k, v in chunk.items() if k != "at"})
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "cassette": str(self.cassette.path),
+            "recordings": len(self.cassette),
+            "latency": self.latency,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: str) -> Cassette:
+    """Shared cassette per file, so recorders and replayers see one index."""
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            cassette = Cassette(path)
+            _cassettes[path] = cassette
+        return cassette
@@ -1,36 +1,72 @@
 """Anthropic Claude LLM provider."""
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator
 import structlog
 
-from .base import LLMProvider, LLMResponse, LLMModel
+from .base import LLMProvider, LLMResponse, LLMModel, LLMChunk
+from .http import post_json, stream_sse
+from .tokens import record_usage
+from ..config import get_settings
 
 logger = structlog.get_logger()
 
+ANTHROPIC_VERSION = "2023-06-01"
+
 
 class ClaudeProvider(LLMProvider):
-    """Anthropic Claude provider."""
-    
-    def __init__(self, api_key: Optional[str] = None, model: str = LLMModel.CLAUDE3_SONNET):
+    """
+    Anthropic Claude provider.
+
+    Talks to the Messages REST endpoint through the shared async connection
+    pool, so a slow completion never blocks the event loop.
+    """
+
+    provider_name = "claude"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = LLMModel.CLAUDE3_SONNET,
+        base_url: Optional[str] = None
+    ):
         super().__init__(api_key, model)
-        self._client = None
-    
-    def _get_client(self):
-        """Lazy load Anthropic client."""
-        if self._client is None:
-            try:
-                import anthropic
-                if self.api_key:
-                    self._client = anthropic.Anthropic(api_key=self.api_key)
-            except ImportError:
-                logger.warning("anthropic package not installed")
-                return None
-        return self._client
-    
+        self.base_url = (base_url or get_settings().anthropic_base_url).rstrip("/")
+
     def is_available(self) -> bool:
         """Check if Claude is available."""
-        client = self._get_client()
-        return client is not None and self.api_key is not None
-    
+        return bool(self.api_key)
+
+    @property
+    def _headers(self) -> Dict[str, str]:
+        return {"x-api-key": self.api_key, "anthropic-version": ANTHROPIC_VERSION}
+
+    def _payload(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Messages API request body; system messages move to ``system``."""
+        # Extract system message if present
+        system = None
+        user_messages = []
+        for msg in messages:
+            if msg["role"] == "system":
+                system = msg["content"]
+            else:
+                user_messages.append(msg)
+
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "max_tokens": max_tokens or self.default_max_tokens,
+            "temperature": self.default_temperature if temperature is None else temperature,
+            "messages": user_messages,
+            **kwargs
+        }
+        if system:
+            payload["system"] = system
+        return payload
+
     async def complete(
         self,
         prompt: str,
@@ -42,7 +78,7 @@ class ClaudeProvider(LLMProvider):
         """Generate completion using Claude."""
         messages = self.format_messages(prompt, system_prompt)
         return await self.chat(messages, temperature, max_tokens, **kwargs)
-    
+
     async def chat(
         self,
         messages: List[Dict[str, str]],
@@ -51,39 +87,81 @@ class ClaudeProvider(LLMProvider):
         **kwargs
     ) -> LLMResponse:
         """Generate chat completion using Claude."""
-        client = self._get_client()
-        if not client:
+        if not self.api_key:
             raise RuntimeError("Claude client not available")
-        
+
+        payload = self._payload(messages, temperature, max_tokens, **kwargs)
         try:
-            # Extract system message if present
-            system = None
-            user_messages = []
-            for msg in messages:
-                if msg["role"] == "system":
-                    system = msg["content"]
-                else:
-                    user_messages.append(msg)
-            
-            response = client.messages.create(
-                model=self.model,
-                max_tokens=max_tokens or self.default_max_tokens,
-                temperature=temperature or self.default_temperature,
-                system=system,
-                messages=user_messages,
-                **kwargs
+            data = await post_json(
+                f"{self.base_url}/v1/messages",
+                self._headers,
+                payload,
+                f"llm:{self.provider_name}"
+            )
+            usage = data.get("usage") or {}
+            record_usage(
+                self.provider_name,
+                data.get("model", ""),
+                usage.get("input_tokens", 0),
+                usage.get("output_tokens", 0)
+            )
+            text = "".join(
+                block.get("text", "") for block in data.get("content", []) if block.get("type") == "text"
             )
-            
             return LLMResponse(
-                content=response.content[0].text,
-                model=response.model,
-                tokens_used=response.usage.input_tokens + response.usage.output_tokens,
-                finish_reason=response.stop_reason,
+                content=text,
+                model=data.get("model", ""),
+                tokens_used=usage.get("input_tokens", 0) + usage.get("output_tokens", 0),
+                finish_reason=data.get("stop_reason") or "stop",
                 metadata={
-                    "input_tokens": response.usage.input_tokens,
-                    "output_tokens": response.usage.output_tokens,
+                    "input_tokens": usage.get("input_tokens", 0),
+                    "output_tokens": usage.get("output_tokens", 0),
                 }
             )
         except Exception as e:
             logger.error("claude_error", error=str(e))
             raise
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[LLMChunk]:
+        """Stream a chat completion using Claude server-sent events."""
+        if not self.api_key:
+            raise RuntimeError("Claude client not available")
+
+        payload = self._payload(messages, temperature, max_tokens, stream=True, **kwargs)
+        try:
+            model, input_tokens = "", 0
+            async for event in stream_sse(
+                f"{self.base_url}/v1/messages",
+                self._headers,
+                payload,
+                f"llm:{self.provider_name}"
+            ):
+                kind = event.get("type")
+                if kind == "message_start":
+                    message = event.get("message") or {}
+                    model = message.get("model", "")
+                    input_tokens = (message.get("usage") or {}).get("input_tokens", 0)
+                elif kind == "content_block_delta":
+                    text = (event.get("delta") or {}).get("text")
+                    if text:
+                        yield LLMChunk(content=text, model=model)
+                elif kind == "message_delta":
+                    output_tokens = (event.get("usage") or {}).get("output_tokens", 0)
+                    record_usage(self.provider_name, model, input_tokens, output_tokens)
+                    yield LLMChunk(
+                        content="",
+                        model=model,
+                        finish_reason=(event.get("delta") or {}).get("stop_reason") or "stop",
+                        tokens_used=input_tokens + output_tokens
+                    )
+                elif kind == "error":
+                    raise RuntimeError((event.get("error") or {}).get("message", "Claude stream error"))
+        except Exception as e:
+            logger.error("claude_stream_error", error=str(e))
+            raise
@@ -0,0 +1,136 @@
+"""Single-flight coalescing of identical in-flight LLM requests."""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .base import LLMProvider, LLMResponse, ProviderWrapper
+from .cache import CompletionCache
+from ..config import get_settings
+from ..core.exceptions import ExternalServiceTimeoutError
+
+
+class SingleFlight:
+    """
+    At most one outstanding call per key; concurrent callers share its result.
+
+    The call runs in its own task, so a caller that gives up (timeout or
+    cancellation) does not cancel it for the others. Exceptions reach every
+    waiting caller. Calls are tracked per event loop.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Tuple[int, str], asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    async def do(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None
+    ) -> Any:
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._calls.get(loop_key)
+            if task is None:
+                self.leaders += 1
+                task = asyncio.ensure_future(call())
+                self._calls[loop_key] = task
+                task.add_done_callback(lambda t: self._forget(loop_key, t))
+            else:
+                self.coalesced += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise ExternalServiceTimeoutError(
+                f"Shared LLM request did not finish within {timeout}s",
+                details={"timeout_seconds": timeout}
+            ) from None
+
+    def _forget(self, loop_key, task: asyncio.Task) -> None:
+        with self._lock:
+            if self._calls.get(loop_key) is task:
+                del self._calls[loop_key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter has left
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "timeouts": self.timeouts,
+                "in_flight": len(self._calls),
+            }
+
+
+class CoalescingProvider(ProviderWrapper):
+    """
+    Provider wrapper that merges concurrent identical deterministic requests.
+
+    Wrap it around the cached provider so only one request per key is ever
+    outstanding, whether it ends up a cache hit or a provider call.
+    Requests above ``max_temperature`` are expected to differ and are never
+    merged.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        flight: Optional[SingleFlight] = None,
+        timeout: Optional[float] = None,
+        max_temperature: float = 0.0
+    ):
+        super().__init__(provider)
+        self.flight = flight or SingleFlight()
+        self.timeout = timeout
+        self.max_temperature = max_temperature
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        effective_temperature, effective_max_tokens = self.effective_params(temperature, max_tokens)
+        if effective_temperature > self.max_temperature:
+            return await self.provider.chat(messages, temperature, max_tokens, **kwargs)
+
+        key = CompletionCache.make_key(
+            self.provider_name,
+            self.provider.model,
+            messages,
+            effective_temperature,
+            effective_max_tokens,
+            kwargs
+        )
+        return await self.flight.do(
+            key,
+            lambda: self.provider.chat(messages, temperature, max_tokens, **kwargs),
+            timeout=self.timeout
+        )
+
+
+_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Process-wide single-flight group shared by every coalescing provider."""
+    return _flight
+
+
+def coalesce(provider: LLMProvider) -> CoalescingProvider:
+    """Wrap ``provider`` with the shared single-flight group and settings."""
+    settings = get_settings()
+    return CoalescingProvider(
+        provider,
+        flight=_flight,
+        timeout=settings.llm_coalesce_wait_seconds or None,
+        max_temperature=settings.llm_cache_max_temperature
+    )
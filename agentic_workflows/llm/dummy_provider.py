@@ -1,15 +1,31 @@
 """Dummy LLM provider for offline mode and testing."""
-from typing import Optional, Dict, Any, List
-import random
+from typing import Optional, Dict, Any, List, AsyncIterator
+import asyncio
+import re
 
-from .base import LLMProvider, LLMResponse, LLMModel
+from .base import LLMProvider, LLMResponse, LLMModel, LLMChunk
+from .tokens import estimate_messages_tokens, estimate_tokens, record_usage
+from ..config import get_settings
 
 
 class DummyProvider(LLMProvider):
-    """Dummy provider that returns simulated responses."""
+    """
+    Dummy provider that returns simulated responses.
     
-    def __init__(self, api_key: Optional[str] = None, model: str = LLMModel.DUMMY):
+    Streams its canned text word by word, pausing ``stream_delay`` seconds
+    between words so streaming clients can be exercised offline.
+    """
+    
+    provider_name = "dummy"
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = LLMModel.DUMMY,
+        stream_delay: Optional[float] = None
+    ):
         super().__init__(api_key, model)
+        self.stream_delay = get_settings().dummy_stream_delay_seconds if stream_delay is None else stream_delay
     
     def is_available(self) -> bool:
         """Dummy provider is always available."""
@@ -26,13 +42,21 @@ class DummyProvider(LLMProvider):
         """Generate dummy completion."""
         # Simulate intelligent response based on prompt keywords
         response_content = self._generate_dummy_response(prompt)
+        prompt_tokens = estimate_tokens(prompt) + estimate_tokens(system_prompt or "")
+        completion_tokens = estimate_tokens(response_content)
+        record_usage(self.provider_name, self.model, prompt_tokens, completion_tokens)
         
         return LLMResponse(
             content=response_content,
             model=self.model,
-            tokens_used=random.randint(50, 200),
+            tokens_used=prompt_tokens + completion_tokens,
             finish_reason="stop",
-            metadata={"provider": "dummy", "simulated": True}
+            metadata={
+                "provider": "dummy",
+                "simulated": True,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+            }
         )
     
     async def chat(
@@ -46,6 +70,30 @@ class DummyProvider(LLMProvider):
         last_message = messages[-1]["content"] if messages else ""
         return await self.complete(last_message, temperature=temperature, max_tokens=max_tokens)
     
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[LLMChunk]:
+        """Stream the dummy response one word at a time."""
+        last_message = messages[-1]["content"] if messages else ""
+        text = self._generate_dummy_response(last_message)
+        for i, word in enumerate(re.findall(r"\s*\S+", text)):
+            if i and self.stream_delay:
+                await asyncio.sleep(self.stream_delay)
+            yield LLMChunk(content=word, model=self.model)
+        prompt_tokens = estimate_messages_tokens(messages)
+        completion_tokens = estimate_tokens(text)
+        record_usage(self.provider_name, self.model, prompt_tokens, completion_tokens)
+        yield LLMChunk(
+            content="",
+            model=self.model,
+            finish_reason="stop",
+            tokens_used=prompt_tokens + completion_tokens
+        )
+    
     def _generate_dummy_response(self, prompt: str) -> str:
         """Generate contextual dummy response."""
         prompt_lower = prompt.lower()
@@ -1,71 +1,213 @@
 """LLM provider factory."""
-from typing import Optional
+import asyncio
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+import httpx
 import structlog
 
-from .base import LLMProvider, LLMModel
+from .admission import gate
+from .base import LLMProvider, LLMModel, ProviderWrapper
 from .openai_provider import OpenAIProvider
 from .claude_provider import ClaudeProvider
 from .dummy_provider import DummyProvider
+from .cache import CachedProvider, get_completion_cache
+from .cassette import RecordingProvider, ReplayProvider, get_cassette
+from .coalesce import coalesce
+from .http import get_async_client
+from .router import RoutingProvider
 from ..config import get_settings
 
 logger = structlog.get_logger()
 settings = get_settings()
 
+# Configured providers are shared: (provider, model, key fingerprint, cache)
+_providers: Dict[Tuple[str, Optional[str], Optional[str], bool], LLMProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def _wrap(provider: LLMProvider, cache: bool) -> LLMProvider:
+    """Apply the completion cache and single-flight coalescing to a remote provider."""
+    if cache:
+        provider = CachedProvider(provider, get_completion_cache())
+    if settings.llm_coalesce_enabled:
+        # Outermost, so one request per key reaches the cache or the provider
+        provider = coalesce(provider)
+    return provider
+
+
+def _default_api_key(provider_name: str) -> Optional[str]:
+    if provider_name == "openai":
+        return settings.openai_api_key
+    if provider_name == "claude":
+        return getattr(settings, "anthropic_api_key", None)
+    if provider_name == "gemini":
+        return getattr(settings, "google_api_key", None)
+    return None
+
+
+def _create_provider(
+    provider_name: str,
+    api_key: Optional[str] = None,
+    model: Optional[str] = None
+) -> Optional[LLMProvider]:
+    """Construct a bare provider, or None if it is unknown or not configured."""
+    if settings.llm_cassette_mode == "replay" and provider_name in ("openai", "claude", "dummy"):
+        # No API key needed; answers come from the cassette
+        return gate(ReplayProvider(
+            get_cassette(settings.llm_cassette_path),
+            provider_name=provider_name,
+            model=model,
+            latency=settings.llm_cassette_latency
+        ))
+    if api_key is None:
+        api_key = _default_api_key(provider_name)
+    
+    if provider_name == "openai":
+        provider = OpenAIProvider(api_key=api_key, model=model or LLMModel.GPT4)
+    elif provider_name == "claude":
+        provider = ClaudeProvider(api_key=api_key, model=model or LLMModel.CLAUDE3_SONNET)
+    elif provider_name == "dummy":
+        return DummyProvider()
+    else:
+        logger.warning("unknown_provider", provider=provider_name)
+        return None
+    
+    if not provider.is_available():
+        logger.warning(f"{provider_name}_not_available", reason="missing_api_key")
+        return None
+    if settings.llm_cassette_mode == "record":
+        # Inside the gate, so recorded latencies exclude queueing
+        provider = RecordingProvider(provider, get_cassette(settings.llm_cassette_path))
+    # Innermost, so cache hits and coalesced callers do not use provider quota
+    return gate(provider)
+
+
+def _create_router() -> Optional[LLMProvider]:
+    """Routing provider over the configured ``llm_routing_providers``."""
+    backends = []
+    for name in settings.llm_routing_providers.split(","):
+        name = name.strip().lower()
+        if name:
+            provider = _create_provider(name)
+            if provider is not None:
+                backends.append(provider)
+    if not backends:
+        return None
+    return RoutingProvider(backends)
+
 
 def get_llm_provider(
     provider_name: Optional[str] = None,
     api_key: Optional[str] = None,
-    model: Optional[str] = None
+    model: Optional[str] = None,
+    cache: Optional[bool] = None
 ) -> LLMProvider:
     """
     Get LLM provider instance.
     
+    Instances are pooled per (provider, model, API key, cache), so agents
+    and API requests share one configured provider and its connections
+    instead of building a new one per call.
+    
     Args:
-        provider_name: Provider name (openai, claude, gemini, ollama, dummy)
-        api_key: API key for the provider
-        model: Model name to use
+        provider_name: Provider name (openai, claude, gemini, ollama, dummy,
+            or router to fail over across ``llm_routing_providers``)
+        api_key: API key for the provider (ignored by router)
+        model: Model name to use (ignored by router)
+        cache: Wrap remote providers in the completion cache
+            (defaults to ``llm_cache_enabled``)
     
     Returns:
         LLMProvider instance
     """
+    if cache is None:
+        cache = settings.llm_cache_enabled
     # Default to configured provider
     if provider_name is None:
         provider_name = getattr(settings, "llm_provider", "dummy")
     
     provider_name = provider_name.lower()
-    
-    # Get API key from settings if not provided
     if api_key is None:
-        if provider_name == "openai":
-            api_key = settings.openai_api_key
-        elif provider_name == "claude":
-            api_key = getattr(settings, "anthropic_api_key", None)
-        elif provider_name == "gemini":
-            api_key = getattr(settings, "google_api_key", None)
+        api_key = _default_api_key(provider_name)
     
-    # Create provider
+    key = (
+        provider_name,
+        str(model.value if isinstance(model, LLMModel) else model) if model else None,
+        hashlib.sha256(api_key.encode()).hexdigest()[:16] if api_key else None,
+        bool(cache)
+    )
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            provider = _build(provider_name, api_key, model, cache)
+            if provider is not None:
+                _providers[key] = provider
+    return provider or DummyProvider()
+
+
+def _build(
+    provider_name: str,
+    api_key: Optional[str],
+    model: Optional[str],
+    cache: bool
+) -> Optional[LLMProvider]:
+    """Build a wrapped provider; None if construction failed (not pooled)."""
     try:
-        if provider_name == "openai":
-            provider = OpenAIProvider(api_key=api_key, model=model or LLMModel.GPT4)
-            if not provider.is_available():
-                logger.warning("openai_not_available", reason="missing_api_key")
-                return DummyProvider()
-            return provider
-        
-        elif provider_name == "claude":
-            provider = ClaudeProvider(api_key=api_key, model=model or LLMModel.CLAUDE3_SONNET)
-            if not provider.is_available():
-                logger.warning("claude_not_available", reason="missing_api_key")
-                return DummyProvider()
-            return provider
-        
-        elif provider_name == "dummy":
-            return DummyProvider()
-        
+        if provider_name == "router":
+            provider = _create_router()
         else:
-            logger.warning("unknown_provider", provider=provider_name)
-            return DummyProvider()
-    
+            provider = _create_provider(provider_name, api_key, model)
     except Exception as e:
         logger.error("provider_creation_failed", provider=provider_name, error=str(e))
+        return None
+    
+    if provider is None or isinstance(provider, DummyProvider):
         return DummyProvider()
+    return _wrap(provider, cache)
+
+
+def reset_llm_providers() -> None:
+    """Drop pooled providers, e.g. after changing provider settings."""
+    with _providers_lock:
+        _providers.clear()
+
+
+def _backends(provider: LLMProvider) -> List[LLMProvider]:
+    """The real backends behind cache, coalescing and routing wrappers."""
+    if isinstance(provider, ProviderWrapper):
+        return _backends(provider.provider)
+    if isinstance(provider, RoutingProvider):
+        return [backend for inner in provider.providers for backend in _backends(inner)]
+    return [provider]
+
+
+async def warm_llm_providers(provider_names: Optional[List[str]] = None) -> List[str]:
+    """
+    Build the configured providers and open pooled connections to them.
+    
+    Connecting ahead of the first request moves DNS, TCP and TLS setup
+    out of the first user-facing call. Any HTTP answer (even 404) leaves a
+    keep-alive connection in the pool of the current event loop; errors
+    are logged and ignored. Returns the base URLs that were reached.
+    """
+    names = provider_names or [getattr(settings, "llm_provider", "dummy")]
+    urls = {
+        backend.base_url
+        for name in names
+        for backend in _backends(get_llm_provider(name))
+        if getattr(backend, "base_url", None)
+    }
+    client = get_async_client()
+    
+    async def connect(url: str) -> Optional[str]:
+        try:
+            await client.get(url, timeout=settings.llm_connect_timeout_seconds)
+            return url
+        except httpx.HTTPError as e:
+            logger.warning("llm_warmup_failed", url=url, error=str(e))
+            return None
+    
+    warmed = [url for url in await asyncio.gather(*(connect(url) for url in sorted(urls))) if url]
+    logger.info("llm_providers_warmed", providers=names, connections=warmed)
+    return warmed
@@ -0,0 +1,199 @@
+"""Shared HTTP connection pools for LLM providers."""
+import asyncio
+import json
+import threading
+import weakref
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+import structlog
+
+from ..config import get_settings
+from ..core.concurrency import get_limiter
+from ..core.exceptions import (
+    ExternalServiceError,
+    ExternalServiceRateLimitedError,
+    ExternalServiceUnavailableError
+)
+from ..core.ratelimit import backoff_from_headers
+from ..core.retry import get_circuit_breaker
+
+logger = structlog.get_logger()
+
+# An AsyncClient's connections belong to the event loop that opened them, so
+# there is one pool per running loop (normally just the server's loop)
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_sync_client: Optional[httpx.Client] = None
+_lock = threading.Lock()
+
+
+def _pool_options() -> dict:
+    settings = get_settings()
+    return {
+        "timeout": httpx.Timeout(
+            settings.llm_timeout_seconds,
+            connect=settings.llm_connect_timeout_seconds
+        ),
+        "limits": httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry_seconds
+        ),
+    }
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Keep-alive client shared by every provider on the current event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(**_pool_options())
+            _async_clients[loop] = client
+        return client
+
+
+def get_sync_client() -> httpx.Client:
+    """Keep-alive client for synchronous callers such as task plugins."""
+    global _sync_client
+    with _lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(**_pool_options())
+        return _sync_client
+
+
+async def close_http_clients() -> None:
+    """Close the pool of the current loop and the synchronous pool."""
+    global _sync_client
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.pop(loop, None)
+        sync_client, _sync_client = _sync_client, None
+    if client is not None:
+        await client.aclose()
+    if sync_client is not None:
+        sync_client.close()
+
+
+def _raise_for_status(response: httpx.Response, dependency: str) -> None:
+    """Raise the service error matching an unsuccessful response."""
+    if response.status_code == 429:
+        raise ExternalServiceRateLimitedError(
+            f"{dependency} rate limited the request (HTTP 429)",
+            details={"retry_after_seconds": backoff_from_headers(response.headers, 429)}
+        )
+    if response.status_code >= 500:
+        raise ExternalServiceUnavailableError(
+            f"{dependency} returned HTTP {response.status_code}",
+            details={"status_code": response.status_code, "body": response.text[:500]}
+        )
+    if response.status_code >= 400:
+        raise ExternalServiceError(
+            f"{dependency} rejected the request (HTTP {response.status_code})",
+            details={"status_code": response.status_code, "body": response.text[:500]}
+        )
+
+
+def _check_response(response: httpx.Response, dependency: str) -> dict:
+    """Return the JSON body or raise the matching service error."""
+    _raise_for_status(response, dependency)
+    return response.json()
+
+
+async def post_json(url: str, headers: dict, payload: dict, dependency: str) -> dict:
+    """
+    POST through the shared pool, guarded by the circuit breaker and the
+    adaptive concurrency limit of ``dependency`` (e.g. ``llm:openai``).
+
+    Transport errors and 5xx count against the breaker; 429 only shrinks the
+    concurrency limit, since the service is up but asking us to slow down.
+    """
+    breaker = get_circuit_breaker(dependency)
+    trial = breaker.before_call(dependency)
+    try:
+        async with get_limiter(dependency).slot_async() as slot:
+            try:
+                response = await get_async_client().post(url, headers=headers, json=payload)
+            except httpx.HTTPError:
+                breaker.record_failure()
+                raise
+            if response.status_code == 429 or response.status_code >= 500:
+                slot.failed()
+    except BaseException:
+        # Cancelled (e.g. a losing hedge) or unexpected: free a half-open trial
+        breaker.release(trial)
+        raise
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return _check_response(response, dependency)
+
+
+def post_json_sync(url: str, headers: dict, payload: dict, dependency: str) -> dict:
+    """Blocking variant of ``post_json`` for synchronous callers."""
+    breaker = get_circuit_breaker(dependency)
+    trial = breaker.before_call(dependency)
+    try:
+        with get_limiter(dependency).slot() as slot:
+            try:
+                response = get_sync_client().post(url, headers=headers, json=payload)
+            except httpx.HTTPError:
+                breaker.record_failure()
+                raise
+            if response.status_code == 429 or response.status_code >= 500:
+                slot.failed()
+    except BaseException:
+        breaker.release(trial)
+        raise
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return _check_response(response, dependency)
+
+
+async def stream_sse(
+    url: str,
+    headers: dict,
+    payload: dict,
+    dependency: str
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    POST and yield the JSON ``data:`` payload of each server-sent event.
+
+    Guarded like ``post_json``. The concurrency slot is held until the
+    stream ends, since the connection stays busy for its whole length. A
+    ``[DONE]`` sentinel ends the stream.
+    """
+    breaker = get_circuit_breaker(dependency)
+    trial = breaker.before_call(dependency)
+    try:
+        async with get_limiter(dependency).slot_async() as slot:
+            try:
+                async with get_async_client().stream("POST", url, headers=headers, json=payload) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        if response.status_code == 429 or response.status_code >= 500:
+                            slot.failed()
+                        if response.status_code >= 500:
+                            breaker.record_failure()
+                        else:
+                            breaker.record_success()
+                        _raise_for_status(response, dependency)
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        if data:
+                            yield json.loads(data)
+            except httpx.HTTPError:
+                breaker.record_failure()
+                raise
+    except BaseException:
+        # Includes GeneratorExit when the consumer abandons the stream
+        breaker.release(trial)
+        raise
+    breaker.record_success()
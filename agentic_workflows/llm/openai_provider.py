@@ -1,37 +1,92 @@
 """OpenAI LLM provider."""
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator
 import structlog
 
-from .base import LLMProvider, LLMResponse, LLMModel
+from .base import LLMProvider, LLMResponse, LLMModel, LLMChunk
+from .http import post_json, post_json_sync, stream_sse
+from .tokens import record_usage
+from ..config import get_settings
 
 logger = structlog.get_logger()
 
 
+def chat_payload(
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+    **kwargs
+) -> Dict[str, Any]:
+    """Request body for the chat completions endpoint."""
+    return {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        **kwargs
+    }
+
+
+def parse_chat_response(data: Dict[str, Any]) -> LLMResponse:
+    """Turn a chat completions response body into an ``LLMResponse``."""
+    choice = data["choices"][0]
+    usage = data.get("usage") or {}
+    return LLMResponse(
+        content=choice["message"]["content"],
+        model=data.get("model", ""),
+        tokens_used=usage.get("total_tokens", 0),
+        finish_reason=choice.get("finish_reason") or "stop",
+        metadata={
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+        }
+    )
+
+
+def _record(response: LLMResponse) -> LLMResponse:
+    record_usage(
+        "openai",
+        response.model,
+        response.metadata.get("prompt_tokens", 0),
+        response.metadata.get("completion_tokens", 0)
+    )
+    return response
+
+
+def chat_sync(
+    api_key: str,
+    payload: Dict[str, Any],
+    base_url: Optional[str] = None
+) -> LLMResponse:
+    """Blocking chat completion for synchronous callers (task plugins)."""
+    url = f"{(base_url or get_settings().openai_base_url).rstrip('/')}/chat/completions"
+    data = post_json_sync(url, {"Authorization": f"Bearer {api_key}"}, payload, "llm:openai")
+    return _record(parse_chat_response(data))
+
+
 class OpenAIProvider(LLMProvider):
-    """OpenAI GPT provider."""
-    
-    def __init__(self, api_key: Optional[str] = None, model: str = LLMModel.GPT4):
+    """
+    OpenAI GPT provider.
+
+    Talks to the chat completions REST endpoint through the shared async
+    connection pool, so a slow completion never blocks the event loop.
+    """
+
+    provider_name = "openai"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = LLMModel.GPT4,
+        base_url: Optional[str] = None
+    ):
         super().__init__(api_key, model)
-        self._client = None
-    
-    def _get_client(self):
-        """Lazy load OpenAI client."""
-        if self._client is None:
-            try:
-                import openai
-                if self.api_key:
-                    openai.api_key = self.api_key
-                self._client = openai
-            except ImportError:
-                logger.warning("openai package not installed")
-                return None
-        return self._client
-    
+        self.base_url = (base_url or get_settings().openai_base_url).rstrip("/")
+
     def is_available(self) -> bool:
         """Check if OpenAI is available."""
-        client = self._get_client()
-        return client is not None and self.api_key is not None
-    
+        return bool(self.api_key)
+
     async def complete(
         self,
         prompt: str,
@@ -43,7 +98,7 @@ class OpenAIProvider(LLMProvider):
         """Generate completion using OpenAI."""
         messages = self.format_messages(prompt, system_prompt)
         return await self.chat(messages, temperature, max_tokens, **kwargs)
-    
+
     async def chat(
         self,
         messages: List[Dict[str, str]],
@@ -52,31 +107,77 @@ class OpenAIProvider(LLMProvider):
         **kwargs
     ) -> LLMResponse:
         """Generate chat completion using OpenAI."""
-        client = self._get_client()
-        if not client:
+        if not self.api_key:
             raise RuntimeError("OpenAI client not available")
-        
+
+        payload = chat_payload(
+            self.model,
+            messages,
+            self.default_temperature if temperature is None else temperature,
+            max_tokens or self.default_max_tokens,
+            **kwargs
+        )
         try:
-            response = client.ChatCompletion.create(
-                model=self.model,
-                messages=messages,
-                temperature=temperature or self.default_temperature,
-                max_tokens=max_tokens or self.default_max_tokens,
-                **kwargs
-            )
-            
-            choice = response.choices[0]
-            
-            return LLMResponse(
-                content=choice.message.content,
-                model=response.model,
-                tokens_used=response.usage.total_tokens,
-                finish_reason=choice.finish_reason,
-                metadata={
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                }
+            data = await post_json(
+                f"{self.base_url}/chat/completions",
+                {"Authorization": f"Bearer {self.api_key}"},
+                payload,
+                f"llm:{self.provider_name}"
             )
+            return _record(parse_chat_response(data))
         except Exception as e:
             logger.error("openai_error", error=str(e))
             raise
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[LLMChunk]:
+        """Stream a chat completion using OpenAI server-sent events."""
+        if not self.api_key:
+            raise RuntimeError("OpenAI client not available")
+
+        payload = chat_payload(
+            self.model,
+            messages,
+            self.default_temperature if temperature is None else temperature,
+            max_tokens or self.default_max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs
+        )
+        try:
+            finish_reason = None
+            async for event in stream_sse(
+                f"{self.base_url}/chat/completions",
+                {"Authorization": f"Bearer {self.api_key}"},
+                payload,
+                f"llm:{self.provider_name}"
+            ):
+                model = event.get("model", "")
+                for choice in event.get("choices") or []:
+                    finish_reason = choice.get("finish_reason") or finish_reason
+                    delta = (choice.get("delta") or {}).get("content")
+                    if delta:
+                        yield LLMChunk(content=delta, model=model)
+                # With include_usage the usage arrives in a final chunk without choices
+                usage = event.get("usage")
+                if usage:
+                    record_usage(
+                        self.provider_name,
+                        model,
+                        usage.get("prompt_tokens", 0),
+                        usage.get("completion_tokens", 0)
+                    )
+                    yield LLMChunk(
+                        content="",
+                        model=model,
+                        finish_reason=finish_reason or "stop",
+                        tokens_used=usage.get("total_tokens", 0)
+                    )
+        except Exception as e:
+            logger.error("openai_stream_error", error=str(e))
+            raise
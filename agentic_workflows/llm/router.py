@@ -0,0 +1,274 @@
+"""Latency-aware routing across several LLM providers."""
+import asyncio
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import structlog
+
+from .base import LLMChunk, LLMProvider, LLMResponse
+from ..config import get_settings
+from ..core.retry import CircuitState
+
+logger = structlog.get_logger()
+
+# Hedge delay requested by the current caller (see ``hedging``)
+_hedge_after: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("llm_hedge_after", default=None)
+
+
+@contextmanager
+def hedging(after: Optional[float]) -> Iterator[None]:
+    """
+    Hedge routed requests made inside the block.
+
+    If the first provider has not answered after ``after`` seconds, the
+    same request is sent to the next provider and the first answer wins.
+    Hedging costs a duplicate request, so it is only for latency-critical
+    callers. The setting is carried in a context variable, so it also
+    reaches a router that is wrapped by the cache or the coalescer.
+    """
+    token = _hedge_after.set(after)
+    try:
+        yield
+    finally:
+        _hedge_after.reset(token)
+
+
+class ProviderHealth:
+    """Latency and error-rate EWMAs for one routed provider."""
+
+    def __init__(self, alpha: float = 0.3, error_threshold: float = 0.5, recovery_seconds: float = 60):
+        self.alpha = alpha
+        self.error_threshold = error_threshold
+        self.recovery_seconds = recovery_seconds
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.last_failure: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+            if ok:
+                # Failures are often fast, so only successes shape the latency
+                self.latency = latency if self.latency is None else (
+                    self.latency + self.alpha * (latency - self.latency)
+                )
+            else:
+                self.failures += 1
+                self.last_failure = time.monotonic()
+
+    def healthy(self) -> bool:
+        """False while the error rate is high and the last failure is recent."""
+        with self._lock:
+            if self.error_rate < self.error_threshold or self.last_failure is None:
+                return True
+            return time.monotonic() - self.last_failure >= self.recovery_seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "latency_ewma_ms": None if self.latency is None else round(self.latency * 1000, 1),
+                "error_rate": round(self.error_rate, 3),
+                "calls": self.calls,
+                "failures": self.failures,
+            }
+
+
+_health: Dict[str, ProviderHealth] = {}
+_health_lock = threading.Lock()
+
+
+def health_key(provider: LLMProvider) -> str:
+    return f"llm:{provider.provider_name}:{provider.model}"
+
+
+def get_provider_health(key: str) -> ProviderHealth:
+    """
+    Shared routing statistics for a backend (``llm:<provider>:<model>``).
+
+    Kept process-wide so measurements survive routers built per request.
+    """
+    with _health_lock:
+        health = _health.get(key)
+        if health is None:
+            settings = get_settings()
+            health = ProviderHealth(
+                alpha=settings.llm_routing_ewma_alpha,
+                error_threshold=settings.llm_routing_error_threshold,
+                recovery_seconds=settings.circuit_breaker_recovery_seconds
+            )
+            _health[key] = health
+        return health
+
+
+def provider_health_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Routing statistics of every backend that has been routed to."""
+    with _health_lock:
+        items = list(_health.items())
+    return {key: health.snapshot() for key, health in items}
+
+
+def reset_provider_health() -> None:
+    with _health_lock:
+        _health.clear()
+
+
+class RoutingProvider(LLMProvider):
+    """
+    Provider that routes each call to the fastest healthy backend.
+
+    Backends are ranked by latency EWMA; ones with a high recent error rate
+    or an open circuit breaker go last. A failed call is retried on the next
+    backend, so a brownout of one provider costs latency instead of an
+    error. Backends without measurements rank first so they get measured.
+    """
+
+    provider_name = "router"
+
+    def __init__(self, providers: List[LLMProvider], hedge_after: Optional[float] = None):
+        if not providers:
+            raise ValueError("RoutingProvider needs at least one provider")
+        super().__init__(None, providers[0].model)
+        self.providers = providers
+        self.hedge_after = hedge_after
+        self.health = {id(provider): get_provider_health(health_key(provider)) for provider in providers}
+
+    def is_available(self) -> bool:
+        return any(provider.is_available() for provider in self.providers)
+
+    def ranked(self) -> List[LLMProvider]:
+        """Available providers in the order they will be tried."""
+        def key(item):
+            position, provider = item
+            health = self.health[id(provider)]
+            degraded = not health.healthy() or provider.circuit_breaker.state == CircuitState.OPEN
+            return (degraded, health.latency or 0.0, position)
+
+        available = [(i, p) for i, p in enumerate(self.providers) if p.is_available()]
+        return [provider for _, provider in sorted(available, key=key)]
+
+    async def complete(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        messages = self.format_messages(prompt, system_prompt)
+        return await self.chat(messages, temperature, max_tokens, **kwargs)
+
+    async def _attempt(self, provider: LLMProvider, messages, temperature, max_tokens, kwargs) -> LLMResponse:
+        start = time.perf_counter()
+        try:
+            response = await provider.chat(messages, temperature, max_tokens, **kwargs)
+        except asyncio.CancelledError:
+            # Lost a hedge race; says nothing about the provider
+            raise
+        except Exception as e:
+            self.health[id(provider)].record(time.perf_counter() - start, ok=False)
+            logger.warning("llm_route_failed", provider=provider.provider_name, error=str(e))
+            raise
+        self.health[id(provider)].record(time.perf_counter() - start, ok=True)
+        response.metadata = {**response.metadata, "routed_to": provider.provider_name}
+        return response
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> LLMResponse:
+        candidates = self.ranked()
+        if not candidates:
+            raise RuntimeError("No routed LLM provider is available")
+        hedge_after = _hedge_after.get()
+        if hedge_after is None:
+            hedge_after = self.hedge_after
+
+        pending: Dict[asyncio.Task, LLMProvider] = {}
+        remaining = list(candidates)
+        last_error: Optional[Exception] = None
+
+        def launch() -> None:
+            provider = remaining.pop(0)
+            task = asyncio.ensure_future(self._attempt(provider, messages, temperature, max_tokens, kwargs))
+            pending[task] = provider
+
+        launch()
+        try:
+            while pending:
+                # Wait for a result, or until it is time to hedge on the next provider
+                timeout = hedge_after if hedge_after and remaining else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info("llm_route_hedged", after_seconds=hedge_after, provider=remaining[0].provider_name)
+                    launch()
+                    continue
+                for task in done:
+                    pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                if not pending and remaining:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[LLMChunk]:
+        """
+        Stream from the best backend, failing over until the first chunk.
+
+        Once text has been sent to the caller the stream is committed to
+        that backend; streams are not hedged.
+        """
+        candidates = self.ranked()
+        if not candidates:
+            raise RuntimeError("No routed LLM provider is available")
+        last_error: Optional[Exception] = None
+        for provider in candidates:
+            health = self.health[id(provider)]
+            start = time.perf_counter()
+            started = False
+            try:
+                async for chunk in provider.stream_chat(messages, temperature, max_tokens, **kwargs):
+                    if not started:
+                        started = True
+                        # Time to first token is the latency that matters for streams
+                        health.record(time.perf_counter() - start, ok=True)
+                    yield chunk
+                return
+            except Exception as e:
+                if started:
+                    raise
+                health.record(time.perf_counter() - start, ok=False)
+                logger.warning("llm_route_failed", provider=provider.provider_name, error=str(e))
+                last_error = e
+        raise last_error
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Per-backend routing statistics, in current routing order."""
+        return [
+            {
+                "provider": provider.provider_name,
+                "model": provider.model,
+                "healthy": self.health[id(provider)].healthy(),
+                **self.health[id(provider)].snapshot(),
+            }
+            for provider in self.ranked()
+        ]
@@ -0,0 +1,226 @@
+"""Token estimation, prompt budgets and usage accounting."""
+import json
+import math
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+try:
+    from ..monitoring.metrics import record_llm_tokens
+except ImportError:
+    # prometheus_client is optional; the meter still counts in process
+    record_llm_tokens = None
+
+logger = structlog.get_logger()
+
+# Words, numbers and single punctuation marks, roughly what BPE tokenizers split on
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+TRUNCATION_MARKER = "…[truncated {count} chars]…"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Fast local estimate of the token count of ``text``.
+
+    Uses the larger of ~4 characters per token and the number of word and
+    punctuation pieces, which tracks real tokenizers closely for prose and
+    errs high for JSON and code. No tokenizer download is needed.
+    """
+    if not text:
+        return 0
+    return max(math.ceil(len(text) / 4), len(_PIECES.findall(text)))
+
+
+def estimate_messages_tokens(messages: List[Dict[str, str]]) -> int:
+    """Estimate for a chat message list, including per-message overhead."""
+    return sum(estimate_tokens(m.get("content", "")) + 4 for m in messages) + 2
+
+
+def _chars_for(text: str, max_tokens: int) -> int:
+    """Characters of ``text`` that fit in ``max_tokens`` at its own density."""
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return len(text)
+    return max(0, int(len(text) * max_tokens / tokens))
+
+
+def truncate_text(text: str, max_tokens: int, tail_fraction: float = 0.3) -> str:
+    """
+    Shorten ``text`` to about ``max_tokens``, keeping its start and end.
+
+    ``tail_fraction`` of the kept characters come from the end.
+    """
+    keep = _chars_for(text, max_tokens)
+    if keep >= len(text):
+        return text
+    tail = int(keep * tail_fraction)
+    head = keep - tail
+    removed = len(text) - head - tail
+    return text[:head] + TRUNCATION_MARKER.format(count=removed) + (text[-tail:] if tail else "")
+
+
+def truncate_trace(trace: str, max_tokens: int, head_lines: int = 2) -> str:
+    """
+    Shorten an error message or traceback to about ``max_tokens``.
+
+    Keeps the first ``head_lines`` lines and as many trailing lines as fit,
+    since the innermost frames and the exception line come last.
+    """
+    if estimate_tokens(trace) <= max_tokens:
+        return trace
+    lines = trace.splitlines()
+    head = lines[:head_lines]
+    budget = max_tokens - estimate_tokens("\n".join(head)) - 8
+    tail: List[str] = []
+    for line in reversed(lines[head_lines:]):
+        cost = estimate_tokens(line) + 1
+        if cost > budget:
+            break
+        tail.insert(0, line)
+        budget -= cost
+    if not tail:
+        # A single huge line (e.g. a response body in the message)
+        return truncate_text(trace, max_tokens)
+    omitted = len(lines) - len(head) - len(tail)
+    return "\n".join(head + [f"… [{omitted} lines omitted] …"] + tail)
+
+
+def _shrink(value: Any, max_items: int, max_string: int, depth: int) -> Any:
+    """Copy of ``value`` with long strings, collections and nesting cut down."""
+    if isinstance(value, str):
+        if len(value) > max_string:
+            return value[:max_string] + TRUNCATION_MARKER.format(count=len(value) - max_string)
+        return value
+    if isinstance(value, dict):
+        if depth <= 0:
+            return f"{{… {len(value)} keys}}"
+        items = list(value.items())
+        shrunk = {str(k): _shrink(v, max_items, max_string, depth - 1) for k, v in items[:max_items]}
+        if len(items) > max_items:
+            shrunk["…"] = f"{len(items) - max_items} more keys"
+        return shrunk
+    if isinstance(value, (list, tuple, set)):
+        items = list(value)
+        if depth <= 0:
+            return f"[… {len(items)} items]"
+        shrunk = [_shrink(v, max_items, max_string, depth - 1) for v in items[:max_items]]
+        if len(items) > max_items:
+            shrunk.append(f"… {len(items) - max_items} more items")
+        return shrunk
+    return value
+
+
+# Successively tighter (max_items, max_string, depth) limits
+_JSON_LEVELS: Tuple[Tuple[int, int, int], ...] = (
+    (50, 2000, 8),
+    (20, 500, 6),
+    (10, 200, 4),
+    (5, 80, 3),
+    (3, 40, 2),
+)
+
+
+def fit_json(value: Any, max_tokens: int, indent: Optional[int] = 2) -> str:
+    """
+    Serialize ``value`` as JSON within about ``max_tokens``.
+
+    Shrinks structurally before cutting characters: long strings, then
+    long lists and dicts, then deep nesting are replaced by short markers
+    so the result stays valid, readable JSON that keeps the overall shape.
+    Only if the tightest level still does not fit is the text cut.
+    """
+    text = json.dumps(value, indent=indent, default=str)
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    for max_items, max_string, depth in _JSON_LEVELS:
+        text = json.dumps(_shrink(value, max_items, max_string, depth), indent=indent, default=str)
+        if estimate_tokens(text) <= max_tokens:
+            return text
+    # Compact separators before giving up on valid JSON
+    return truncate_text(json.dumps(_shrink(value, *_JSON_LEVELS[-1]), default=str), max_tokens)
+
+
+@dataclass
+class TokenBudget:
+    """
+    Token limits for one agent's LLM calls.
+
+    ``prompt_tokens`` bounds the whole prompt; prompt builders give each
+    variable section a ``share`` of it. ``completion_tokens`` is passed as
+    ``max_tokens`` (None keeps the provider default).
+    """
+    prompt_tokens: int = 3000
+    completion_tokens: Optional[int] = None
+
+    def share(self, fraction: float, minimum: int = 64) -> int:
+        return max(minimum, int(self.prompt_tokens * fraction))
+
+    def fit_prompt(self, prompt: str) -> str:
+        """Last-resort cut of a prompt that is still over budget."""
+        if estimate_tokens(prompt) <= self.prompt_tokens:
+            return prompt
+        logger.warning(
+            "llm_prompt_over_budget",
+            estimated_tokens=estimate_tokens(prompt),
+            budget=self.prompt_tokens
+        )
+        return truncate_text(prompt, self.prompt_tokens)
+
+
+class TokenMeter:
+    """Prompt and completion token totals per provider and model."""
+
+    def __init__(self):
+        self._usage: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+        with self._lock:
+            usage = self._usage.setdefault(
+                (provider, str(getattr(model, "value", model))),
+                {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+            )
+            usage["calls"] += 1
+            usage["prompt_tokens"] += prompt_tokens or 0
+            usage["completion_tokens"] += completion_tokens or 0
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                f"{provider}:{model}": {
+                    **usage,
+                    "total_tokens": usage["prompt_tokens"] + usage["completion_tokens"],
+                }
+                for (provider, model), usage in self._usage.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._usage.clear()
+
+
+_meter = TokenMeter()
+
+
+def get_token_meter() -> TokenMeter:
+    """Process-wide token meter fed by every provider call."""
+    return _meter
+
+
+def record_usage(provider: str, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+    """Record the token usage of one completed provider call."""
+    _meter.record(provider, model, prompt_tokens, completion_tokens)
+    model = str(getattr(model, "value", model))
+    if record_llm_tokens is not None:
+        record_llm_tokens(provider, model, prompt_tokens, completion_tokens)
+    logger.debug(
+        "llm_tokens",
+        provider=provider,
+        model=model,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens
+    )
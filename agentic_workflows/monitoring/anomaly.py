@@ -0,0 +1,221 @@
+"""Incremental anomaly detection over workflow events, pushed to subscribers."""
+import asyncio
+import inspect
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import structlog
+
+from .streaming import EWMA, RateWindow
+
+logger = structlog.get_logger()
+
+Anomaly = Dict[str, Any]
+Subscriber = Callable[[Anomaly], Any]
+
+# A near-constant series still needs a real slowdown to alert: the
+# deviation is measured against at least this fraction of the mean
+MIN_RELATIVE_STD = 0.1
+
+
+class _LRU(OrderedDict):
+    """Insertion-ordered dict that drops its oldest keys past ``max_size``."""
+
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+
+    def put(self, key: Any, value: Any) -> None:
+        self[key] = value
+        self.move_to_end(key)
+        while len(self) > self.max_size:
+            self.popitem(last=False)
+
+    def touch(self, key: Any, factory: Callable[[], Any]) -> Any:
+        """Value for ``key``, created by ``factory`` if missing, marked recently used."""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+        self.put(key, value)
+        return value
+
+
+class AnomalyDetector:
+    """
+    Anomaly detection maintained per series as events arrive.
+
+    - Durations, per workflow and per task type: an EWMA mean and variance;
+      a value more than ``z_threshold`` deviations above the mean (after
+      ``min_samples`` values) is a ``slow_execution``.
+    - Outcomes, per workflow: an EWMA failure rate above
+      ``error_rate_threshold`` is a ``high_error_rate``.
+    - Errors, per pattern: more than ``error_burst_threshold`` within
+      ``error_window_seconds`` is a ``repeated_error``.
+
+    Every event is O(1). New anomalies are pushed to subscribers when they
+    start; ``active()`` lists those still in effect. At most ``max_series``
+    series of each kind are tracked, least recently updated first out.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.1,
+        z_threshold: float = 3.0,
+        min_samples: int = 10,
+        error_rate_threshold: float = 0.3,
+        error_window_seconds: float = 300,
+        error_burst_threshold: int = 5,
+        max_series: int = 1000,
+        clock: Callable[[], float] = time.time
+    ):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_samples = min_samples
+        self.error_rate_threshold = error_rate_threshold
+        self.error_window_seconds = error_window_seconds
+        self.error_burst_threshold = error_burst_threshold
+        self.clock = clock
+        self._durations = _LRU(max_series)
+        self._outcomes = _LRU(max_series)
+        self._errors = _LRU(max_series)
+        self._active = _LRU(max_series)
+        self._subscribers: List[Subscriber] = []
+        # Running coroutine subscribers, referenced so they are not collected
+        self._tasks: Set["asyncio.Future[Any]"] = set()
+
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """
+        Call ``callback(anomaly)`` for each new anomaly; returns an unsubscribe function.
+
+        Coroutine callbacks are scheduled on the running event loop; anomalies
+        raised outside one skip them with a warning.
+        """
+        self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def _publish(self, anomaly: Anomaly) -> None:
+        logger.warning("anomaly_detected", **anomaly)
+        for callback in list(self._subscribers):
+            try:
+                result = callback(anomaly)
+                if inspect.isawaitable(result):
+                    self._schedule(result, anomaly)
+            except Exception as e:
+                logger.error("anomaly_subscriber_failed", type=anomaly["type"], error=str(e))
+
+    def _schedule(self, awaitable: Any, anomaly: Anomaly) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            logger.warning("anomaly_subscriber_skipped", type=anomaly["type"], reason="no running event loop")
+            return
+        task = asyncio.ensure_future(awaitable, loop=loop)
+        self._tasks.add(task)
+
+        def done(task: "asyncio.Future[Any]") -> None:
+            self._tasks.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                logger.error("anomaly_subscriber_failed", type=anomaly["type"], error=str(task.exception()))
+
+        task.add_done_callback(done)
+
+    def _raise(self, key: Tuple[str, str, str], anomaly: Anomaly) -> None:
+        anomaly["timestamp"] = self.clock()
+        started = key not in self._active
+        self._active.put(key, anomaly)
+        if started or anomaly["type"] == "slow_execution":
+            # Every slow run is news; rates only when they cross the line
+            self._publish(anomaly)
+
+    def _clear(self, key: Tuple[str, str, str]) -> None:
+        self._active.pop(key, None)
+
+    def observe_duration(self, scope: str, name: str, seconds: float) -> Optional[Anomaly]:
+        """Record one duration of a workflow or task type (``scope``); returns the anomaly, if any."""
+        series = self._durations.touch((scope, name), lambda: EWMA(self.alpha))
+        key = ("slow_execution", scope, name)
+        anomaly = None
+        if series.count >= self.min_samples:
+            std = max(series.std, series.mean * MIN_RELATIVE_STD)
+            z_score = (seconds - series.mean) / std if std > 0 else 0.0
+            if z_score > self.z_threshold:
+                anomaly = {
+                    "type": "slow_execution",
+                    "severity": "low",
+                    "scope": scope,
+                    "key": name,
+                    "value": seconds,
+                    "average": series.mean,
+                    "z_score": z_score,
+                    "message": f"{scope.capitalize()} {name} took {seconds:.1f}s (avg: {series.mean:.1f}s)"
+                }
+        series.update(seconds)
+        if anomaly:
+            self._raise(key, anomaly)
+        else:
+            self._clear(key)
+        return anomaly
+
+    def observe_outcome(self, name: str, failed: bool) -> Optional[Anomaly]:
+        """Record whether a run of workflow ``name`` failed."""
+        series = self._outcomes.touch(name, lambda: EWMA(self.alpha))
+        series.update(1.0 if failed else 0.0)
+        key = ("high_error_rate", "workflow", name)
+        if series.count < self.min_samples or series.mean <= self.error_rate_threshold:
+            self._clear(key)
+            return None
+        anomaly = {
+            "type": "high_error_rate",
+            "severity": "high",
+            "scope": "workflow",
+            "key": name,
+            "value": series.mean,
+            "message": f"High failure rate detected for {name}: {series.mean:.1%}"
+        }
+        self._raise(key, anomaly)
+        return anomaly
+
+    def observe_error(self, pattern: str) -> Optional[Anomaly]:
+        """Record one occurrence of an error pattern."""
+        now = self.clock()
+        window = self._errors.touch(pattern, lambda: RateWindow(self.error_window_seconds))
+        window.add(now)
+        count = window.count(now)
+        key = ("repeated_error", "error", pattern)
+        if count <= self.error_burst_threshold:
+            self._clear(key)
+            return None
+        anomaly = {
+            "type": "repeated_error",
+            "severity": "medium",
+            "scope": "error",
+            "key": pattern,
+            "pattern": pattern,
+            "count": count,
+            "window_seconds": self.error_window_seconds,
+            "message": f"Error pattern repeated {count} times in {self.error_window_seconds:.0f}s: {pattern}"
+        }
+        self._raise(key, anomaly)
+        return anomaly
+
+    def active(self) -> List[Anomaly]:
+        """Anomalies still in effect, oldest first."""
+        now = self.clock()
+        anomalies = []
+        for key, anomaly in list(self._active.items()):
+            kind, _, pattern = key
+            # Error bursts end when the window moves past them, even with no new events
+            window = self._errors.get(pattern) if kind == "repeated_error" else None
+            if kind == "repeated_error" and (window is None or window.count(now) <= self.error_burst_threshold):
+                del self._active[key]
+                continue
+            anomalies.append(anomaly)
+        return anomalies
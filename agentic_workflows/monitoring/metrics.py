@@ -47,6 +47,18 @@ api_request_duration_seconds = Histogram(
     ['method', 'endpoint']
 )
 
+# LLM metrics
+llm_tokens_total = Counter(
+    'llm_tokens_total',
+    'LLM tokens used',
+    ['provider', 'model', 'kind']
+)
+
+def record_llm_tokens(provider: str, model: str, prompt_tokens: int, completion_tokens: int):
+    """Count the tokens of one provider call by kind (prompt or completion)."""
+    llm_tokens_total.labels(provider=provider, model=model, kind="prompt").inc(prompt_tokens or 0)
+    llm_tokens_total.labels(provider=provider, model=model, kind="completion").inc(completion_tokens or 0)
+
 def track_workflow_execution(workflow_id: str):
     """Decorator to track workflow execution metrics."""
     def decorator(func):
@@ -0,0 +1,171 @@
+"""Fixed-memory streaming statistics: quantile sketches, EWMAs and rate windows."""
+import bisect
+import math
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+
+class LogHistogram:
+    """
+    Quantile sketch over log-spaced buckets, in the style of HDR histograms.
+
+    Bucket bounds grow by a constant factor, so every quantile is reported
+    within ``precision`` relative error. Memory depends on the range of
+    values (about 1,000 buckets for 1ms to 11 days at 1%), never on how
+    many were observed. Values at or below ``min_value`` share the first
+    bucket.
+    """
+
+    def __init__(self, precision: float = 0.01, min_value: float = 1e-3):
+        if not 0 < precision < 1:
+            raise ValueError("precision must be between 0 and 1")
+        self.gamma = (1 + precision) / (1 - precision)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        # Sorted bucket indexes and cumulative counts, rebuilt after new values
+        self._indexes: Optional[List[int]] = None
+        self._cumulative: List[int] = []
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return int(math.ceil(math.log(value / self.min_value) / self._log_gamma))
+
+    def _value(self, index: int) -> float:
+        if index == 0:
+            return self.min_value
+        # Midpoint (in relative terms) of (min * gamma^(i-1), min * gamma^i]
+        return 2 * self.min_value * self.gamma ** index / (self.gamma + 1)
+
+    def observe(self, value: float) -> None:
+        index = self._index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self._indexes = None
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        if self._indexes is None:
+            self._indexes = sorted(self.buckets)
+            total = 0
+            self._cumulative = []
+            for index in self._indexes:
+                total += self.buckets[index]
+                self._cumulative.append(total)
+        rank = min(max(q, 0.0), 1.0) * (self.count - 1)
+        position = bisect.bisect_right(self._cumulative, rank)
+        return self._value(self._indexes[min(position, len(self._indexes) - 1)])
+
+
+class StreamingStats:
+    """
+    Running count, mean, extremes and quantiles of one metric.
+
+    Each observation is O(1); the last ``window`` values are kept for
+    inspection and everything older lives only in the aggregates.
+    """
+
+    __slots__ = ("count", "total", "min", "max", "last", "recent", "histogram")
+
+    def __init__(self, window: int = 256, precision: float = 0.01):
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.last: Optional[float] = None
+        self.recent: Deque[float] = deque(maxlen=window)
+        self.histogram = LogHistogram(precision)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.last = value
+        self.recent.append(value)
+        self.histogram.observe(value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        # The sketch is approximate; never report beyond what was observed
+        return min(max(self.histogram.quantile(q), self.min), self.max)
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min or 0.0,
+            "max": self.max or 0.0,
+            "last": self.last or 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class EWMA:
+    """
+    Exponentially weighted mean and variance of a series, updated in O(1).
+
+    ``alpha`` is the weight of each new value; recent behaviour dominates,
+    so a series that settles at a new level stops looking anomalous.
+    """
+
+    __slots__ = ("alpha", "mean", "variance", "count")
+
+    def __init__(self, alpha: float = 0.1):
+        self.alpha = alpha
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        if self.count == 1:
+            self.mean = value
+            return
+        diff = value - self.mean
+        increment = self.alpha * diff
+        self.mean += increment
+        self.variance = (1 - self.alpha) * (self.variance + diff * increment)
+
+
+class RateWindow:
+    """
+    Events in the last ``window_seconds``, counted in ``buckets`` time slots.
+
+    Adding is O(1) and counting O(buckets), with ``buckets`` fixed; the
+    window slides one slot at a time.
+    """
+
+    __slots__ = ("width", "slots", "counts")
+
+    def __init__(self, window_seconds: float = 300, buckets: int = 10):
+        self.width = window_seconds / buckets
+        self.slots: List[int] = [-1] * buckets
+        self.counts: List[int] = [0] * buckets
+
+    def add(self, now: float, count: int = 1) -> None:
+        slot = int(now // self.width)
+        index = slot % len(self.slots)
+        if self.slots[index] != slot:
+            self.slots[index] = slot
+            self.counts[index] = 0
+        self.counts[index] += count
+
+    def count(self, now: float) -> int:
+        current = int(now // self.width)
+        oldest = current - len(self.slots)
+        return sum(c for slot, c in zip(self.slots, self.counts) if oldest < slot <= current)
@@ -21,6 +21,15 @@ class ImageProcessorPlugin(PluginBase):
     """
     
     name = "image_processor"
+    params_schema = {
+        "input_path": {"type": "string", "required": True},
+        "output_path": {"type": "string"},
+        "operation": {"type": "string", "options": ["info", "resize", "thumbnail", "ocr", "convert"]},
+        "width": {"type": "integer"},
+        "height": {"type": "integer"},
+        "format": {"type": "string"},
+        "quality": {"type": "integer"},
+    }
     
     def __init__(self, params: Dict[str, Any], audit=None):
         super().__init__(params, audit=audit)
@@ -20,6 +20,12 @@ class PDFExtractorPlugin(PluginBase):
     """
     
     name = "pdf_extractor"
+    params_schema = {
+        "input_path": {"type": "string", "required": True},
+        "output_path": {"type": "string"},
+        "extract_metadata": {"type": "boolean"},
+        "page_range": {"type": "string"},
+    }
     
     def __init__(self, params: Dict[str, Any], audit=None):
         super().__init__(params, audit=audit)
@@ -21,6 +21,14 @@ class ShellCommandPlugin(PluginBase):
     """
     
     name = "shell_command"
+    params_schema = {
+        "command": {"type": "string", "required": True},
+        "args": {"type": "array"},
+        "cwd": {"type": "string"},
+        "timeout": {"type": "number"},
+        "allow_unsafe": {"type": "boolean"},
+        "capture_output": {"type": "boolean"},
+    }
     
     # Whitelist of safe commands
     SAFE_COMMANDS = {
@@ -3,6 +3,8 @@ from typing import Dict, Any, List
 import structlog
 
 from ..base import PluginBase
+from ...core.concurrency import get_limiter
+from ...core.retry import get_circuit_breaker, breaker_key_for_dsn
 
 logger = structlog.get_logger()
 
@@ -19,6 +21,14 @@ class SQLQueryPlugin(PluginBase):
     """
     
     name = "sql_query"
+    params_schema = {
+        "connection_string": {"type": "string", "required": True},
+        "query": {"type": "string", "required": True},
+        "parameters": {"type": "object"},
+        "read_only": {"type": "boolean"},
+        "limit": {"type": "integer"},
+        "database_type": {"type": "string", "options": ["postgresql", "mysql", "sqlite"]},
+    }
     
     def __init__(self, params: Dict[str, Any], audit=None):
         super().__init__(params, audit=audit)
@@ -71,40 +81,55 @@ class SQLQueryPlugin(PluginBase):
             import psycopg2
             from psycopg2.extras import RealDictCursor
             
-            conn = psycopg2.connect(self.connection_string)
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            # Connection failures trip one breaker per database server, and
+            # one adaptive concurrency limit bounds queries against it
+            dependency = breaker_key_for_dsn(self.connection_string)
+            breaker = get_circuit_breaker(dependency)
+            trial = breaker.before_call(self.name)
             
-            try:
-                # Execute with parameters
-                cursor.execute(self.query, self.parameters)
+            with get_limiter(dependency).slot():
+                try:
+                    conn = psycopg2.connect(self.connection_string)
+                except psycopg2.OperationalError:
+                    breaker.record_failure()
+                    raise
+                except BaseException:
+                    breaker.release(trial)
+                    raise
+                breaker.record_success()
+                cursor = conn.cursor(cursor_factory=RealDictCursor)
                 
-                if self._is_read_only_query(self.query):
-                    # Fetch results with limit
-                    results = cursor.fetchmany(self.limit)
-                    rows = [dict(row) for row in results]
+                try:
+                    # Execute with parameters
+                    cursor.execute(self.query, self.parameters)
                     
-                    if self.audit:
-                        self.audit.record({
-                            "plugin": self.name,
-                            "database": "postgresql",
-                            "rows_returned": len(rows)
-                        })
-                    
-                    return {
-                        "status": "ok",
-                        "rows": rows,
-                        "count": len(rows),
-                        "limited": len(rows) == self.limit
-                    }
-                else:
-                    conn.commit()
-                    return {
-                        "status": "ok",
-                        "rows_affected": cursor.rowcount
-                    }
-            finally:
-                cursor.close()
-                conn.close()
+                    if self._is_read_only_query(self.query):
+                        # Fetch results with limit
+                        results = cursor.fetchmany(self.limit)
+                        rows = [dict(row) for row in results]
+                        
+                        if self.audit:
+                            self.audit.record({
+                                "plugin": self.name,
+                                "database": "postgresql",
+                                "rows_returned": len(rows)
+                            })
+                        
+                        return {
+                            "status": "ok",
+                            "rows": rows,
+                            "count": len(rows),
+                            "limited": len(rows) == self.limit
+                        }
+                    else:
+                        conn.commit()
+                        return {
+                            "status": "ok",
+                            "rows_affected": cursor.rowcount
+                        }
+                finally:
+                    cursor.close()
+                    conn.close()
         
         except ImportError:
             return {"status": "error", "message": "psycopg2 not installed"}
@@ -22,6 +22,15 @@ class WebScraperPlugin(PluginBase):
     """
     
     name = "web_scraper"
+    params_schema = {
+        "url": {"type": "string", "required": True},
+        "selectors": {"type": "object"},
+        "screenshot": {"type": "boolean"},
+        "screenshot_path": {"type": "string"},
+        "wait_for": {"type": "string"},
+        "timeout": {"type": "number"},
+        "headless": {"type": "boolean"},
+    }
     
     def __init__(self, params: Dict[str, Any], audit=None):
         super().__init__(params, audit=audit)
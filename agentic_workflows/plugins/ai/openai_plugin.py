@@ -1,8 +1,8 @@
 """OpenAI GPT integration plugin."""
 from ..base import PluginBase
 from typing import Optional
-import openai
 from ...config import get_settings
+from ...llm.openai_provider import chat_payload, chat_sync
 
 settings = get_settings()
 
@@ -18,9 +18,6 @@ class OpenAIPlugin(PluginBase):
         self.prompt = params.get("prompt")
         self.max_tokens = params.get("max_tokens", settings.openai_max_tokens)
         self.temperature = params.get("temperature", 0.7)
-        
-        if self.api_key:
-            openai.api_key = self.api_key
     
     def plan(self) -> list:
         return [{"action": "openai_completion", "model": self.model, "prompt_length": len(self.prompt or "")}]
@@ -30,26 +27,28 @@ class OpenAIPlugin(PluginBase):
             return {"status": "error", "message": "OpenAI API key not configured"}
         
         try:
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[{"role": "user", "content": self.prompt}],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
+            # Shared keep-alive pool instead of a fresh connection per task
+            response = chat_sync(
+                self.api_key,
+                chat_payload(
+                    self.model,
+                    [{"role": "user", "content": self.prompt}],
+                    self.temperature,
+                    self.max_tokens
+                )
             )
             
-            result = response.choices[0].message.content
-            
             if self.audit:
                 self.audit.record({
                     "plugin": self.name,
                     "model": self.model,
-                    "tokens_used": response.usage.total_tokens
+                    "tokens_used": response.tokens_used
                 })
             
             return {
                 "status": "ok",
-                "result": result,
-                "tokens_used": response.usage.total_tokens
+                "result": response.content,
+                "tokens_used": response.tokens_used
             }
         except Exception as e:
             return {"status": "error", "message": str(e)}
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 class PluginBase(ABC):
     """
@@ -7,6 +7,12 @@ class PluginBase(ABC):
     """
 
     name: str = "base"
+    # Default bound on execute(); a task's "timeout_seconds" param overrides it
+    timeout_seconds: Optional[float] = None
+    # Parameters the plugin reads: name -> {"type", "required", "options"}.
+    # Types are string, integer, number, boolean, object and array; a missing
+    # type accepts anything. Used to validate specs before they run.
+    params_schema: Dict[str, Dict[str, Any]] = {}
 
     def __init__(self, params: Dict[str, Any], audit=None):
         self.params = params or {}
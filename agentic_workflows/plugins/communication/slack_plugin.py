@@ -1,5 +1,10 @@
 """Slack integration plugin."""
 from ..base import PluginBase
+from ...core.concurrency import get_limiter
+from ...core.ratelimit import get_rate_limiter
+from ...core.retry import breaker_key_for_url
+from ...config import get_settings
+from urllib.parse import urlsplit
 import requests
 
 class SlackPlugin(PluginBase):
@@ -27,7 +32,14 @@ class SlackPlugin(PluginBase):
                 "icon_emoji": self.icon_emoji
             }
             
-            response = requests.post(self.webhook_url, json=payload)
+            # Slack answers bursts with 429 + Retry-After; pause the bucket
+            bucket = get_rate_limiter(urlsplit(self.webhook_url).hostname or "")
+            bucket.acquire(timeout=get_settings().outbound_rate_limit_max_wait_seconds)
+            with get_limiter(breaker_key_for_url(self.webhook_url)).slot() as slot:
+                response = requests.post(self.webhook_url, json=payload)
+                if response.status_code == 429 or response.status_code >= 500:
+                    slot.failed()
+            bucket.update_from_response(response.headers, response.status_code)
             response.raise_for_status()
             
             if self.audit:
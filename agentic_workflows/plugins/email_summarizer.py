@@ -4,6 +4,10 @@ from pathlib import Path
 
 class EmailSummarizer(PluginBase):
     name = "email_summarizer"
+    params_schema = {
+        "source_path": {"type": "string"},
+        "num_sentences": {"type": "integer"},
+    }
 
     def __init__(self, params: dict, audit=None):
         super().__init__(params, audit=audit)
@@ -67,7 +71,7 @@ class EmailSummarizer(PluginBase):
                     "email_index": idx,
                     "summary_len": len(summary),
                     "original_len": len(e)
-                })
+                }, level="item")
         
         return {
             "status": "completed",
@@ -28,6 +28,11 @@ def file_hash(path: Path, chunk_size: int = 8192) -> str:
 
 class FileOrganizer(PluginBase):
     name = "file_organizer"
+    params_schema = {
+        "target": {"type": "string"},
+        "categories": {"type": "object"},
+        "allow_destructive": {"type": "boolean"},
+    }
 
     def __init__(self, params: dict, audit=None):
         super().__init__(params, audit=audit)
@@ -142,7 +147,7 @@ class FileOrganizer(PluginBase):
                         "action": "moved",
                         "src": str(src),
                         "dst": str(final)
-                    })
+                    }, level="item")
             except Exception as e:
                 results.append({"action": a, "status": "failed", "error": str(e)})
                 failed_count += 1
@@ -1,8 +1,24 @@
 from .base import PluginBase
+from ..core.exceptions import CircuitOpenError, ExternalServiceRateLimitedError
+from ..core.concurrency import get_limiter
+from ..core.ratelimit import backoff_from_headers, get_rate_limiter
+from ..core.retry import get_circuit_breaker, breaker_key_for_url
+from ..config import get_settings
+from urllib.parse import urlsplit
 import requests
 
 class HTTPTask(PluginBase):
     name = "http_task"
+    params_schema = {
+        "url": {"type": "string", "required": True},
+        "method": {"type": "string", "options": ["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"]},
+        "payload": {},
+        "headers": {"type": "object"},
+        "timeout": {"type": "number"},
+        "rate_limit": {"type": "string"},
+        "rate_limit_key": {"type": "string"},
+        "rate_limit_retries": {"type": "integer"},
+    }
 
     def __init__(self, params: dict, audit=None):
         super().__init__(params, audit=audit)
@@ -12,6 +28,10 @@ class HTTPTask(PluginBase):
         self.headers = params.get("headers", {})
         self.timeout = float(params.get("timeout", 10))
         self.dry_run = params.get("dry_run", True)
+        # Outbound rate limiting: bucket per host unless a credential key is given
+        self.rate_limit = params.get("rate_limit")  # e.g. "10/s", "600/min:20"
+        self.rate_limit_key = params.get("rate_limit_key") or urlsplit(self.url or "").hostname or ""
+        self.rate_limit_retries = int(params.get("rate_limit_retries", 2))
 
     def plan(self):
         return [{"action": "http_call", "method": self.method, "url": self.url}]
@@ -28,14 +48,33 @@ class HTTPTask(PluginBase):
                 "timeout": self.timeout
             }
         
+        # The task's own rate is paced separately; the host bucket stays
+        # shared and is the one server pauses apply to
+        bucket = get_rate_limiter(self.rate_limit_key)
+        task_bucket = get_rate_limiter(self.rate_limit_key, self.rate_limit) if self.rate_limit else None
+        max_wait = get_settings().outbound_rate_limit_max_wait_seconds
         try:
-            resp = requests.request(
-                self.method,
-                self.url,
-                json=self.payload,
-                headers=self.headers,
-                timeout=self.timeout
-            )
+            # A 429 pauses the whole bucket; retries wait for it to reopen
+            # instead of following a blind backoff schedule
+            for attempt in range(self.rate_limit_retries + 1):
+                if task_bucket is not None:
+                    task_bucket.acquire(timeout=max_wait)
+                bucket.acquire(timeout=max_wait)
+                resp = self._send()
+                paused = bucket.update_from_response(resp.headers, resp.status_code)
+                if resp.status_code != 429:
+                    break
+            
+            if resp.status_code == 429:
+                # Raised so the DAG engine retries after the server's window
+                retry_after = backoff_from_headers(resp.headers, resp.status_code)
+                raise ExternalServiceRateLimitedError(
+                    f"Rate limited by {self.rate_limit_key} (HTTP 429)",
+                    details={
+                        "retry_after_seconds": retry_after if retry_after is not None else paused,
+                        "attempts": attempt + 1
+                    }
+                )
             
             # Extract response details
             response_data = {
@@ -73,6 +112,14 @@ class HTTPTask(PluginBase):
             
             return response_data
             
+        except CircuitOpenError as e:
+            return {
+                "status": "failed",
+                "error": str(e),
+                "error_type": "CircuitOpen",
+                "url": self.url,
+                "method": self.method
+            }
         except requests.exceptions.Timeout:
             return {
                 "status": "failed",
@@ -88,3 +135,33 @@ class HTTPTask(PluginBase):
                 "url": self.url,
                 "method": self.method
             }
+
+    def _send(self) -> requests.Response:
+        """One request through the host's circuit breaker and concurrency limit."""
+        # Both are shared by every workflow calling the same host
+        dependency = breaker_key_for_url(self.url)
+        breaker = get_circuit_breaker(dependency)
+        trial = breaker.before_call(self.name)
+        try:
+            with get_limiter(dependency).slot() as slot:
+                try:
+                    resp = requests.request(
+                        self.method,
+                        self.url,
+                        json=self.payload,
+                        headers=self.headers,
+                        timeout=self.timeout
+                    )
+                except requests.exceptions.RequestException:
+                    breaker.record_failure()
+                    raise
+                if resp.status_code == 429 or resp.status_code >= 500:
+                    slot.failed()
+        except BaseException:
+            breaker.release(trial)
+            raise
+        if resp.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return resp
@@ -1,5 +1,11 @@
 import click
+import json
+from pathlib import Path
 from .core.orchestrator import Orchestrator
+from .core.audit_store import SegmentedAuditStore
+from .config import get_settings
+
+settings = get_settings()
 
 @click.group()
 def cli():
@@ -15,5 +21,51 @@ def run(spec, dry_run, audit):
     click.echo("Run complete. Summary:")
     click.echo(out)
 
+def _open_store(path, recover=True):
+    # Read-only commands must not seal segments a running writer still owns
+    return SegmentedAuditStore(
+        Path(path).with_suffix(""),
+        compression=settings.audit_compression,
+        retention_days=settings.audit_retention_days,
+        recover=recover
+    )
+
+@cli.group("audit")
+def audit():
+    """Query and maintain the segmented audit store."""
+    pass
+
+@audit.command("query")
+@click.option("--path", default=settings.audit_log_path, help="Audit log path (segment dir is the path without suffix)")
+@click.option("--workflow-id", default=None, help="Only events for this workflow")
+@click.option("--node-id", default=None, help="Only events for this DAG node")
+@click.option("--task-id", default=None, help="Only events for this task")
+@click.option("--since", default=None, help="ISO timestamp lower bound")
+@click.option("--until", default=None, help="ISO timestamp upper bound")
+@click.option("--limit", default=100, show_default=True, help="Maximum events to print")
+def audit_query(path, workflow_id, node_id, task_id, since, until, limit):
+    store = _open_store(path, recover=False)
+    for entry in store.query(
+        workflow_id=workflow_id,
+        node_id=node_id,
+        task_id=task_id,
+        since=since,
+        until=until,
+        limit=limit
+    ):
+        click.echo(json.dumps(entry, ensure_ascii=False))
+
+@audit.command("prune")
+@click.option("--path", default=settings.audit_log_path, help="Audit log path (segment dir is the path without suffix)")
+@click.option("--days", default=settings.audit_retention_days, show_default=True, help="Retention in days")
+def audit_prune(path, days):
+    removed = _open_store(path).apply_retention(days)
+    click.echo(f"Removed {removed} segment(s) older than {days} day(s).")
+
+@audit.command("stats")
+@click.option("--path", default=settings.audit_log_path, help="Audit log path (segment dir is the path without suffix)")
+def audit_stats(path):
+    click.echo(json.dumps(_open_store(path, recover=False).stats(), indent=2))
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,109 @@
+"""
+Benchmark concurrent /api/llm/chat throughput against a local mock LLM.
+
+Starts an OpenAI-compatible mock server that answers every completion after
+a fixed delay, points the OpenAI provider at it and fires concurrent chat
+requests at the API in-process. With a non-blocking provider the wall time
+approaches ``requests / concurrency_limit * delay`` instead of
+``requests * delay``.
+
+    python benchmarks/llm_chat_throughput.py --requests 50 --delay 0.2
+
+``--record`` saves the run to a cassette; ``--replay`` serves a recorded
+run with no mock server or network, optionally at its recorded latencies:
+
+    python benchmarks/llm_chat_throughput.py --record storage/bench.jsonl
+    python benchmarks/llm_chat_throughput.py --replay storage/bench.jsonl --latency recorded
+"""
+import argparse
+import asyncio
+import os
+import socket
+import threading
+import time
+
+
+def start_mock_llm(delay: float) -> str:
+    """Run an OpenAI-compatible /chat/completions mock in a background thread."""
+    import uvicorn
+    from fastapi import FastAPI
+
+    mock = FastAPI()
+
+    @mock.post("/v1/chat/completions")
+    async def completions(body: dict):
+        await asyncio.sleep(delay)
+        return {
+            "model": body.get("model", "mock"),
+            "choices": [{"message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11},
+        }
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(mock, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/v1"
+
+
+async def run(requests: int, concurrency: int) -> None:
+    import httpx
+    from agentic_workflows.api.server import create_app
+
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                resp = await client.post("/api/llm/chat", json={"message": f"hello {i}", "provider": "openai"})
+                latencies.append(time.perf_counter() - start)
+                assert resp.json()["status"] == "success", resp.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"requests:    {requests} (client concurrency {concurrency})")
+    print(f"wall time:   {elapsed:.2f}s")
+    print(f"throughput:  {requests / elapsed:.1f} req/s")
+    print(f"p50 / p95:   {latencies[len(latencies) // 2]:.3f}s / {latencies[int(len(latencies) * 0.95) - 1]:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--delay", type=float, default=0.2, help="Mock completion latency in seconds")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", metavar="PATH", help="Record completions to a cassette")
+    cassette.add_argument("--replay", metavar="PATH", help="Serve completions from a cassette")
+    parser.add_argument("--latency", choices=["none", "recorded", "sampled"], default="recorded",
+                        help="Replayed latency (with --replay)")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure before importing the app
+    if args.replay:
+        os.environ["LLM_CASSETTE_MODE"] = "replay"
+        os.environ["LLM_CASSETTE_PATH"] = args.replay
+        os.environ["LLM_CASSETTE_LATENCY"] = args.latency
+    else:
+        os.environ["OPENAI_BASE_URL"] = start_mock_llm(args.delay)
+        if args.record:
+            os.environ["LLM_CASSETTE_MODE"] = "record"
+            os.environ["LLM_CASSETTE_PATH"] = args.record
+    os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    asyncio.run(run(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
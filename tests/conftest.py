@@ -0,0 +1,72 @@
+"""Shared fixtures."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class StubServer:
+    """
+    Local stand-in for a third-party HTTP API.
+
+    Queue responses with ``reply(status, headers, body)``; once the queue is
+    empty every request gets ``default``. Each request is logged with its
+    arrival time in ``requests``.
+    """
+
+    def __init__(self):
+        self.responses = []
+        self.default = (200, {}, {"ok": True})
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                with stub._lock:
+                    stub.requests.append({
+                        "method": self.command,
+                        "path": self.path,
+                        "body": body,
+                        "at": time.monotonic(),
+                    })
+                    status, headers, payload = stub.responses.pop(0) if stub.responses else stub.default
+                if callable(payload):
+                    payload = payload(body)
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, str(value))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def reply(self, status=200, headers=None, body=None):
+        self.responses.append((status, headers or {}, {"ok": status < 400} if body is None else body))
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    yield server
+    server.close()
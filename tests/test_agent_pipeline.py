@@ -0,0 +1,113 @@
+"""Agent pipeline fan-out tests."""
+import asyncio
+import time
+
+import pytest
+
+from agentic_workflows.agents import AgentPipeline, PipelineBranchError, SelfHealingAgent, ValidatorAgent
+from agentic_workflows.agents.fix_store import LearnedFixStore
+from agentic_workflows.agents.validator_agent import ValidationCache
+from agentic_workflows.core.audit import AuditLog
+from agentic_workflows.core.spec import parse_spec
+from agentic_workflows.llm.base import LLMResponse
+from agentic_workflows.llm.cache import MemoryCacheBackend
+from agentic_workflows.llm.dummy_provider import DummyProvider
+
+
+class SlowProvider(DummyProvider):
+    """Answers every call after ``delay`` seconds, tracking how many overlap."""
+    provider_name = "slow"
+
+    def __init__(self, delay=0.2, content="- Add retries to the fetch task"):
+        super().__init__()
+        self.delay = delay
+        self.content = content
+        self.active = 0
+        self.peak = 0
+
+    async def chat(self, messages, temperature=None, max_tokens=None, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return LLMResponse(content=self.content, model="m", tokens_used=5, finish_reason="stop", metadata={})
+
+    async def complete(self, prompt, system_prompt=None, temperature=None, max_tokens=None, **kwargs):
+        return await self.chat(self.format_messages(prompt, system_prompt), temperature, max_tokens)
+
+
+async def _value(value, delay=0.0):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def _fail():
+    raise RuntimeError("boom")
+
+
+def test_branches_run_concurrently_and_keep_partial_results():
+    pipeline = AgentPipeline("test", timeout=0)
+    pipeline.add("a", _value, 1, delay=0.2)
+    pipeline.add("b", _value, 2, delay=0.2)
+    pipeline.add("c", _fail, default="fallback")
+
+    started = time.perf_counter()
+    result = asyncio.run(pipeline.run())
+    assert time.perf_counter() - started < 0.35
+    assert (result["a"], result["b"], result["c"]) == (1, 2, "fallback")
+    assert result.failed == ["c"] and result.partial
+    assert result.branches["c"].error == "boom"
+
+
+def test_shared_timeout_and_required_branches():
+    pipeline = AgentPipeline("test", timeout=0.1)
+    pipeline.add("fast", _value, "ok")
+    pipeline.add("slow", _value, "late", delay=1, default=[])
+    result = asyncio.run(pipeline.run())
+    assert result["fast"] == "ok" and result["slow"] == []
+    assert result.branches["slow"].status == "timeout"
+
+    pipeline = AgentPipeline("test", timeout=0)
+    pipeline.add("slow", _value, "late", delay=1)
+    pipeline.add("broken", _fail, required=True)
+    started = time.perf_counter()
+    with pytest.raises(PipelineBranchError) as exc:
+        asyncio.run(pipeline.run())
+    assert exc.value.branch.name == "broken"
+    assert time.perf_counter() - started < 0.5  # the slow branch was cancelled
+
+
+def test_validation_review_and_suggestions_overlap(tmp_path):
+    llm = SlowProvider()
+    validator = ValidatorAgent(llm_provider=llm, audit=AuditLog(str(tmp_path / "audit.log")),
+                               validation_cache=ValidationCache(MemoryCacheBackend()))
+    spec = parse_spec({
+        "id": "wf",
+        "name": "Fetch",
+        "tasks": [{"id": "fetch", "type": "http_task", "params": {"url": "https://example.com"}}],
+    })
+
+    started = time.perf_counter()
+    is_valid, issues, _, suggestions = asyncio.run(validator.validate_and_suggest(spec))
+    assert time.perf_counter() - started < 0.35
+    assert llm.peak == 2
+    assert is_valid and validator.llm_reviewed
+    assert suggestions == ["Add retries to the fetch task"]
+
+
+def test_self_healing_analyses_failures_in_parallel(tmp_path):
+    llm = SlowProvider(content='{"recovery_strategy": "retry", "actions": ["Retry after 30s"], "confidence": "high"}')
+    agent = SelfHealingAgent(audit=AuditLog(str(tmp_path / "audit.log")), llm_provider=llm, fix_store=LearnedFixStore())
+    failures = [
+        {"task_id": f"t{i}", "error": f"Connection reset by peer {i}", "context": {"type": "http_task"}}
+        for i in range(3)
+    ]
+
+    started = time.perf_counter()
+    analyses = asyncio.run(agent.analyze_failures("wf", failures))
+    assert time.perf_counter() - started < 0.35
+    assert llm.peak == 3
+    assert analyses["t0"]["can_auto_fix"]
+    assert analyses["t0"]["fix_strategy"]["type"] == "retry_with_backoff"
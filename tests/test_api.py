@@ -29,3 +29,41 @@ def test_list_plugins():
     assert response.status_code == 200
     assert isinstance(response.json(), list)
     assert len(response.json()) >= 3  # At least 3 built-in plugins
+
+def test_llm_cache_covers_validation_results():
+    from agentic_workflows.agents.validator_agent import get_validation_cache
+
+    get_validation_cache().set("spec-key", {"issues": []})
+    stats = client.get("/api/llm/cache/stats").json()
+    assert stats["validations"]["entries"] >= 1
+
+    assert client.delete("/api/llm/cache").status_code == 200
+    assert get_validation_cache().get("spec-key") is None
+
+def test_execution_results_are_paged_from_the_result_store(tmp_path):
+    from types import SimpleNamespace
+    from agentic_workflows.api.routes.auth import get_current_user_from_token
+    from agentic_workflows.core.results import ResultSink
+    from agentic_workflows.db.database import get_db
+
+    sink = ResultSink(str(tmp_path / "run"), segment_records=2)
+    for i in range(5):
+        sink.write(f"task{i}", {"status": "completed", "result": {"n": i}})
+    execution = SimpleNamespace(result={"results_ref": sink.close()})
+
+    class FakeQuery:
+        def filter(self, *criteria):
+            return self
+
+        def first(self):
+            return execution
+
+    app.dependency_overrides[get_db] = lambda: SimpleNamespace(query=lambda model: FakeQuery())
+    app.dependency_overrides[get_current_user_from_token] = lambda: SimpleNamespace(id=1)
+    try:
+        response = client.get("/api/workflows/executions/1/results", params={"offset": 3, "limit": 5})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert [item["task_id"] for item in response.json()["items"]] == ["task3", "task4"]
@@ -0,0 +1,238 @@
+"""Audit log tests."""
+import asyncio
+import json
+import time
+from agentic_workflows.agents import ExecutorAgent
+from agentic_workflows.core.audit import AuditLog, AuditWriter, AuditFile
+from agentic_workflows.core.orchestrator import Orchestrator
+from agentic_workflows.llm.dummy_provider import DummyProvider
+from agentic_workflows.core.audit_store import SegmentedAuditStore
+
+
+def test_buffered_records_visible_after_flush(tmp_path):
+    path = tmp_path / "audit.log"
+    audit = AuditLog(str(path), buffered=True, flush_interval=10)
+    for i in range(250):
+        audit.record({"event": "tick", "i": i})
+    audit.flush()
+
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["i"] for line in lines] == list(range(250))
+
+
+def test_unbuffered_writes_synchronously(tmp_path):
+    path = tmp_path / "audit.log"
+    AuditLog(str(path), buffered=False).record({"event": "x"})
+    assert json.loads(path.read_text())["event"] == "x"
+
+
+def test_writer_falls_back_after_close(tmp_path):
+    path = tmp_path / "audit.log"
+    writer = AuditWriter(AuditFile(path), flush_interval=10)
+    writer.submit({"n": "a"})
+    writer.close()
+    writer.submit({"n": "b"})
+    assert [json.loads(line)["n"] for line in path.read_text().splitlines()] == ["a", "b"]
+
+
+def test_segmented_store_query_and_retention(tmp_path):
+    store = SegmentedAuditStore(tmp_path / "audit", max_segment_bytes=400)
+    for i in range(30):
+        store.write([{"workflow_id": f"wf{i % 3}", "node_id": f"n{i}", "i": i}])
+    store.close()
+
+    metas = sorted((tmp_path / "audit").glob("*.meta.json"))
+    assert len(metas) > 1
+    assert not list((tmp_path / "audit").glob("*.jsonl"))
+
+    assert [e["i"] for e in store.query(workflow_id="wf1")] == list(range(1, 30, 3))
+    assert [e["i"] for e in store.query(workflow_id="wf2", node_id="n5")] == [5]
+    assert list(store.query(workflow_id="missing")) == []
+
+    old = json.loads(metas[0].read_text())
+    old["last_epoch"] = time.time() - 10 * 86400
+    metas[0].write_text(json.dumps(old))
+    assert store.apply_retention(5) == 1
+    assert not (tmp_path / "audit" / old["file"]).exists()
+
+
+def test_segmented_store_recovers_orphans(tmp_path):
+    seg_dir = tmp_path / "audit"
+    seg_dir.mkdir()
+    # pid far above pid_max never belongs to a live process
+    raw = seg_dir / "seg-20260101T000000000000-99999999.jsonl"
+    raw.write_text(json.dumps({"workflow_id": "wf", "i": 1}) + "\n")
+
+    store = SegmentedAuditStore(seg_dir)
+    assert not raw.exists()
+    assert [e["i"] for e in store.query(workflow_id="wf")] == [1]
+
+
+def test_audit_cli_reads_without_sealing(tmp_path):
+    from click.testing import CliRunner
+    from agentic_workflows.runner import cli
+
+    seg_dir = tmp_path / "audit"
+    seg_dir.mkdir()
+    raw = seg_dir / "seg-20260101T000000000000-99999999.jsonl"
+    raw.write_text(json.dumps({"workflow_id": "wf", "i": 1}) + "\n")
+    path = str(tmp_path / "audit.log")
+
+    result = CliRunner().invoke(cli, ["audit", "query", "--path", path, "--workflow-id", "wf"])
+    assert result.exit_code == 0 and json.loads(result.output)["i"] == 1
+    assert CliRunner().invoke(cli, ["audit", "stats", "--path", path]).exit_code == 0
+    assert raw.exists()
+
+    CliRunner().invoke(cli, ["audit", "prune", "--path", path, "--days", "0"])
+    assert not raw.exists()
+
+
+def test_item_records_roll_up_per_task(tmp_path):
+    path = tmp_path / "audit.log"
+    audit = AuditLog(str(path), buffered=False, level="task")
+    with audit.rollup(task_id="t1"):
+        for i in range(100):
+            audit.record({"plugin": "file_organizer", "action": "moved", "i": i}, level="item")
+        audit.record({"plugin": "file_organizer", "action": "failed", "error": "boom"}, level="item")
+    audit.record({"event": "run_complete"}, level="summary")
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r.get("action") or r["event"] for r in records] == ["failed", "audit_rollup", "run_complete"]
+    assert records[1]["task_id"] == "t1"
+    assert records[1]["counts"] == {"moved": 100}
+
+
+def test_sampling_never_drops_failures(tmp_path):
+    path = tmp_path / "audit.log"
+    audit = AuditLog(str(path), buffered=False, level="item", sample_rates={"node_start": 0.0})
+    audit.record({"event": "node_start"})
+    audit.record({"event": "node_failed", "error": "x"})
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["event"] for r in records] == ["node_failed"]
+
+
+def test_db_audit_sink_batches_rows(tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from agentic_workflows.db.models import Base, AuditLog as AuditLogRow
+    from agentic_workflows.db.audit_sink import DBAuditSink
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(bind=engine)
+    sessions = sessionmaker(bind=engine)
+
+    sink = DBAuditSink(session_factory=sessions, batch_size=10, flush_interval=30)
+    for i in range(25):
+        sink.submit({"action": "update", "resource_type": "workflow", "resource_id": str(i)})
+    sink.close()
+
+    db = sessions()
+    assert db.query(AuditLogRow).count() == 25
+    db.close()
+    assert sink.batches_written == 3
+
+
+def test_db_audit_sink_spools_rejected_rows_and_replays(tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from agentic_workflows.db.models import Base, AuditLog as AuditLogRow
+    from agentic_workflows.db.audit_sink import DBAuditSink
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(bind=engine)
+    sessions = sessionmaker(bind=engine)
+    down = [True]
+
+    def refuse(*args):
+        raise ConnectionError("db down")
+
+    def flaky_sessions():
+        db = sessions()
+        if down[0]:
+            db.bulk_insert_mappings = refuse
+        return db
+
+    spool = tmp_path / "spool.jsonl"
+    sink = DBAuditSink(session_factory=flaky_sessions, batch_size=10, flush_interval=30,
+                       retries=1, retry_backoff=0, spool_path=str(spool))
+    sink.submit({"action": "update", "resource_type": "workflow", "resource_id": "lost?"})
+    # Missing resource_type: rejected by the database on its own
+    sink.submit({"action": "update", "resource_id": "bad"})
+    sink.flush()
+    assert sink.rows_spooled == 2 and len(spool.read_text().splitlines()) == 2
+
+    down[0] = False
+    sink.submit({"action": "update", "resource_type": "workflow", "resource_id": "next"})
+    sink.close()
+
+    db = sessions()
+    assert sorted(r.resource_id for r in db.query(AuditLogRow)) == ["lost?", "next"]
+    db.close()
+    # The bad row is kept for the next startup instead of being dropped
+    assert json.loads(spool.read_text())["resource_id"] == "bad"
+
+
+def test_db_audit_sink_submit_never_waits_for_the_database(tmp_path):
+    import threading
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from agentic_workflows.db.models import Base, AuditLog as AuditLogRow
+    from agentic_workflows.db.audit_sink import DBAuditSink
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(bind=engine)
+    sessions = sessionmaker(bind=engine)
+    stalled = threading.Event()
+
+    def slow_sessions():
+        stalled.wait(5)
+        return sessions()
+
+    spool = tmp_path / "spool.jsonl"
+    sink = DBAuditSink(session_factory=slow_sessions, batch_size=1, flush_interval=0.01,
+                       max_queue=1, spool_path=str(spool))
+    started = time.monotonic()
+    for i in range(5):
+        sink.submit({"action": "update", "resource_type": "workflow", "resource_id": str(i)})
+    assert time.monotonic() - started < 0.1
+    assert sink.rows_spooled >= 3
+
+    stalled.set()
+    sink.submit({"action": "update", "resource_type": "workflow", "resource_id": "5"})
+    sink.close()
+    db = sessions()
+    assert sorted(int(r.resource_id) for r in db.query(AuditLogRow)) == list(range(6))
+    db.close()
+
+
+def test_query_by_workflow_returns_task_and_node_records(tmp_path):
+    downloads = tmp_path / "downloads"
+    downloads.mkdir()
+    spec_path = tmp_path / "spec.yaml"
+    spec_path.write_text(f"""
+id: organize
+name: organize
+tasks:
+  - id: task1
+    type: file_organizer
+    params:
+      target: {downloads}
+""")
+    audit = AuditLog(str(tmp_path / "audit.log"), buffered=False, segmented=True, level="task")
+    orch = Orchestrator(audit_path=str(tmp_path / "unused.log"))
+    orch.audit = orch.planner.audit = orch.executor.audit = audit
+    runs = [orch.run_spec(str(spec_path), dry_run=True)["workflow_id"] for _ in range(2)]
+    dag = asyncio.run(ExecutorAgent(audit=audit, llm_provider=DummyProvider()).execute_workflow([
+        {"id": "node1", "type": "file_organizer", "params": {"target": str(downloads)}}
+    ]))
+    audit.target.close()
+
+    records = list(audit.target.query(workflow_id=runs[0]))
+    assert {r.get("task_id") for r in records} >= {"task1"}
+    assert {r["workflow_id"] for r in records} == {runs[0]}
+    assert {r["ts"] for r in records}.isdisjoint(r["ts"] for r in audit.target.query(workflow_id=runs[1]))
+
+    records = list(audit.target.query(workflow_id=dag["workflow_id"]))
+    assert {r.get("node_id") for r in records} >= {"node1"}
+    assert {"dag_start", "dag_complete"} <= {r.get("event") for r in records}
+    assert list(audit.target.query(workflow_id=dag["workflow_id"], node_id="node1"))
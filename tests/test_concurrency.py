@@ -0,0 +1,125 @@
+"""Adaptive concurrency limiter tests."""
+import asyncio
+import threading
+import time
+import pytest
+from agentic_workflows.core.concurrency import AdaptiveLimiter, get_limiter, reset_limiters
+from agentic_workflows.core.exceptions import ExternalServiceError, ExternalServiceTimeoutError
+
+
+def test_limit_grows_while_latency_is_stable():
+    limiter = AdaptiveLimiter("svc", initial_limit=2, max_limit=10)
+    limiter.acquire()
+    limiter.acquire()
+    for _ in range(20):
+        limiter.record(0.01)
+    assert limiter.limit > 2
+
+
+def test_limit_shrinks_on_errors_and_latency():
+    limiter = AdaptiveLimiter("svc", initial_limit=16, cooldown=0)
+    with limiter.slot() as slot:
+        slot.failed()
+    assert limiter.limit == 8
+
+    for latency in (0.01, 0.01, 0.2, 0.2, 0.2, 0.2):
+        limiter.record(latency)
+    assert limiter.limit < 8
+    assert limiter.errors == 1
+
+
+def test_only_overload_shrinks_the_limit():
+    now = [0.0]
+    limiter = AdaptiveLimiter("svc", initial_limit=16, cooldown=0, clock=lambda: now[0])
+
+    def call(latency, error=None):
+        with limiter.slot():
+            now[0] += latency
+            if error is not None:
+                raise error
+
+    async def cancelled():
+        async with limiter.slot_async():
+            now[0] += 5.0
+            raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(cancelled())
+    for error in (ValueError("bad input"), ExternalServiceError("HTTP 404", details={"status_code": 404})):
+        with pytest.raises(type(error)):
+            call(5.0, error)
+    # Neither slow client errors nor abandoned calls are samples
+    assert (limiter.limit, limiter.calls, limiter.errors) == (16, 0, 0)
+
+    with pytest.raises(ExternalServiceError):
+        call(0.1, ExternalServiceError("HTTP 503", details={"status_code": 503}))
+    assert (limiter.limit, limiter.errors) == (8, 1)
+    with pytest.raises(ExternalServiceTimeoutError):
+        call(0.1, ExternalServiceTimeoutError("slow"))
+    assert limiter.limit == 4 and limiter._in_flight == 0
+
+
+def test_jitter_on_fast_calls_is_not_congestion():
+    now = [0.0]
+    limiter = AdaptiveLimiter("svc", initial_limit=16, cooldown=0, clock=lambda: now[0])
+    # Microsecond calls whose latency triples: relative, not absolute, noise
+    for latency in (1e-6, 1e-6, 3e-6, 3e-6, 3e-6, 3e-6, 3e-6, 3e-6):
+        limiter.record(latency)
+    assert limiter.limit == 16
+
+    # A real slowdown past the warm-up does shrink it
+    for latency in (0.05, 0.05, 0.05):
+        limiter.record(latency)
+    assert limiter.limit < 16
+
+
+def test_threads_and_tasks_share_the_limit():
+    limiter = AdaptiveLimiter("svc", initial_limit=2, max_limit=2)
+    peak = []
+    lock = threading.Lock()
+    active = [0]
+
+    def enter():
+        with lock:
+            active[0] += 1
+            peak.append(active[0])
+
+    def leave():
+        with lock:
+            active[0] -= 1
+
+    def sync_call():
+        with limiter.slot():
+            enter()
+            time.sleep(0.02)
+            leave()
+
+    async def async_call():
+        async with limiter.slot_async():
+            enter()
+            await asyncio.sleep(0.02)
+            leave()
+
+    async def run_tasks():
+        await asyncio.gather(*(async_call() for _ in range(5)))
+
+    threads = [threading.Thread(target=sync_call) for _ in range(5)]
+    for t in threads:
+        t.start()
+    asyncio.run(run_tasks())
+    for t in threads:
+        t.join()
+
+    assert max(peak) <= 2
+    assert limiter.in_flight == 0
+
+
+def test_acquire_times_out_and_registry_is_shared():
+    reset_limiters()
+    limiter = get_limiter("http://api.example.com:443", initial_limit=1)
+    assert get_limiter("http://api.example.com:443") is limiter
+    limiter.acquire()
+    with pytest.raises(ExternalServiceTimeoutError):
+        limiter.acquire(timeout=0.01)
+    limiter._release()
+    assert limiter.in_flight == 0
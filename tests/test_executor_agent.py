@@ -0,0 +1,60 @@
+"""Executor agent tests."""
+import asyncio
+import json
+import time
+
+from agentic_workflows.agents import ExecutorAgent
+from agentic_workflows.core.agents import PLUGIN_REGISTRY
+from agentic_workflows.core.audit import AuditLog
+from agentic_workflows.llm.dummy_provider import DummyProvider
+from agentic_workflows.plugins.base import PluginBase
+
+
+class SleepPlugin(PluginBase):
+    """Blocks its thread for ``seconds``, like a slow synchronous plugin."""
+    name = "sleep"
+
+    def plan(self):
+        return [{"action": "sleep"}]
+
+    def execute(self):
+        time.sleep(self.params["seconds"])
+        return {"status": "completed"}
+
+
+def test_executor_runs_workflow_with_auditing(tmp_path):
+    downloads = tmp_path / "downloads"
+    downloads.mkdir()
+    (downloads / "Report Final.TXT").write_text("content")
+    path = tmp_path / "audit.log"
+    executor = ExecutorAgent(audit=AuditLog(str(path), buffered=False, level="task"), llm_provider=DummyProvider())
+
+    result = asyncio.run(executor.execute_workflow([
+        {"id": "organize", "type": "file_organizer", "params": {"target": str(downloads)}}
+    ]))
+
+    assert result["success"], result["node_details"]
+    assert result["node_details"]["organize"]["status"] == "success"
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    actions = {r["action"]: r for r in records if r.get("agent") == "ExecutorAgent"}
+    assert list(actions) == ["execute_workflow", "execute_node", "node_plan", "node_complete"]
+    assert actions["execute_workflow"]["task_count"] == 1
+    assert actions["node_plan"]["node_id"] == "organize" and actions["node_plan"]["planned_actions"] >= 1
+    assert [r["event"] for r in records if "event" in r][-1] == "dag_complete"
+
+
+def test_dag_nodes_run_in_parallel_and_time_out(tmp_path, monkeypatch):
+    monkeypatch.setitem(PLUGIN_REGISTRY, "sleep", f"{__name__}.SleepPlugin")
+    executor = ExecutorAgent(audit=AuditLog(str(tmp_path / "audit.log")), llm_provider=DummyProvider())
+
+    started = time.perf_counter()
+    result = asyncio.run(executor.execute_workflow([
+        {"id": "a", "type": "sleep", "params": {"seconds": 0.3}},
+        {"id": "b", "type": "sleep", "params": {"seconds": 0.3}},
+        {"id": "stuck", "type": "sleep", "params": {"seconds": 2, "timeout_seconds": 0.1}, "max_retries": 0},
+    ]))
+
+    assert time.perf_counter() - started < 0.6
+    assert sorted(result["successful_nodes"]) == ["a", "b"]
+    assert result["failed_nodes"] == ["stuck"]
+    assert "timed out after 0.1s" in result["node_details"]["stuck"]["error"]
@@ -0,0 +1,96 @@
+"""Learned fix store and self-healing reuse tests."""
+import asyncio
+
+from agentic_workflows.agents import SelfHealingAgent
+from agentic_workflows.agents.fix_store import LearnedFixStore, normalize_error
+from agentic_workflows.core.audit import AuditLog
+from agentic_workflows.llm.base import LLMResponse
+from agentic_workflows.llm.dummy_provider import DummyProvider
+
+RETRY = {"type": "retry_with_backoff", "actions": ["Retry after 30s"], "modified_params": {}}
+
+
+class CountingProvider(DummyProvider):
+    provider_name = "counting"
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def chat(self, messages, temperature=None, max_tokens=None, **kwargs):
+        self.calls += 1
+        content = '{"recovery_strategy": "retry", "actions": ["Retry after 30s"], "confidence": "high"}'
+        return LLMResponse(content=content, model="m", tokens_used=5, finish_reason="stop", metadata={})
+
+    async def complete(self, prompt, system_prompt=None, temperature=None, max_tokens=None, **kwargs):
+        return await self.chat(self.format_messages(prompt, system_prompt), temperature, max_tokens)
+
+
+def test_normalization_masks_volatile_parts():
+    a = normalize_error("Timeout after 30s reading /data/run-41/in.csv for job 3f2a1b9c-1d2e-4f00-8a9b-0c1d2e3f4a5b at 2024-05-01T10:22:03Z")
+    b = normalize_error("timeout after 45s reading /data/run-97/other.csv for job 0c1d2e3f-4a5b-4f00-8a9b-3f2a1b9c1d2e at 2024-06-11T08:00:00Z")
+    assert a == b == "timeout after <n>s reading <path> for job <uuid> at <ts>"
+
+
+def test_exact_and_fuzzy_matches_persist(tmp_path):
+    path = str(tmp_path / "fixes.db")
+    store = LearnedFixStore(path)
+    store.record("Connection refused by db-primary:5432 while running nightly export", RETRY, True, "sql_query")
+    store.record("Connection refused by db-primary:5432 while running nightly export", RETRY, False, "sql_query")
+
+    # Reloaded from disk
+    store = LearnedFixStore(path)
+    exact = store.match("Connection refused by db-primary:6543 while running nightly export", "sql_query")
+    assert exact.similarity == 1.0 and exact.fix.attempts == 2 and exact.fix.success_rate == 0.5
+
+    fuzzy = store.match("Connection refused by db-replica:5432 while running nightly export", "sql_query")
+    assert 0.6 <= fuzzy.similarity < 1.0 and fuzzy.fix.strategy == RETRY
+
+    assert store.match("Connection refused by db-primary:5432 while running nightly export", "http_task") is None
+    assert store.match("Permission denied writing report", "sql_query") is None
+    assert store.stats() == {"entries": 1, "lookups": 4, "exact_hits": 1, "fuzzy_hits": 1}
+
+
+def test_oldest_entries_are_evicted(tmp_path):
+    store = LearnedFixStore(str(tmp_path / "fixes.db"), max_entries=2)
+    for word in ("alpha", "bravo", "charlie"):
+        store.record(f"{word} service unavailable", RETRY, True)
+    assert len(store) == 2
+    assert store.match("alpha service unavailable") is None
+    assert len(LearnedFixStore(str(tmp_path / "fixes.db"))) == 2
+
+
+def test_workers_sharing_a_file_add_up_attempts(tmp_path):
+    path = str(tmp_path / "fixes.db")
+    first, second = LearnedFixStore(path), LearnedFixStore(path)
+    first.record("disk full writing export", RETRY, True)
+    second.record("disk full writing export", RETRY, False)
+    fix = first.record("disk full writing export", RETRY, True)
+    assert (fix.attempts, fix.successes) == (3, 2)
+
+    fix = LearnedFixStore(path).match("disk full writing export").fix
+    assert (fix.attempts, fix.successes) == (3, 2)
+
+    fix = second.record("disk full writing export", {"type": "skip_task"}, True)
+    assert (fix.attempts, fix.successes) == (1, 1)
+
+
+def test_learned_fixes_skip_the_llm(tmp_path):
+    llm = CountingProvider()
+    store = LearnedFixStore(str(tmp_path / "fixes.db"))
+    agent = SelfHealingAgent(audit=AuditLog(str(tmp_path / "audit.log")), llm_provider=llm,
+                             auto_fix_enabled=True, fix_store=store)
+    context = {"type": "http_task"}
+
+    first = asyncio.run(agent.analyze_failure("wf", "fetch", "HTTP 503 from https://api.example.com/v1/items?page=4", context))
+    assert first["source"] == "generated" and llm.calls == 1
+    result = asyncio.run(agent.attempt_fix("wf", "fetch", first["fix_strategy"]))
+    assert result["success"]
+
+    # Same failure on another page, after a restart
+    agent = SelfHealingAgent(audit=AuditLog(str(tmp_path / "audit.log")), llm_provider=llm,
+                             fix_store=LearnedFixStore(str(tmp_path / "fixes.db")))
+    again = asyncio.run(agent.analyze_failure("wf2", "fetch", "HTTP 503 from https://api.example.com/v1/items?page=9", context))
+    assert again["source"] == "learned" and again["can_auto_fix"]
+    assert again["fix_strategy"] == first["fix_strategy"]
+    assert llm.calls == 1
@@ -0,0 +1,85 @@
+"""Per-provider admission control tests."""
+import asyncio
+import pytest
+from agentic_workflows.core.exceptions import ExternalServiceTimeoutError
+from agentic_workflows.llm.admission import GatedProvider, Priority, ProviderGate, request_priority
+from agentic_workflows.llm.base import LLMResponse
+from agentic_workflows.llm.dummy_provider import DummyProvider
+
+
+def test_waiters_are_admitted_by_priority():
+    gate = ProviderGate("p", max_concurrency=1)
+    order = []
+
+    async def call(name, priority):
+        async with gate.admit(10, priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        holder = asyncio.ensure_future(call("first", Priority.NORMAL))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.ensure_future(call("background", Priority.BACKGROUND)),
+            asyncio.ensure_future(call("normal", Priority.NORMAL)),
+            asyncio.ensure_future(call("interactive", Priority.INTERACTIVE)),
+        ]
+        await asyncio.gather(holder, *waiters)
+
+    asyncio.run(run())
+    assert order == ["first", "interactive", "normal", "background"]
+    assert gate.snapshot()["in_flight"] == 0
+
+
+def test_requests_per_minute_budget_times_out_queued_caller():
+    gate = ProviderGate("p", requests_per_minute=2)
+
+    async def run():
+        for _ in range(2):
+            async with gate.admit(1):
+                pass
+        with pytest.raises(ExternalServiceTimeoutError):
+            await gate.acquire(1, timeout=0.05)
+
+    asyncio.run(run())
+    snapshot = gate.snapshot()
+    assert (snapshot["requests_last_minute"], snapshot["timeouts"], snapshot["queued"]) == (2, 1, 0)
+
+
+def test_token_budget_is_settled_to_actual_usage():
+    gate = ProviderGate("p", tokens_per_minute=1000)
+
+    async def run():
+        async with gate.admit(900) as usage:
+            usage.tokens_used = 100
+        # Would not fit against the 900-token reservation
+        await gate.acquire(800, timeout=0.05)
+
+    asyncio.run(run())
+    assert gate.snapshot()["tokens_last_minute"] == 900
+
+
+class SlowProvider(DummyProvider):
+    def __init__(self):
+        super().__init__()
+        self.active = self.peak = 0
+
+    async def chat(self, messages, temperature=None, max_tokens=None, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        return LLMResponse(content="ok", model="m", tokens_used=5, finish_reason="stop", metadata={})
+
+
+def test_gated_provider_bounds_concurrency():
+    inner = SlowProvider()
+    llm = GatedProvider(inner, ProviderGate("slow", max_concurrency=2))
+
+    async def run():
+        with request_priority(Priority.INTERACTIVE):
+            await asyncio.gather(*(llm.complete(f"q{i}") for i in range(6)))
+
+    asyncio.run(run())
+    assert inner.peak == 2
+    assert llm.gate.snapshot()["admitted"] == 6
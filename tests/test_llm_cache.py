@@ -0,0 +1,98 @@
+"""LLM completion cache tests."""
+import asyncio
+import threading
+from agentic_workflows.llm.base import LLMResponse
+from agentic_workflows.llm.cache import (
+    CachedProvider,
+    CompletionCache,
+    MemoryCacheBackend,
+    SQLiteCacheBackend,
+)
+from agentic_workflows.llm.dummy_provider import DummyProvider
+
+
+class CountingProvider(DummyProvider):
+    provider_name = "counting"
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def chat(self, messages, temperature=None, max_tokens=None, **kwargs):
+        self.calls += 1
+        return LLMResponse(
+            content=f"answer {self.calls}",
+            model="m",
+            tokens_used=100,
+            finish_reason="stop",
+            metadata={}
+        )
+
+
+def test_deterministic_requests_hit_cache():
+    inner = CountingProvider()
+    cache = CompletionCache(MemoryCacheBackend())
+    llm = CachedProvider(inner, cache)
+
+    async def run():
+        first = await llm.complete("plan this", system_prompt="sys", temperature=0.0)
+        second = await llm.complete("plan this", system_prompt="sys", temperature=0.0)
+        other = await llm.complete("plan that", system_prompt="sys", temperature=0.0)
+        return first, second, other
+
+    first, second, other = asyncio.run(run())
+    assert first.content == second.content == "answer 1"
+    assert second.metadata["cache"] == "hit"
+    assert other.content == "answer 2"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["tokens_saved"]) == (1, 2, 100)
+
+
+def test_sampled_requests_bypass_cache():
+    inner = CountingProvider()
+    cache = CompletionCache(MemoryCacheBackend(), max_temperature=0.0)
+    llm = CachedProvider(inner, cache)
+    for _ in range(2):
+        asyncio.run(llm.complete("brainstorm", temperature=0.7))
+    assert inner.calls == 2
+    assert cache.stats()["bypassed"] == 2
+
+
+def test_sqlite_backend_persists_and_expires(tmp_path):
+    path = tmp_path / "llm_cache.db"
+    SQLiteCacheBackend(str(path)).set("k", {"content": "x"}, ttl=60)
+    SQLiteCacheBackend(str(path)).set("old", {"content": "y"}, ttl=-1)
+    backend = SQLiteCacheBackend(str(path))
+    assert backend.get("k") == {"content": "x"}
+    assert backend.get("old") is None
+
+
+def test_blocking_backends_run_off_the_event_loop(tmp_path):
+    class RecordingBackend(SQLiteCacheBackend):
+        def get(self, key):
+            threads.append(threading.current_thread())
+            return super().get(key)
+
+        def set(self, key, value, ttl):
+            threads.append(threading.current_thread())
+            super().set(key, value, ttl)
+
+    threads = []
+    llm = CachedProvider(CountingProvider(), CompletionCache(RecordingBackend(str(tmp_path / "llm_cache.db"))))
+
+    async def run():
+        await llm.complete("plan this", temperature=0.0)
+        return await llm.complete("plan this", temperature=0.0)
+
+    assert asyncio.run(run()).metadata["cache"] == "hit"
+    assert len(threads) == 3 and threading.main_thread() not in threads
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set("a", {"v": 1}, ttl=0)
+    backend.set("b", {"v": 2}, ttl=0)
+    backend.get("a")
+    backend.set("c", {"v": 3}, ttl=0)
+    assert backend.get("b") is None
+    assert backend.get("a") == {"v": 1}
@@ -0,0 +1,88 @@
+"""Record/replay provider tests."""
+import asyncio
+import time
+import pytest
+from agentic_workflows.core.exceptions import StorageNotFoundError
+from agentic_workflows.llm.base import LLMResponse, collect_stream
+from agentic_workflows.llm.cassette import Cassette, RecordingProvider, ReplayProvider
+from agentic_workflows.llm.dummy_provider import DummyProvider
+
+
+class CountingProvider(DummyProvider):
+    provider_name = "counting"
+
+    def __init__(self, delay=0.0):
+        super().__init__(stream_delay=0)
+        self.delay = delay
+        self.calls = 0
+
+    async def chat(self, messages, temperature=None, max_tokens=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return LLMResponse(content=f"answer {self.calls}", model="m", tokens_used=7, finish_reason="stop", metadata={"id": self.calls})
+
+
+def test_replay_returns_recorded_responses_in_order(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    recorder = RecordingProvider(CountingProvider(), Cassette(path))
+
+    async def record():
+        return [await recorder.complete("plan", temperature=0.7) for _ in range(2)]
+
+    recorded = asyncio.run(record())
+
+    # A fresh cassette reads the file, as a later process would
+    replay = ReplayProvider(Cassette(path), provider_name="openai")
+
+    async def run():
+        return [await replay.complete("plan", temperature=0.7) for _ in range(3)]
+
+    replayed = asyncio.run(run())
+    assert [r.content for r in replayed] == ["answer 1", "answer 2", "answer 1"]
+    assert replayed[0].tokens_used == recorded[0].tokens_used
+    assert replayed[0].metadata == {"id": 1, "replayed": True}
+    assert replay.snapshot()["hits"] == 3
+
+
+def test_replay_miss_raises_or_falls_back(tmp_path):
+    replay = ReplayProvider(Cassette(str(tmp_path / "empty.jsonl")))
+    with pytest.raises(StorageNotFoundError):
+        asyncio.run(replay.complete("never recorded"))
+
+    fallback = CountingProvider()
+    replay = ReplayProvider(Cassette(str(tmp_path / "empty.jsonl")), fallback=fallback)
+    assert asyncio.run(replay.complete("never recorded")).content == "answer 1"
+    assert replay.misses == 1
+
+
+def test_replay_reproduces_recorded_latency(tmp_path):
+    cassette = Cassette(str(tmp_path / "cassette.jsonl"))
+    asyncio.run(RecordingProvider(CountingProvider(delay=0.1), cassette).complete("slow"))
+
+    def timed(latency):
+        replay = ReplayProvider(cassette, latency=latency)
+        start = time.perf_counter()
+        asyncio.run(replay.complete("slow"))
+        return time.perf_counter() - start
+
+    assert timed("none") < 0.05
+    assert timed("recorded") >= 0.09
+    assert timed("sampled") >= 0.09
+
+
+def test_stream_round_trip(tmp_path):
+    cassette = Cassette(str(tmp_path / "cassette.jsonl"))
+    recorder = RecordingProvider(DummyProvider(stream_delay=0), cassette)
+
+    async def chunks(llm):
+        return [chunk.content async for chunk in llm.stream_complete("hello there")]
+
+    recorded = asyncio.run(chunks(recorder))
+    replay = ReplayProvider(cassette)
+    assert asyncio.run(chunks(replay)) == recorded
+    assert len(recorded) > 1
+
+    # A streamed recording also answers a plain chat call
+    replay.cassette.rewind()
+    response = asyncio.run(replay.complete("hello there"))
+    assert response.content == asyncio.run(collect_stream(replay.stream_complete("hello there"))).content
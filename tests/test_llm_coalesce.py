@@ -0,0 +1,79 @@
+"""Single-flight coalescing tests."""
+import asyncio
+import pytest
+from agentic_workflows.core.exceptions import ExternalServiceTimeoutError
+from agentic_workflows.llm.base import LLMResponse
+from agentic_workflows.llm.coalesce import CoalescingProvider, SingleFlight
+from agentic_workflows.llm.dummy_provider import DummyProvider
+
+
+class SlowProvider(DummyProvider):
+    provider_name = "slow"
+
+    def __init__(self, delay=0.05, error=None):
+        super().__init__()
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def chat(self, messages, temperature=None, max_tokens=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return LLMResponse(content=f"answer {self.calls}", model="m", tokens_used=10, finish_reason="stop", metadata={})
+
+
+def test_identical_concurrent_requests_share_one_call():
+    inner = SlowProvider()
+    flight = SingleFlight()
+    llm = CoalescingProvider(inner, flight)
+
+    async def run():
+        same = [llm.complete("plan", temperature=0.0) for _ in range(5)]
+        return await asyncio.gather(*same, llm.complete("other", temperature=0.0))
+
+    responses = asyncio.run(run())
+    assert inner.calls == 2
+    assert {r.content for r in responses[:5]} == {responses[0].content}
+    assert flight.stats() == {"leaders": 2, "coalesced": 4, "timeouts": 0, "in_flight": 0}
+
+
+def test_errors_reach_every_waiter():
+    inner = SlowProvider(error=RuntimeError("boom"))
+    llm = CoalescingProvider(inner, SingleFlight())
+
+    async def run():
+        return await asyncio.gather(*(llm.complete("x", temperature=0.0) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert inner.calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_waiters_give_up_after_timeout_without_cancelling_the_call():
+    inner = SlowProvider(delay=0.3)
+    flight = SingleFlight()
+    llm = CoalescingProvider(inner, flight, timeout=0.05)
+
+    async def run():
+        with pytest.raises(ExternalServiceTimeoutError):
+            await llm.complete("x", temperature=0.0)
+        # The shared call keeps running for anyone who arrives later
+        assert flight.stats()["in_flight"] == 1
+        await asyncio.sleep(0.35)
+        return flight.stats()
+
+    stats = asyncio.run(run())
+    assert stats["timeouts"] == 1 and stats["in_flight"] == 0
+
+
+def test_sampled_requests_are_not_coalesced():
+    inner = SlowProvider()
+    llm = CoalescingProvider(inner, SingleFlight())
+
+    async def run():
+        await asyncio.gather(*(llm.complete("x", temperature=0.7) for _ in range(3)))
+
+    asyncio.run(run())
+    assert inner.calls == 3
@@ -0,0 +1,40 @@
+"""Provider pooling and warm-up tests."""
+import asyncio
+import pytest
+from agentic_workflows.llm import factory
+from agentic_workflows.llm.dummy_provider import DummyProvider
+from agentic_workflows.llm.http import close_http_clients
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool():
+    factory.reset_llm_providers()
+    yield
+    factory.reset_llm_providers()
+
+
+def test_providers_are_pooled_per_configuration():
+    first = factory.get_llm_provider("openai", api_key="k1")
+    assert factory.get_llm_provider("openai", api_key="k1") is first
+    assert factory.get_llm_provider("openai", api_key="k2") is not first
+    assert factory.get_llm_provider("openai", api_key="k1", model="gpt-3.5-turbo") is not first
+    assert factory.get_llm_provider("openai", api_key="k1", cache=False) is not first
+    assert factory.get_llm_provider("dummy") is factory.get_llm_provider("dummy")
+
+
+def test_missing_key_falls_back_to_dummy(monkeypatch):
+    monkeypatch.setattr(factory.settings, "anthropic_api_key", None)
+    assert isinstance(factory.get_llm_provider("claude"), DummyProvider)
+
+
+def test_warmup_opens_connection_to_backend(stub_server, monkeypatch):
+    monkeypatch.setattr(factory.settings, "openai_base_url", stub_server.url)
+    monkeypatch.setattr(factory.settings, "openai_api_key", "k")
+
+    async def run():
+        warmed = await factory.warm_llm_providers(["openai"])
+        await close_http_clients()
+        return warmed
+
+    assert asyncio.run(run()) == [stub_server.url]
+    assert stub_server.requests[0]["method"] == "GET"
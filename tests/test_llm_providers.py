@@ -0,0 +1,62 @@
+"""LLM provider tests against a local stand-in server."""
+import asyncio
+import json
+import time
+import pytest
+from agentic_workflows.core.exceptions import ExternalServiceRateLimitedError
+from agentic_workflows.llm.claude_provider import ClaudeProvider
+from agentic_workflows.llm.http import close_http_clients
+from agentic_workflows.llm.openai_provider import OpenAIProvider
+
+
+def openai_reply(delay=0.0):
+    def reply(body):
+        time.sleep(delay)
+        return {
+            "model": "gpt-test",
+            "choices": [{"message": {"content": "hi"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 3, "completion_tokens": 1, "total_tokens": 4},
+        }
+    return reply
+
+
+def test_openai_chat_does_not_block_the_loop(stub_server):
+    stub_server.default = (200, {}, openai_reply(delay=0.3))
+    llm = OpenAIProvider(api_key="k", base_url=stub_server.url)
+
+    async def run():
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(llm.complete(f"q{i}") for i in range(8)))
+        elapsed = time.perf_counter() - start
+        await close_http_clients()
+        return responses, elapsed
+
+    responses, elapsed = asyncio.run(run())
+    assert [r.content for r in responses] == ["hi"] * 8
+    assert responses[0].tokens_used == 4
+    # Serial round trips would take 8 x 0.3s
+    assert elapsed < 1.5
+
+
+def test_claude_maps_system_prompt_and_rate_limits(stub_server):
+    stub_server.reply(200, body={
+        "model": "claude-test",
+        "content": [{"type": "text", "text": "hello"}],
+        "stop_reason": "end_turn",
+        "usage": {"input_tokens": 5, "output_tokens": 2},
+    })
+    stub_server.reply(429, {"Retry-After": "7"})
+    llm = ClaudeProvider(api_key="k", base_url=stub_server.url)
+
+    async def run():
+        first = await llm.complete("hi", system_prompt="be brief")
+        with pytest.raises(ExternalServiceRateLimitedError) as err:
+            await llm.complete("again")
+        await close_http_clients()
+        return first, err.value
+
+    first, error = asyncio.run(run())
+    assert (first.content, first.tokens_used) == ("hello", 7)
+    assert json.loads(stub_server.requests[0]["body"])["system"] == "be brief"
+    assert stub_server.requests[0]["path"] == "/v1/messages"
+    assert error.retry_after == 7.0
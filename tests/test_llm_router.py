@@ -0,0 +1,86 @@
+"""Latency-aware routing tests."""
+import asyncio
+import pytest
+from agentic_workflows.llm.base import LLMResponse
+from agentic_workflows.llm.dummy_provider import DummyProvider
+from agentic_workflows.llm.router import RoutingProvider, hedging, reset_provider_health
+
+
+class FakeBackend(DummyProvider):
+    def __init__(self, name, delay=0.0, fail=False):
+        super().__init__(model=name)
+        self.provider_name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def chat(self, messages, temperature=None, max_tokens=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.provider_name} down")
+        return LLMResponse(content=self.provider_name, model=self.model, tokens_used=1, finish_reason="stop", metadata={})
+
+
+@pytest.fixture(autouse=True)
+def fresh_health():
+    reset_provider_health()
+    yield
+    reset_provider_health()
+
+
+def test_routes_to_fastest_after_measuring():
+    slow, fast = FakeBackend("slow", delay=0.05), FakeBackend("fast", delay=0.0)
+    router = RoutingProvider([slow, fast])
+
+    async def run():
+        return [(await router.complete("q")).content for _ in range(6)]
+
+    answers = asyncio.run(run())
+    # The unmeasured backend is probed once, then the fast one wins
+    assert answers[:2] == ["slow", "fast"]
+    assert set(answers[2:]) == {"fast"}
+
+
+def test_fails_over_and_demotes_erroring_backend():
+    broken, backup = FakeBackend("broken", fail=True), FakeBackend("backup", delay=0.01)
+    router = RoutingProvider([broken, backup])
+
+    async def run():
+        return [await router.complete("q") for _ in range(4)]
+
+    responses = asyncio.run(run())
+    assert [r.content for r in responses] == ["backup"] * 4
+    assert responses[0].metadata["routed_to"] == "backup"
+    # One failure is a blip; the second pushes the error EWMA over the threshold
+    assert broken.calls == 2
+    assert router.ranked()[0] is backup
+
+
+def test_all_backends_failing_raises_last_error():
+    router = RoutingProvider([FakeBackend("a", fail=True), FakeBackend("b", fail=True)])
+    with pytest.raises(RuntimeError, match="b down"):
+        asyncio.run(router.complete("q"))
+
+
+def test_hedged_request_takes_first_answer():
+    stalled, backup = FakeBackend("stalled", delay=1.0), FakeBackend("backup", delay=0.01)
+    router = RoutingProvider([stalled, backup])
+
+    async def run():
+        with hedging(0.05):
+            return await router.complete("q")
+
+    response = asyncio.run(run())
+    assert response.content == "backup"
+    assert (stalled.calls, backup.calls) == (1, 1)
+
+
+def test_stream_fails_over_before_first_chunk():
+    broken = FakeBackend("broken", fail=True)
+    router = RoutingProvider([broken, DummyProvider(stream_delay=0)])
+
+    async def run():
+        return "".join([c.content async for c in router.stream_complete("plan")])
+
+    assert "execution plan" in asyncio.run(run())
@@ -0,0 +1,109 @@
+"""Streaming completion tests."""
+import asyncio
+import json
+import time
+from fastapi.testclient import TestClient
+from agentic_workflows.api.server import create_app
+from agentic_workflows.llm.base import collect_stream
+from agentic_workflows.llm.cache import CachedProvider, CompletionCache, MemoryCacheBackend
+from agentic_workflows.llm.claude_provider import ClaudeProvider
+from agentic_workflows.llm.dummy_provider import DummyProvider
+from agentic_workflows.llm.http import close_http_clients
+from agentic_workflows.llm.openai_provider import OpenAIProvider
+
+
+def sse_body(events):
+    return ("".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n").encode()
+
+
+def parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_dummy_streams_words_with_delay():
+    llm = DummyProvider(stream_delay=0.01)
+
+    async def run():
+        start = time.perf_counter()
+        chunks = [(c, time.perf_counter() - start) async for c in llm.stream_complete("plan the workflow")]
+        return chunks
+
+    chunks = asyncio.run(run())
+    assert chunks[0][1] < 0.01
+    assert len(chunks) > 10
+    assert chunks[-1][0].finish_reason == "stop"
+    assert "".join(c.content for c, _ in chunks) == llm._generate_dummy_response("plan the workflow")
+
+
+def test_openai_stream_parses_deltas_and_usage(stub_server):
+    stub_server.default = (200, {"Content-Type": "text/event-stream"}, sse_body([
+        {"model": "gpt-test", "choices": [{"delta": {"content": "Hel"}, "finish_reason": None}]},
+        {"model": "gpt-test", "choices": [{"delta": {"content": "lo"}, "finish_reason": "stop"}]},
+        {"model": "gpt-test", "choices": [], "usage": {"total_tokens": 9}},
+    ]))
+    llm = OpenAIProvider(api_key="k", base_url=stub_server.url)
+
+    async def run():
+        response = await collect_stream(llm.stream_complete("hi"))
+        await close_http_clients()
+        return response
+
+    response = asyncio.run(run())
+    assert (response.content, response.tokens_used, response.finish_reason) == ("Hello", 9, "stop")
+    assert json.loads(stub_server.requests[0]["body"])["stream"] is True
+
+
+def test_claude_stream_parses_events(stub_server):
+    stub_server.default = (200, {"Content-Type": "text/event-stream"}, sse_body([
+        {"type": "message_start", "message": {"model": "claude-test", "usage": {"input_tokens": 4}}},
+        {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "Hi "}},
+        {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "there"}},
+        {"type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": 2}},
+        {"type": "message_stop"},
+    ]))
+    llm = ClaudeProvider(api_key="k", base_url=stub_server.url)
+
+    async def run():
+        response = await collect_stream(llm.stream_complete("hi"))
+        await close_http_clients()
+        return response
+
+    response = asyncio.run(run())
+    assert (response.content, response.tokens_used, response.model) == ("Hi there", 6, "claude-test")
+
+
+def test_cached_stream_is_replayed():
+    inner = DummyProvider(stream_delay=0)
+    llm = CachedProvider(inner, CompletionCache(MemoryCacheBackend()))
+
+    async def run():
+        first = [c async for c in llm.stream_complete("validate", temperature=0.0)]
+        second = [c async for c in llm.stream_complete("validate", temperature=0.0)]
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert len(first) > 1 and len(second) == 1
+    assert second[0].content == "".join(c.content for c in first)
+
+
+def test_chat_stream_endpoint_emits_deltas_then_done():
+    client = TestClient(create_app())
+    resp = client.post("/api/llm/chat/stream", json={"message": "hello", "provider": "dummy"})
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(resp.text)
+    assert events[0][0] == "delta"
+    kind, done = events[-1]
+    assert kind == "done" and done["status"] == "success"
+    assert done["time_to_first_token_ms"] is not None
+    assert "execution plan" in "".join(e["content"] for k, e in events if k == "delta")
+
+
+def test_generate_workflow_stream_returns_parsed_workflow():
+    client = TestClient(create_app())
+    resp = client.post("/api/llm/generate-workflow/stream", json={"description": "fetch data", "provider": "dummy"})
+    kind, done = parse_sse(resp.text)[-1]
+    assert kind == "done" and "workflow" in done
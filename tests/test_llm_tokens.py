@@ -0,0 +1,89 @@
+"""Token estimation and budgeting tests."""
+import asyncio
+import json
+
+import pytest
+
+from agentic_workflows.agents import RecoveryAgent
+from agentic_workflows.core.audit import AuditLog
+from agentic_workflows.llm.dummy_provider import DummyProvider
+from agentic_workflows.llm.tokens import (
+    TokenMeter,
+    estimate_tokens,
+    fit_json,
+    get_token_meter,
+    record_usage,
+    truncate_text,
+    truncate_trace,
+)
+
+
+def test_estimate_tracks_text_length_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert 8 <= estimate_tokens("The quick brown fox jumps over the lazy dog.") <= 14
+    # JSON is punctuation-heavy and costs more per character than prose
+    assert estimate_tokens('{"a":1,"b":[1,2]}') >= 12
+
+
+def test_fit_json_keeps_valid_shape_within_budget():
+    value = {
+        "rows": [{"id": i, "payload": "x" * 500} for i in range(200)],
+        "meta": {"source": "db", "nested": {"deep": {"deeper": {"deepest": [1, 2, 3]}}}},
+    }
+    text = fit_json(value, 400)
+    assert estimate_tokens(text) <= 400
+    shrunk = json.loads(text)
+    assert set(shrunk) == {"rows", "meta"}
+    assert "more items" in shrunk["rows"][-1]
+    assert fit_json({"small": 1}, 400) == json.dumps({"small": 1}, indent=2)
+
+
+def test_truncate_trace_keeps_head_and_innermost_frames():
+    trace = "Traceback (most recent call last):\n" + "\n".join(
+        f'  File "mod{i}.py", line {i}, in f{i}' for i in range(300)
+    ) + "\nValueError: bad value"
+    short = truncate_trace(trace, 100)
+    assert estimate_tokens(short) <= 110
+    assert short.startswith("Traceback")
+    assert short.endswith("ValueError: bad value")
+    assert "lines omitted" in short
+
+
+def test_truncate_text_keeps_start_and_end():
+    text = "start " + "filler " * 2000 + " end"
+    short = truncate_text(text, 50)
+    assert short.startswith("start") and short.endswith("end")
+    assert estimate_tokens(short) < 70
+
+
+def test_meter_totals_usage():
+    meter = TokenMeter()
+    meter.record("openai", "gpt", 10, 5)
+    meter.record("openai", "gpt", 3, 2)
+    assert meter.snapshot()["openai:gpt"] == {
+        "calls": 2, "prompt_tokens": 13, "completion_tokens": 7, "total_tokens": 20,
+    }
+
+
+def test_recovery_prompt_is_bounded_and_usage_recorded(tmp_path):
+    get_token_meter().reset()
+    agent = RecoveryAgent(llm_provider=DummyProvider(), audit=AuditLog(str(tmp_path / "audit.log")))
+    huge_params = {"body": "y" * 200_000, "items": list(range(5000))}
+    prompt = agent._build_recovery_prompt("t1", "boom\n" * 5000, {"type": "http_task", "params": huge_params})
+    assert estimate_tokens(prompt) <= agent.budget.prompt_tokens
+
+    asyncio.run(agent.analyze_failure("t1", "boom", {"params": huge_params}))
+    usage = get_token_meter().snapshot()["dummy:dummy"]
+    assert usage["calls"] == 1 and usage["prompt_tokens"] <= agent.budget.prompt_tokens + 200
+
+
+def test_usage_is_exported_to_prometheus():
+    pytest.importorskip("prometheus_client")
+    from agentic_workflows.monitoring.metrics import llm_tokens_total
+
+    def count(kind):
+        return llm_tokens_total.labels(provider="openai", model="gpt-test", kind=kind)._value.get()
+
+    before = count("prompt"), count("completion")
+    record_usage("openai", "gpt-test", 120, 30)
+    assert (count("prompt"), count("completion")) == (before[0] + 120, before[1] + 30)
@@ -0,0 +1,151 @@
+"""ObserverAgent streaming metrics and anomaly detection tests."""
+import asyncio
+import random
+import warnings
+
+from agentic_workflows.agents import ObserverAgent
+from agentic_workflows.agents.observer_agent import OTHER_ERRORS
+from agentic_workflows.config import get_settings
+from agentic_workflows.core.audit import AuditLog
+from agentic_workflows.llm.dummy_provider import DummyProvider
+from agentic_workflows.monitoring.anomaly import AnomalyDetector
+from agentic_workflows.monitoring.streaming import LogHistogram, StreamingStats
+
+
+def _observer(tmp_path, monkeypatch, **settings):
+    for name, value in settings.items():
+        monkeypatch.setattr(get_settings(), name, value)
+    return ObserverAgent(audit=AuditLog(str(tmp_path / "audit.log")), llm_provider=DummyProvider())
+
+
+def test_quantiles_stay_within_precision():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(0, 1.5) for _ in range(20000)]
+    stats = StreamingStats(window=10)
+    for value in values:
+        stats.observe(value)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(stats.quantile(q) - exact) / exact < 0.03
+    assert len(stats.recent) == 10 and stats.recent[-1] == values[-1]
+    assert len(stats.histogram.buckets) < 1000
+    assert LogHistogram().quantile(0.5) == 0.0
+
+
+def test_completed_workflows_are_evicted_into_summaries(tmp_path, monkeypatch):
+    observer = _observer(tmp_path, monkeypatch, observer_completed_history=3, observer_max_error_patterns=2)
+    for i in range(10):
+        workflow_id = f"wf{i}"
+        observer.start_workflow(workflow_id, {})
+        observer.update_task(workflow_id, "fetch", "running")
+        observer.update_task(workflow_id, "fetch", "failed" if i % 2 else "success", {"attempt": 1})
+        observer.record_error(workflow_id, "fetch", f"error {i}", "IOError")
+        observer.complete_workflow(workflow_id, "failed" if i % 2 else "success")
+
+    assert observer.workflows == {}
+    assert list(observer.completed) == ["wf7", "wf8", "wf9"]
+    assert observer.get_workflow_status("wf0") is None
+    status = observer.get_workflow_status("wf9")
+    assert status["progress"] == 100 and status["task_statuses"] == {"failed": 1}
+
+    metrics = observer.get_metrics()
+    assert metrics["total_workflows"] == 10 and metrics["active_workflows"] == 0
+    assert metrics["status_counts"] == {"success": 5, "failed": 5}
+    assert metrics["metrics"]["workflow_duration"]["count"] == 10
+    assert metrics["metrics"]["task_duration"]["count"] == 10
+    assert metrics["total_errors"] == 10
+    assert len(metrics["error_patterns"]) == 3 and metrics["error_patterns"][OTHER_ERRORS] == 8
+
+
+def test_running_workflow_status_keeps_task_detail(tmp_path, monkeypatch):
+    observer = _observer(tmp_path, monkeypatch, observer_task_update_history=2)
+    observer.start_workflow("wf", {})
+    for attempt in range(5):
+        observer.update_task("wf", "fetch", "running", {"attempt": attempt})
+
+    status = observer.get_workflow_status("wf")
+    assert status["status"] == "running" and status["progress"] == 0
+    assert [u["details"]["attempt"] for u in status["tasks"]["fetch"]["updates"]] == [3, 4]
+
+
+def test_slowdowns_are_detected_per_series_and_pushed():
+    detector = AnomalyDetector(min_samples=5)
+    pushed = []
+    unsubscribe = detector.subscribe(pushed.append)
+
+    for _ in range(20):
+        assert detector.observe_duration("workflow", "fast", 1.0) is None
+        assert detector.observe_duration("workflow", "slow", 60.0) is None
+    # Normal for "slow", far outside what "fast" usually takes
+    assert detector.observe_duration("workflow", "slow", 61.0) is None
+    anomaly = detector.observe_duration("workflow", "fast", 5.0)
+    assert anomaly["type"] == "slow_execution" and anomaly["key"] == "fast"
+    assert pushed == [anomaly] and detector.active() == [anomaly]
+
+    # Back to normal clears it
+    detector.observe_duration("workflow", "fast", 1.0)
+    assert detector.active() == []
+
+    unsubscribe()
+    detector.observe_duration("workflow", "fast", 50.0)
+    assert len(pushed) == 1
+
+
+def test_coroutine_subscribers_run_on_the_loop_or_are_skipped():
+    detector = AnomalyDetector(error_burst_threshold=0)
+    pushed = []
+
+    async def push(anomaly):
+        await asyncio.sleep(0)
+        pushed.append(anomaly["key"])
+
+    detector.subscribe(push)
+
+    # No running loop: skipped without raising or leaving the coroutine unawaited
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        detector.observe_error("IOError:disk full")
+    assert pushed == []
+
+    async def raise_and_wait():
+        detector.observe_error("ValueError:bad row")
+        assert len(detector._tasks) == 1
+        await asyncio.gather(*detector._tasks)
+
+    asyncio.run(raise_and_wait())
+    assert pushed == ["ValueError:bad row"] and not detector._tasks
+
+
+def test_error_bursts_use_a_sliding_window():
+    now = [1000.0]
+    detector = AnomalyDetector(error_window_seconds=60, error_burst_threshold=3, clock=lambda: now[0])
+    pushed = []
+    detector.subscribe(pushed.append)
+
+    for _ in range(3):
+        assert detector.observe_error("IOError:disk full") is None
+    assert detector.observe_error("IOError:disk full")["count"] == 4
+    detector.observe_error("IOError:disk full")
+    assert [a["type"] for a in pushed] == ["repeated_error"]  # pushed once per burst
+
+    now[0] += 120
+    assert detector.active() == []
+    assert detector.observe_error("IOError:disk full") is None
+
+
+def test_observer_feeds_the_detector(tmp_path, monkeypatch):
+    observer = _observer(tmp_path, monkeypatch, anomaly_min_samples=3)
+    pushed = []
+    observer.subscribe(pushed.append)
+
+    for i in range(6):
+        observer.start_workflow(f"wf{i}", {"name": "nightly"})
+        observer.update_task(f"wf{i}", "fetch", "success", task_type="http_task")
+        observer.complete_workflow(f"wf{i}", "failed" if i >= 2 else "success")
+
+    assert [a["type"] for a in pushed] == ["high_error_rate"]
+    assert pushed[0]["key"] == "nightly"
+    assert observer.detect_anomalies() == pushed
+    assert observer.get_recommendations() == ["Consider reviewing failed workflows and adding error handling"]
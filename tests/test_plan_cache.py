@@ -0,0 +1,74 @@
+"""Planner plan cache tests."""
+import asyncio
+from agentic_workflows.agents import planner_agent
+from agentic_workflows.agents.planner_agent import PlanCache, PlannerAgent
+from agentic_workflows.core.audit import AuditLog
+from agentic_workflows.core.planning import CostModel
+from agentic_workflows.core.spec import parse_spec, spec_hash
+from agentic_workflows.llm.base import LLMResponse
+from agentic_workflows.llm.cache import MemoryCacheBackend
+from agentic_workflows.llm.dummy_provider import DummyProvider
+
+SPEC = {
+    "id": "wf",
+    "name": "Nightly sync",
+    "description": "Sync files",
+    "tasks": [{"id": "fetch", "type": "http_task", "params": {"url": "https://example.com"}}],
+}
+
+
+class CountingProvider(DummyProvider):
+    provider_name = "counting"
+
+    def __init__(self, fail=False):
+        super().__init__()
+        self.calls = 0
+        self.fail = fail
+
+    async def chat(self, messages, temperature=None, max_tokens=None, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("provider down")
+        return LLMResponse(content=f"Run tasks in parallel ({self.calls})", model="m", tokens_used=5, finish_reason="stop", metadata={})
+
+    async def complete(self, prompt, system_prompt=None, temperature=None, max_tokens=None, **kwargs):
+        return await self.chat(self.format_messages(prompt, system_prompt), temperature, max_tokens)
+
+
+def _planner(llm, cache, tmp_path):
+    return PlannerAgent(llm_provider=llm, audit=AuditLog(str(tmp_path / "audit.log")), plan_cache=cache, cost_model=CostModel())
+
+
+def test_spec_hash_ignores_formatting_but_not_content():
+    same = {**SPEC, "name": "  Nightly sync ", "metadata": {}}
+    same["tasks"] = [{"params": {"url": "https://example.com"}, "type": "http_task", "id": "fetch", "run_if": None}]
+    assert spec_hash(parse_spec(same)) == spec_hash(parse_spec(SPEC))
+
+    changed = {**SPEC, "tasks": [{**SPEC["tasks"][0], "params": {"url": "https://example.org"}}]}
+    assert spec_hash(parse_spec(changed)) != spec_hash(parse_spec(SPEC))
+
+
+def test_unchanged_spec_is_served_from_cache(tmp_path, monkeypatch):
+    llm = CountingProvider()
+    cache = PlanCache(MemoryCacheBackend())
+    planner = _planner(llm, cache, tmp_path)
+
+    first = asyncio.run(planner.plan_and_explain(parse_spec(SPEC)))
+    second = asyncio.run(planner.plan_and_explain(parse_spec(SPEC)))
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert second["plan"] == first["plan"] and second["explanation"] == first["explanation"]
+    assert llm.calls == 2  # plan + explanation, once
+
+    # A new planner version invalidates every cached plan
+    monkeypatch.setattr(planner_agent, "PLANNER_VERSION", "test")
+    assert asyncio.run(planner.plan_and_explain(parse_spec(SPEC)))["cached"] is False
+    assert cache.stats()["hits"] == 1
+
+
+def test_fallback_plans_are_not_cached(tmp_path):
+    cache = PlanCache(MemoryCacheBackend())
+    planner = _planner(CountingProvider(fail=True), cache, tmp_path)
+
+    asyncio.run(planner.plan_and_explain(parse_spec(SPEC)))
+    assert planner.used_fallback
+    assert len(cache.backend) == 0
@@ -0,0 +1,108 @@
+"""Deterministic planning and cost model tests."""
+import asyncio
+import pytest
+from agentic_workflows.agents.planner_agent import PlannerAgent
+from agentic_workflows.core.audit import AuditLog
+from agentic_workflows.core.exceptions import WorkflowValidationError
+from agentic_workflows.core.planning import CostModel, critical_path, load_task_timings, parallel_groups
+from agentic_workflows.core.results import ResultSink
+from agentic_workflows.core.spec import parse_spec
+from agentic_workflows.llm.dummy_provider import DummyProvider
+
+
+def _spec(*tasks):
+    return parse_spec({
+        "id": "etl",
+        "name": "ETL",
+        "tasks": [
+            {"id": task_id, "type": task_type, "depends_on": deps}
+            for task_id, task_type, deps in tasks
+        ],
+    })
+
+
+SPEC = _spec(
+    ("extract_a", "http_task", []),
+    ("extract_b", "http_task", []),
+    ("transform", "file_organizer", ["extract_a", "extract_b"]),
+    ("notify", "email_summarizer", []),
+    ("load", "http_task", ["transform"]),
+)
+
+
+def test_parallel_groups_follow_dependencies_in_spec_order():
+    assert parallel_groups(SPEC) == [["extract_a", "extract_b", "notify"], ["transform"], ["load"]]
+
+
+def test_invalid_dependencies_are_rejected():
+    with pytest.raises(WorkflowValidationError):
+        parallel_groups(_spec(("a", "http_task", ["b"]), ("b", "http_task", ["a"])))
+    with pytest.raises(WorkflowValidationError):
+        parallel_groups(_spec(("a", "http_task", ["missing"])))
+
+
+def test_critical_path_is_longest_dependent_chain():
+    durations = {"extract_a": 1, "extract_b": 4, "transform": 2, "notify": 10, "load": 5}
+    assert critical_path(SPEC, durations) == (["extract_b", "transform", "load"], 11)
+
+
+def test_cost_model_prefers_task_history_then_type_then_default():
+    model = CostModel.fit([
+        {
+            "workflow_name": "ETL",
+            "duration_seconds": 12,
+            "task_timings": [
+                {"task_id": "extract_a", "type": "http_task", "status": "completed", "duration_seconds": 2},
+                {"task_id": "transform", "type": "file_organizer", "status": "completed", "duration_seconds": 8},
+            ],
+        },
+        {
+            "workflow_name": "Other",
+            "duration_seconds": 5,
+            "task_timings": [
+                {"task_id": "fetch", "type": "http_task", "status": "completed", "duration_seconds": 4},
+                {"task_id": "broken", "type": "http_task", "status": "failed", "duration_seconds": 99},
+            ],
+        },
+    ], default_seconds=7)
+    tasks = {task.id: task for task in SPEC.tasks}
+
+    assert (model.estimate(tasks["extract_a"], "ETL").seconds, model.estimate(tasks["extract_a"], "ETL").source) == (2, "task")
+    assert model.estimate(tasks["extract_b"], "ETL").seconds == 3  # median of http_task runs
+    assert model.estimate(tasks["notify"], "ETL").source == "default"
+    assert model.overhead_seconds == 1.5
+    assert model.runs == 2
+
+
+def test_task_timings_come_from_the_result_store(tmp_path):
+    with ResultSink(str(tmp_path / "run"), segment_records=1) as sink:
+        sink.write("extract_a", {"type": "http_task", "status": "completed", "duration_seconds": 2, "result": "x" * 1000})
+        sink.write("transform", {"type": "file_organizer", "status": "completed", "duration_seconds": 8})
+    # Only the timings sidecar is read, never the payload segments
+    for segment in (tmp_path / "run").glob("part-*"):
+        segment.unlink()
+    timings = load_task_timings(sink.summary())
+
+    assert timings[0] == {"task_id": "extract_a", "type": "http_task", "status": "completed", "duration_seconds": 2}
+    model = CostModel.fit([{"workflow_name": "ETL", "duration_seconds": 11, "task_timings": timings}])
+    assert model.estimate(SPEC.tasks[1], "ETL").seconds == 2  # extract_b, from its http_task sibling
+    assert model.overhead_seconds == 1
+    assert load_task_timings({"location": str(tmp_path / "pruned")}) == []
+
+
+def test_planner_analysis_needs_no_llm(tmp_path):
+    model = CostModel(default_seconds=2)
+    planner = PlannerAgent(llm_provider=DummyProvider(), audit=AuditLog(str(tmp_path / "audit.log")),
+                           plan_cache=None, cost_model=model)
+
+    plan = asyncio.run(planner.plan_workflow(SPEC, advice=False))
+    assert plan["execution_strategy"] == "hybrid"
+    assert plan["parallel_groups"][0] == ["extract_a", "extract_b", "notify"]
+    assert plan["estimated_duration_seconds"] == 10
+    assert plan["critical_path_seconds"] == 6
+    assert plan["estimated_duration"] == "10s"
+    assert "llm_suggestions" not in plan
+
+    advised = asyncio.run(planner.plan_workflow(SPEC))
+    assert advised["parallel_groups"] == plan["parallel_groups"]
+    assert "risks" in advised and "llm_suggestions" in advised
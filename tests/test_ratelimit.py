@@ -0,0 +1,71 @@
+"""Outbound rate limiting tests."""
+import time
+import pytest
+from agentic_workflows.core.exceptions import ExternalServiceRateLimitedError
+from agentic_workflows.core.ratelimit import (
+    TokenBucket,
+    backoff_from_headers,
+    get_rate_limiter,
+    parse_rate,
+    reset_rate_limiters,
+)
+from agentic_workflows.plugins.http_task import HTTPTask
+
+
+def test_parse_rate_and_headers():
+    assert parse_rate("10/s") == (10.0, None)
+    assert parse_rate("600/min:20") == (10.0, 20)
+    assert backoff_from_headers({"Retry-After": "2"}, 429) == 2.0
+    assert backoff_from_headers({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "3"}) == 3.0
+    assert backoff_from_headers({"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "3"}) is None
+
+
+def test_bucket_spaces_calls():
+    bucket = TokenBucket("svc", rate=20.0, burst=1)
+    start = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.14
+
+
+def test_http_task_waits_for_retry_after(stub_server):
+    reset_rate_limiters()
+    stub_server.reply(429, {"Retry-After": "0.3"})
+    stub_server.reply(200)
+
+    result = HTTPTask({"url": stub_server.url + "/items", "dry_run": False}).execute()
+
+    assert result["status"] == "completed"
+    assert result["status_code"] == 200
+    first, second = stub_server.requests
+    assert second["at"] - first["at"] >= 0.3
+
+
+def test_http_task_raises_on_persistent_429(stub_server):
+    reset_rate_limiters()
+    stub_server.default = (429, {"Retry-After": "0.05"}, {"error": "slow down"})
+
+    with pytest.raises(ExternalServiceRateLimitedError) as exc:
+        HTTPTask({
+            "url": stub_server.url,
+            "dry_run": False,
+            "rate_limit_retries": 1
+        }).execute()
+
+    assert exc.value.retry_after == 0.05
+    assert len(stub_server.requests) == 2
+    # Only the affected bucket is paused
+    assert get_rate_limiter("127.0.0.1").pauses == 2
+    assert get_rate_limiter("other.example.com").wait_time() == 0
+
+
+def test_task_rates_do_not_reconfigure_the_host_bucket():
+    reset_rate_limiters()
+    host = get_rate_limiter("api.example.com")
+    slow = get_rate_limiter("api.example.com", "1/s")
+    fast = get_rate_limiter("api.example.com", "100/s")
+
+    assert host.rate is None
+    assert slow is not host and slow.rate == 1.0 and fast.rate == 100.0
+    assert get_rate_limiter("api.example.com", "1/s") is slow
+    assert get_rate_limiter("api.example.com") is host
@@ -0,0 +1,52 @@
+"""Streaming result sink tests."""
+from agentic_workflows.core.results import ResultSink, read_results
+from agentic_workflows.core.orchestrator import Orchestrator
+
+
+def test_sink_pages_across_segments(tmp_path):
+    sink = ResultSink(str(tmp_path / "run"), segment_records=3)
+    for i in range(8):
+        stub = sink.write(f"task{i}", {"status": "completed", "result": {"n": i}})
+        assert "result" not in stub
+        assert stub["ref"] == {"segment": i // 3, "index": i}
+    summary = sink.close()
+
+    assert summary["records"] == 8
+    assert summary["segments"] == 3
+    assert summary["status_counts"] == {"completed": 8}
+
+    page = read_results(summary["location"], offset=2, limit=4)
+    assert [r["result"]["n"] for r in page["items"]] == [2, 3, 4, 5]
+    assert page["next_offset"] == 6
+
+    last = read_results(summary["location"], offset=6, limit=10)
+    assert [r["task_id"] for r in last["items"]] == ["task6", "task7"]
+    assert last["next_offset"] is None
+
+
+def test_orchestrator_streams_results(tmp_path):
+    test_dir = tmp_path / "test_dir"
+    test_dir.mkdir()
+    (test_dir / "a.txt").write_text("a")
+
+    spec_path = tmp_path / "test_spec.yaml"
+    spec_path.write_text(f"""
+id: test-workflow
+name: Test Workflow
+description: A test workflow
+tasks:
+  - id: task1
+    type: file_organizer
+    params:
+      target: {str(test_dir)}
+""")
+
+    orch = Orchestrator(audit_path=str(tmp_path / "audit.log"), results_dir=str(tmp_path / "results"))
+    result = orch.run_spec(str(spec_path), dry_run=True)
+
+    assert "plan" not in result["results"]["task1"]
+    assert result["results_ref"]["records"] == 1
+
+    page = read_results(result["results_ref"]["location"])
+    assert page["items"][0]["task_id"] == "task1"
+    assert page["items"][0]["plan"]
@@ -0,0 +1,101 @@
+"""Deterministic spec validation tests."""
+import asyncio
+import time
+from agentic_workflows.agents.validator_agent import ValidationCache, ValidatorAgent
+from agentic_workflows.core.audit import AuditLog
+from agentic_workflows.core.spec import parse_spec
+from agentic_workflows.core.validation import has_errors, validate_spec
+from agentic_workflows.llm.base import LLMResponse
+from agentic_workflows.llm.cache import MemoryCacheBackend
+from agentic_workflows.llm.dummy_provider import DummyProvider
+
+
+def _spec(*tasks):
+    return parse_spec({"id": "wf", "name": "Workflow", "tasks": list(tasks)})
+
+
+def _messages(issues):
+    return sorted(issue["message"] for issue in issues)
+
+
+def test_valid_spec_has_no_issues():
+    spec = _spec(
+        {"id": "fetch", "type": "http_task", "params": {"url": "https://example.com", "method": "POST", "timeout": 5}},
+        {"id": "tidy", "type": "file_organizer", "params": {"dry_run": True}, "depends_on": ["fetch"]},
+    )
+    assert validate_spec(spec) == []
+
+
+def test_parameter_schemas_come_from_plugins():
+    issues = validate_spec(_spec(
+        {"id": "fetch", "type": "http_task", "params": {"method": "FETCH", "timeout": "5", "retries": 3}},
+        {"id": "run", "type": "shell_command", "params": {"command": "ls", "allow_unsafe": 1}},
+        {"id": "odd", "type": "no_such_plugin"},
+    ))
+    errors = [i for i in issues if i["severity"] == "error"]
+    warnings = [i for i in issues if i["severity"] == "warning"]
+    assert {i["field"] for i in errors} == {
+        "tasks[0].params.url",
+        "tasks[0].params.method",
+        "tasks[0].params.timeout",
+        "tasks[1].params.allow_unsafe",
+        "tasks[2].type",
+    }
+    assert [i["field"] for i in warnings] == ["tasks[0].params.retries"]
+
+
+def test_dependency_checks():
+    unknown = validate_spec(_spec({"id": "a", "type": "http_task", "params": {"url": "u"}, "depends_on": ["ghost"]}))
+    assert _messages(unknown) == ["Task a depends on unknown task 'ghost'"]
+
+    cycle = validate_spec(_spec(
+        {"id": "a", "type": "http_task", "params": {"url": "u"}, "depends_on": ["b"]},
+        {"id": "b", "type": "http_task", "params": {"url": "u"}, "depends_on": ["a"]},
+        {"id": "c", "type": "http_task", "params": {"url": "u"}},
+    ))
+    assert _messages(cycle) == ["Dependency cycle among tasks ['a', 'b']"]
+
+
+def test_validation_is_fast():
+    spec = _spec(*[
+        {"id": f"t{i}", "type": "http_task", "params": {"url": "u"}, "depends_on": [f"t{i-1}"] if i else []}
+        for i in range(50)
+    ])
+    validate_spec(spec)  # compile schemas
+    start = time.perf_counter()
+    for _ in range(100):
+        validate_spec(spec)
+    assert (time.perf_counter() - start) / 100 < 0.005
+
+
+class CountingProvider(DummyProvider):
+    provider_name = "counting"
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def complete(self, prompt, system_prompt=None, temperature=None, max_tokens=None, **kwargs):
+        self.calls += 1
+        return LLMResponse(content='{"issues": [{"severity": "warning", "message": "No retries"}]}',
+                           model="m", tokens_used=5, finish_reason="stop", metadata={})
+
+
+def test_llm_review_is_skipped_on_structural_errors_and_cached(tmp_path):
+    llm = CountingProvider()
+    validator = ValidatorAgent(llm_provider=llm, audit=AuditLog(str(tmp_path / "audit.log")),
+                               validation_cache=ValidationCache(MemoryCacheBackend()))
+
+    broken = _spec({"id": "fetch", "type": "http_task"})
+    is_valid, issues, _ = asyncio.run(validator.validate_workflow(broken))
+    assert not is_valid and has_errors(issues)
+    assert llm.calls == 0 and not validator.llm_reviewed
+
+    good = _spec({"id": "fetch", "type": "http_task", "params": {"url": "https://example.com"}})
+    for _ in range(2):
+        is_valid, issues, _ = asyncio.run(validator.validate_workflow(good))
+        assert is_valid and _messages(issues) == ["No retries"]
+    assert llm.calls == 1
+
+    asyncio.run(validator.validate_workflow(good, llm_review=False))
+    assert llm.calls == 1 and not validator.llm_reviewed